@@ -0,0 +1,265 @@
+"""
+Analytics over the columnar quiz answer log
+Queries work on whole columns with C-level bulk operations (Counter,
+itertools.compress, bytes.split) instead of per-row Python loops, so
+millions of answers are summarized well under a second
+"""
+
+import glob
+import logging
+import os
+from collections import Counter
+from itertools import compress
+from operator import not_
+
+from answer_log import AnswerLog, get_answer_log, DEFAULT_ANSWER_LOG_DIR, USERS_FOLDER, ANSWERS_FOLDER_NAME
+from instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _user_selector(columns, strings, user):
+    """Get a row selector for one user, or None to select every row"""
+    if user is None:
+        return None
+    try:
+        user_id = strings.index(user)
+    except ValueError:
+        return b''
+    return bytes(map(user_id.__eq__, columns['user']))
+
+
+def _select(column, selector):
+    if selector is None:
+        return column
+    return list(compress(column, selector))
+
+
+def select_user(columns, strings, user):
+    """
+    Restrict every column to one user's answers
+
+    Args:
+        columns (dict): Columns from AnswerLog.read_columns()
+        strings (list): String dictionary from AnswerLog.strings()
+        user (str): User to keep (None keeps every row)
+
+    Returns:
+        dict: Column name -> filtered column
+    """
+    selector = _user_selector(columns, strings, user)
+    if selector is None:
+        return columns
+    return {name: _select(column, selector) for name, column in columns.items()}
+
+
+def word_error_rates(columns, strings, user=None):
+    """
+    Count errors and attempts per word
+
+    Args:
+        columns (dict): Columns from AnswerLog.read_columns()
+        strings (list): String dictionary from AnswerLog.strings()
+        user (str): Restrict to one user (None for everyone)
+
+    Returns:
+        dict: Lowercase headword -> (errors, attempts)
+    """
+    selector = _user_selector(columns, strings, user)
+    words = _select(columns['word'], selector)
+    correct = _select(columns['correct'], selector)
+    attempts = Counter(words)
+    errors = Counter(compress(words, map(not_, correct)))
+    return {strings[word_id]: (errors.get(word_id, 0), count) for word_id, count in attempts.items()}
+
+
+def category_accuracy(columns, strings, user=None):
+    """
+    Count correct answers and attempts per category
+
+    Args:
+        columns (dict): Columns from AnswerLog.read_columns()
+        strings (list): String dictionary from AnswerLog.strings()
+        user (str): Restrict to one user (None for everyone)
+
+    Returns:
+        dict: Category -> (correct, attempts)
+    """
+    selector = _user_selector(columns, strings, user)
+    categories = _select(columns['category'], selector)
+    correct = _select(columns['correct'], selector)
+    attempts = Counter(categories)
+    right = Counter(compress(categories, correct))
+    return {strings[category_id]: (right.get(category_id, 0), count) for category_id, count in attempts.items()}
+
+
+def answer_streaks(columns, strings, user=None):
+    """
+    Find the current and best runs of correct answers
+
+    Args:
+        columns (dict): Columns from AnswerLog.read_columns()
+        strings (list): String dictionary from AnswerLog.strings()
+        user (str): Restrict to one user (None for everyone)
+
+    Returns:
+        tuple: (current_streak, best_streak)
+    """
+    selector = _user_selector(columns, strings, user)
+    correct = bytes(_select(columns['correct'], selector))
+    if not correct:
+        return 0, 0
+    # Runs of correct answers are the pieces between incorrect ones
+    runs = correct.split(b'\x00')
+    return len(runs[-1]), max(map(len, runs))
+
+
+def answer_summary(columns, strings, user=None):
+    """
+    Summarize answer totals, accuracy and latency
+
+    Args:
+        columns (dict): Columns from AnswerLog.read_columns()
+        strings (list): String dictionary from AnswerLog.strings()
+        user (str): Restrict to one user (None for everyone)
+
+    Returns:
+        dict: total, correct, accuracy (0-100), average_latency_ms
+    """
+    selector = _user_selector(columns, strings, user)
+    correct = _select(columns['correct'], selector)
+    latency = _select(columns['latency_ms'], selector)
+    total = len(correct)
+    right = sum(correct)
+    return {
+        'total': total,
+        'correct': right,
+        'accuracy': (right / total) * 100 if total else 0.0,
+        'average_latency_ms': sum(latency) / total if total else 0.0
+    }
+
+
+def hardest_words(error_rates, limit=10, min_attempts=1):
+    """
+    Rank words by error rate
+
+    Args:
+        error_rates (dict): Output of word_error_rates()
+        limit (int): Number of words to return
+        min_attempts (int): Ignore words answered fewer times than this
+
+    Returns:
+        list: (word, errors, attempts) tuples, hardest first
+    """
+    ranked = [(word, errors, attempts) for word, (errors, attempts) in error_rates.items()
+              if attempts >= min_attempts and errors]
+    ranked.sort(key=lambda item: (item[1] / item[2], item[2]), reverse=True)
+    return ranked[:limit]
+
+
+# Results cached per log directory and row count (the log only grows)
+_analytics_cache = {}
+
+
+def get_user_progress(user=None, log_dir=DEFAULT_ANSWER_LOG_DIR):
+    """
+    Compute the Progress page statistics, reusing them until new answers arrive
+
+    Args:
+        user (str): Restrict to one user (None for everyone)
+        log_dir (str): Directory of the answer log
+
+    Returns:
+        dict: summary, categories, streaks and error_rates for the user
+    """
+    log = get_answer_log(log_dir)
+    rows = log.row_count()
+    key = (log.log_dir, user)
+    cached = _analytics_cache.get(key)
+    if cached is not None and cached[0] == rows:
+        record_cache("user_progress", True)
+        return cached[1]
+    record_cache("user_progress", False)
+
+    strings = log.strings()
+    columns = select_user(log.read_columns(), strings, user)
+    progress = {
+        'summary': answer_summary(columns, strings),
+        'categories': category_accuracy(columns, strings),
+        'streaks': answer_streaks(columns, strings),
+        'error_rates': word_error_rates(columns, strings)
+    }
+    _analytics_cache[key] = (rows, progress)
+    return progress
+
+
+# Per-word error rates per log directory: absolute path -> (row count, error rates)
+_error_rates_cache = {}
+
+
+def user_answer_log_dirs(users_folder=USERS_FOLDER):
+    """
+    Find the answer logs of the signed-in learners
+
+    Args:
+        users_folder (str): Root of the sharded user directories
+
+    Returns:
+        list: Answer log directories, one per user who has answered
+    """
+    return sorted(glob.glob(os.path.join(users_folder, "*", "*", ANSWERS_FOLDER_NAME)))
+
+
+def _log_error_rates(log_dir):
+    """Error rates of one log, recounted only when it has new rows"""
+    path = os.path.abspath(log_dir)
+    # A throwaway AnswerLog: scanning every user must not keep their logs open
+    log = AnswerLog(log_dir)
+    rows = log.row_count()
+    cached = _error_rates_cache.get(path)
+    if cached is not None and cached[0] == rows:
+        record_cache("error_rates", True)
+        return cached[1]
+    record_cache("error_rates", False)
+    error_rates = word_error_rates(log.read_columns(), log.strings())
+    _error_rates_cache[path] = (rows, error_rates)
+    return error_rates
+
+
+def load_error_rates(log_dir=DEFAULT_ANSWER_LOG_DIR, users_folder=USERS_FOLDER):
+    """
+    Get per-word error rates over all users, for difficulty scoring
+
+    Adds up the shared log (the default "local" user) and the log of every
+    learner under users_folder.
+
+    Args:
+        log_dir (str): Directory of the shared answer log
+        users_folder (str): Root of the sharded user directories
+
+    Returns:
+        dict: Lowercase headword -> (errors, attempts) (empty without any log)
+    """
+    totals = {}
+    for directory in [log_dir] + user_answer_log_dirs(users_folder):
+        try:
+            error_rates = _log_error_rates(directory)
+        except (OSError, ValueError) as e:
+            logger.error("Error reading answer log %s: %s", directory, e)
+            continue
+        for word, (errors, attempts) in error_rates.items():
+            total_errors, total_attempts = totals.get(word, (0, 0))
+            totals[word] = (total_errors + errors, total_attempts + attempts)
+    return totals
+
+
+def forget_progress(log_dir=DEFAULT_ANSWER_LOG_DIR):
+    """
+    Drop the cached Progress statistics of an answer log
+
+    Args:
+        log_dir (str): Directory of the answer log
+    """
+    path = os.path.abspath(log_dir)
+    for key in [key for key in _analytics_cache if os.path.abspath(key[0]) == path]:
+        del _analytics_cache[key]
@@ -0,0 +1,296 @@
+"""
+Persistent quiz answer log stored as compact binary columns
+Every answer is appended to one file per column (fixed-width typed
+arrays) plus an append-only string dictionary, so the analytics can load
+millions of answers with a handful of bulk reads
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+
+from instrumentation import timed, record_bytes
+
+# Constants
+DEFAULT_ANSWER_LOG_DIR = "data/answers"
+DEFAULT_USER = "local"
+USERS_FOLDER = "data/users"         # per-user logs: <users folder>/<shard>/<user id>/answers
+ANSWERS_FOLDER_NAME = "answers"
+STRINGS_FILE = "strings.jsonl"
+
+# Column name -> array typecode
+COLUMNS = {
+    'timestamp': 'd',   # seconds since the epoch
+    'user': 'I',        # string id
+    'level': 'I',       # string id
+    'category': 'I',    # string id
+    'word': 'I',        # string id of the lowercase headword
+    'quiz_type': 'I',   # string id
+    'chosen': 'I',      # string id of the chosen option's headword
+    'correct': 'B',     # 1 if correct, 0 otherwise
+    'latency_ms': 'I'   # time spent answering
+}
+ROW_BYTES = sum(array(typecode).itemsize for typecode in COLUMNS.values())
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerLog:
+    """
+    Append-only columnar log of quiz answers
+
+    Columns may end up with different lengths if a process dies mid-append;
+    readers only use the rows present in every column.
+    """
+
+    def __init__(self, log_dir=DEFAULT_ANSWER_LOG_DIR):
+        """
+        Open (and create if needed) an answer log directory
+
+        Args:
+            log_dir (str): Directory holding the column files
+        """
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._strings = None
+        self._string_ids = None
+        self._strings_size = None
+
+    def _column_path(self, name):
+        return os.path.join(self.log_dir, f"{name}.bin")
+
+    def _load_strings(self):
+        strings = []
+        self._strings_size = 0
+        path = os.path.join(self.log_dir, STRINGS_FILE)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Ignore a torn last line left by an interrupted append
+            complete = data[:data.rfind(b"\n") + 1]
+            strings = [json.loads(line) for line in complete.decode('utf-8').splitlines() if line.strip()]
+            self._strings_size = len(complete)
+        self._strings = strings
+        self._string_ids = {value: index for index, value in enumerate(strings)}
+
+    def strings(self):
+        """
+        Get the string dictionary (id -> string)
+
+        Returns:
+            list: Strings indexed by their id
+        """
+        if self._strings is None or self._strings_stale():
+            self._load_strings()
+        return self._strings
+
+    def _strings_stale(self):
+        # Another process may have appended new strings since the last load
+        path = os.path.join(self.log_dir, STRINGS_FILE)
+        try:
+            return os.path.getsize(path) != self._strings_size
+        except OSError:
+            return False
+
+    def _intern(self, values, strings_file):
+        """Map strings to ids, appending unseen strings to the dictionary"""
+        ids = []
+        for value in values:
+            value = str(value)
+            string_id = self._string_ids.get(value)
+            if string_id is None:
+                string_id = len(self._strings)
+                self._strings.append(value)
+                self._string_ids[value] = string_id
+                strings_file.write(json.dumps(value, ensure_ascii=False) + "\n")
+            ids.append(string_id)
+        return ids
+
+    @timed("answer_log.append")
+    def append_many(self, answers):
+        """
+        Append a batch of answers to the log
+
+        Args:
+            answers (list): List of dictionaries with the keys user, level, category,
+                word, quiz_type, chosen, correct, latency_ms and optionally timestamp
+
+        Returns:
+            int: Number of answers written
+        """
+        if not answers:
+            return 0
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.log_dir, ".lock"), 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self._strings is None or self._strings_stale():
+                    self._load_strings()
+                self._repair_columns()
+                strings_path = os.path.join(self.log_dir, STRINGS_FILE)
+                if os.path.exists(strings_path) and os.path.getsize(strings_path) > self._strings_size:
+                    os.truncate(strings_path, self._strings_size)
+                now = time.time()
+                with open(strings_path, 'a', encoding='utf-8') as strings_file:
+                    columns = {
+                        'timestamp': array('d', [answer.get('timestamp', now) for answer in answers]),
+                        'correct': array('B', [1 if answer['correct'] else 0 for answer in answers]),
+                        'latency_ms': array('I', [max(0, int(answer.get('latency_ms', 0))) for answer in answers])
+                    }
+                    for name in ('user', 'level', 'category', 'quiz_type'):
+                        columns[name] = array('I', self._intern([answer[name] for answer in answers], strings_file))
+                    for name in ('word', 'chosen'):
+                        columns[name] = array('I', self._intern(
+                            [str(answer[name]).strip().lower() for answer in answers], strings_file))
+                self._strings_size = os.path.getsize(strings_path)
+
+                for name in COLUMNS:
+                    with open(self._column_path(name), 'ab') as f:
+                        columns[name].tofile(f)
+                record_bytes("answer_log.append", written=len(answers) * ROW_BYTES)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return len(answers)
+
+    def append(self, user, level, category, word, quiz_type, chosen, correct, latency_ms, timestamp=None):
+        """
+        Append one answer to the log
+
+        Args:
+            user (str): User identifier
+            level (int or str): Quiz level
+            category (str): Category of the word
+            word (str): Headword of the question
+            quiz_type (str): Quiz type label
+            chosen (str): Headword of the chosen option
+            correct (bool): Whether the answer was correct
+            latency_ms (int): Time spent answering in milliseconds
+            timestamp (float): Answer time in epoch seconds (defaults to now)
+
+        Returns:
+            int: Number of answers written (1)
+        """
+        answer = {
+            'user': user, 'level': level, 'category': category, 'word': word,
+            'quiz_type': quiz_type, 'chosen': chosen, 'correct': correct, 'latency_ms': latency_ms
+        }
+        if timestamp is not None:
+            answer['timestamp'] = timestamp
+        return self.append_many([answer])
+
+    def _repair_columns(self):
+        """Truncate columns left uneven by an interrupted append"""
+        rows = self.row_count()
+        for name, typecode in COLUMNS.items():
+            path = self._column_path(name)
+            size = rows * array(typecode).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+
+    @timed("answer_log.read")
+    def read_columns(self):
+        """
+        Load every column with one bulk read per file
+
+        Returns:
+            dict: Column name -> array, all truncated to the same row count
+        """
+        columns = {}
+        for name, typecode in COLUMNS.items():
+            column = array(typecode)
+            path = self._column_path(name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                usable = len(data) - len(data) % column.itemsize
+                record_bytes("answer_log.read", read=len(data))
+                column.frombytes(data[:usable])
+            columns[name] = column
+
+        rows = min(len(column) for column in columns.values())
+        for name, column in columns.items():
+            if len(column) > rows:
+                del column[rows:]
+        return columns
+
+    def row_count(self):
+        """
+        Get the number of complete answers in the log without reading it
+
+        Returns:
+            int: Number of rows present in every column
+        """
+        counts = []
+        for name, typecode in COLUMNS.items():
+            path = self._column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // array(typecode).itemsize)
+        return min(counts)
+
+
+# Process-wide log instances, one per directory
+_answer_logs = {}
+
+
+def get_answer_log(log_dir=DEFAULT_ANSWER_LOG_DIR):
+    """
+    Get the shared answer log for a directory
+
+    Args:
+        log_dir (str): Directory holding the column files
+
+    Returns:
+        AnswerLog: The log instance
+    """
+    key = os.path.abspath(log_dir)
+    log = _answer_logs.get(key)
+    if log is None:
+        log = _answer_logs.setdefault(key, AnswerLog(log_dir))
+    return log
+
+
+def log_answer(user, level, category, word, quiz_type, chosen, correct, latency_ms, log_dir=DEFAULT_ANSWER_LOG_DIR):
+    """
+    Append one quiz answer to the shared log, never raising on IO errors
+
+    Args:
+        user (str): User identifier
+        level (int or str): Quiz level
+        category (str): Category of the word
+        word (str): Headword of the question
+        quiz_type (str): Quiz type label
+        chosen (str): Headword of the chosen option
+        correct (bool): Whether the answer was correct
+        latency_ms (int): Time spent answering in milliseconds
+        log_dir (str): Directory holding the column files
+
+    Returns:
+        bool: True if the answer was written
+    """
+    try:
+        get_answer_log(log_dir).append(user, level, category, word, quiz_type, chosen, correct, latency_ms)
+        return True
+    except OSError as e:
+        logger.error("Error logging quiz answer: %s", e)
+        return False
+
+
+def close_answer_log(log_dir=DEFAULT_ANSWER_LOG_DIR):
+    """
+    Drop the shared answer log of a directory and its string dictionary
+
+    Args:
+        log_dir (str): Directory holding the column files
+    """
+    _answer_logs.pop(os.path.abspath(log_dir), None)
@@ -0,0 +1,401 @@
+"""
+Headless HTTP/JSON API over the vocabulary services
+Serves levels, categories, paginated words, search, quiz question batches,
+answer submission, cached TTS audio and word clips of phrase audio to
+non-Streamlit clients (the mobile app), without the cost of a Streamlit
+script rerun per request.
+
+The handlers run on the same process-wide caches as the Streamlit apps
+(corpus, audio, answer log). Read endpoints send an ETag derived from the
+level file signature and answer If-None-Match with 304 before doing any
+work; responses are gzipped for clients that accept it. Blocking work (TTS,
+answer log appends) runs in the thread pool so the event loop stays free.
+
+Install the extra dependencies with `pip install -r requirements_api.txt`
+and start the server with:
+
+    python api.py --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import weakref
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from services import (
+    get_audio,
+    get_phrase_audio,
+    get_level_corpus,
+    get_user_store,
+    QuizSession,
+    SPEED_OPTIONS
+)
+from corpus import SHIPPED_LEVELS
+from quiz import (
+    QUIZ_TYPES,
+    KOREAN_QUIZ_TYPES,
+    QUIZ_FIELDS,
+    DEFAULT_OPTION_COUNT,
+    quiz_pool,
+    prompt_text,
+    option_text
+)
+from answer_log import DEFAULT_USER
+
+# Constants
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_SEARCH_LIMIT = 20
+DEFAULT_QUIZ_SIZE = 10
+MAX_QUIZ_SIZE = 100
+GZIP_MINIMUM_SIZE = 500     # bytes; smaller bodies are sent as they are
+AUDIO_MAX_AGE = 86400       # seconds clients may reuse an audio clip without revalidating
+
+# Quiz type parameter -> label used by the apps and the answer log
+QUIZ_TYPE_PARAMS = {"meaning": QUIZ_TYPES[0], "word": QUIZ_TYPES[1], "cloze": KOREAN_QUIZ_TYPES[0],
+                    "expression": KOREAN_QUIZ_TYPES[1], "listening": KOREAN_QUIZ_TYPES[2]}
+
+# Lowercased (word, meaning, entry) rows per corpus, dropped with the corpus when it reloads
+_search_rows = weakref.WeakKeyDictionary()
+
+
+def _parse_level(text):
+    """Map a level path segment ("1", "korean") to the level identifier used by corpus.py"""
+    if text.isdigit():
+        return int(text)
+    if text.lower() == "korean":
+        return "Korean"
+    return text
+
+
+def _get_corpus(level_text):
+    corpus = get_level_corpus(_parse_level(level_text))
+    if corpus is None:
+        raise HTTPException(404, f"Unknown level: {level_text}")
+    return corpus
+
+
+def _int_param(request, name, default, minimum=0, maximum=None):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer")
+    if maximum is None and number < minimum:
+        raise HTTPException(400, f"{name} must be at least {minimum}")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise HTTPException(400, f"{name} must be between {minimum} and {maximum}")
+    return number
+
+
+def _etag(*parts):
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _not_modified(request, etag):
+    """Check If-None-Match against the ETag of the current representation"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def _cached_json(request, corpora, build):
+    """
+    Answer a read request, validating it against the signatures of the corpora it reads
+
+    Args:
+        request (Request): Incoming request
+        corpora (list): Corpora the response depends on
+        build (callable): Returns the JSON payload; only called when the client copy is stale
+
+    Returns:
+        Response: 304 or a JSON response, both with the ETag
+    """
+    etag = _etag(request.url.path, str(request.query_params),
+                 [(corpus.path, corpus.signature) for corpus in corpora])
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+
+def _public_entry(entry):
+    return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+
+async def list_levels(request):
+    corpora = [corpus for corpus in map(get_level_corpus, SHIPPED_LEVELS) if corpus]
+    return _cached_json(request, corpora, lambda: {
+        "levels": [{
+            "level": corpus.level,
+            "words": len(corpus),
+            "categories": corpus.category_counts
+        } for corpus in corpora]
+    })
+
+
+async def list_categories(request):
+    corpus = _get_corpus(request.path_params['level'])
+    return _cached_json(request, [corpus], lambda: {
+        "level": corpus.level,
+        "categories": [{"name": name, "words": count} for name, count in corpus.category_counts.items()]
+    })
+
+
+async def list_words(request):
+    corpus = _get_corpus(request.path_params['level'])
+    category = request.query_params.get("category")
+    if category and category not in corpus.categories and category.lower() not in corpus.categories:
+        raise HTTPException(404, f"Unknown category: {category}")
+    offset = _int_param(request, "offset", 0)
+    limit = _int_param(request, "limit", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+
+    def build():
+        words = corpus.get_category(category) if category else corpus.words
+        return {
+            "level": corpus.level,
+            "category": category,
+            "total": len(words),
+            "offset": offset,
+            "limit": limit,
+            "words": [_public_entry(entry) for entry in words[offset:offset + limit]]
+        }
+    return _cached_json(request, [corpus], build)
+
+
+async def get_word(request):
+    corpus = _get_corpus(request.path_params['level'])
+    entry = corpus.lookup(request.path_params['word'])
+    if entry is None:
+        raise HTTPException(404, f"Unknown word: {request.path_params['word']}")
+    return _cached_json(request, [corpus], lambda: _public_entry(entry))
+
+
+def _get_search_rows(corpus, query):
+    if getattr(corpus, 'shared', False):
+        # Scan the search rows of the mapped file; only matching entries are decoded
+        return [(word, meaning, corpus.entry(index)) for word, meaning, index in corpus.search(query)]
+    rows = _search_rows.get(corpus)
+    if rows is None:
+        rows = [(entry.get('word', '').lower(), entry.get('meaning', '').lower(), entry) for entry in corpus.words]
+        _search_rows[corpus] = rows
+    return rows
+
+
+async def search(request):
+    query = request.query_params.get("q", "").strip().lower()
+    if not query:
+        raise HTTPException(400, "q is required")
+    limit = _int_param(request, "limit", DEFAULT_SEARCH_LIMIT, 1, MAX_PAGE_SIZE)
+    level_text = request.query_params.get("level")
+    if level_text:
+        corpora = [_get_corpus(level_text)]
+    else:
+        corpora = [corpus for corpus in map(get_level_corpus, SHIPPED_LEVELS) if corpus]
+
+    def build():
+        # Exact headwords first, then headword prefixes, then any substring of word or meaning
+        ranked = []
+        for corpus in corpora:
+            for word, meaning, entry in _get_search_rows(corpus, query):
+                if word == query:
+                    rank = 0
+                elif word.startswith(query):
+                    rank = 1
+                elif query in word or query in meaning:
+                    rank = 2
+                else:
+                    continue
+                ranked.append((rank, len(ranked), corpus.level, entry))
+        ranked.sort(key=lambda row: row[:2])
+        return {
+            "query": query,
+            "total": len(ranked),
+            "results": [dict(_public_entry(entry), level=level) for _, _, level, entry in ranked[:limit]]
+        }
+    return _cached_json(request, corpora, build)
+
+
+async def quiz_batch(request):
+    corpus = _get_corpus(request.path_params['level'])
+    category = request.query_params.get("category")
+    quiz_type = QUIZ_TYPE_PARAMS.get(request.query_params.get("type", "meaning"))
+    if quiz_type is None:
+        raise HTTPException(400, f"type must be one of: {', '.join(QUIZ_TYPE_PARAMS)}")
+    words = quiz_pool(corpus.get_category(category) if category else corpus.words, quiz_type)
+    if len(words) < 2:
+        raise HTTPException(404, "A quiz needs at least 2 words")
+    count = _int_param(request, "count", DEFAULT_QUIZ_SIZE, 1, MAX_QUIZ_SIZE)
+    option_count = _int_param(request, "options", DEFAULT_OPTION_COUNT, 2, 10)
+    seed = request.query_params.get("seed")
+
+    # The deck is drawn as index arrays; only the shown text of each option is sent
+    session = QuizSession(corpus.level, category, len(words), count, option_count,
+                          seed=seed if seed is not None else random.getrandbits(64))
+    questions = []
+    for position, correct in enumerate(session.deck):
+        start = position * session.option_count
+        options = session.options[start:start + session.option_count]
+        questions.append({
+            "word": words[correct]['word'],
+            "prompt": prompt_text(words[correct], quiz_type),
+            "options": [option_text(words[index], quiz_type) for index in options]
+        })
+    payload = {"level": corpus.level, "category": category, "type": quiz_type, "questions": questions}
+    # Seeded batches are reproducible and may be cached; random ones may not
+    if seed is not None:
+        return _cached_json(request, [corpus], lambda: payload)
+    return JSONResponse(payload, headers={"Cache-Control": "no-store"})
+
+
+async def submit_answer(request):
+    try:
+        answer = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON")
+    if not isinstance(answer, dict) or not answer.get("word") or "chosen" not in answer:
+        raise HTTPException(400, "word and chosen are required")
+
+    corpus = _get_corpus(str(answer.get("level", "1")))
+    entry = corpus.lookup(answer["word"])
+    if entry is None:
+        raise HTTPException(404, f"Unknown word: {answer['word']}")
+    quiz_type = QUIZ_TYPE_PARAMS.get(answer.get("type", "meaning"))
+    if quiz_type is None:
+        raise HTTPException(400, f"type must be one of: {', '.join(QUIZ_TYPE_PARAMS)}")
+
+    chosen = str(answer["chosen"])
+    expected = option_text(entry, quiz_type)
+    if QUIZ_FIELDS[quiz_type][1] == 'word':
+        correct = chosen.strip().lower() == expected.strip().lower()
+        chosen_word = chosen
+    else:
+        correct = chosen == expected
+        # The answer log records the headword of the chosen option
+        chosen_entry = next((word for word in corpus.get_category(entry['category'])
+                             if option_text(word, quiz_type) == chosen), None)
+        chosen_word = chosen_entry['word'] if chosen_entry else chosen
+
+    try:
+        latency_ms = int(answer.get("latency_ms", 0))
+    except (TypeError, ValueError):
+        raise HTTPException(400, "latency_ms must be an integer")
+    try:
+        user_store = get_user_store(str(answer.get("user", DEFAULT_USER)))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    logged = await run_in_threadpool(user_store.log_answer, corpus.level,
+                                     entry['category'], entry['word'], quiz_type, chosen_word, correct, latency_ms)
+    return JSONResponse({
+        "correct": correct,
+        "answer": expected,
+        "logged": logged
+    })
+
+
+def _audio_params(request):
+    """Read the text and speed query parameters of the audio endpoints"""
+    text = request.query_params.get("text", "").strip()
+    if not text:
+        raise HTTPException(400, "text is required")
+    speed = request.query_params.get("speed", "normal")
+    if speed not in SPEED_OPTIONS:
+        raise HTTPException(400, f"speed must be one of: {', '.join(SPEED_OPTIONS)}")
+    return text, speed
+
+
+def _audio_response(request, clip):
+    data, media_type = clip
+    etag = _etag(len(data), hashlib.blake2b(data, digest_size=12).hexdigest())
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={AUDIO_MAX_AGE}"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(data, media_type=media_type, headers=headers)
+
+
+async def audio(request):
+    text, speed = _audio_params(request)
+    is_phrase = request.query_params.get("phrase", "").lower() in ("1", "true", "yes")
+
+    # Cache hits return at once; misses synthesize in the thread pool (single-flight in get_audio)
+    clip = await run_in_threadpool(get_audio, text, is_phrase, speed)
+    if clip is None:
+        raise HTTPException(503, "Speech synthesis failed")
+    return _audio_response(request, clip)
+
+
+async def phrase_words(request):
+    text, speed = _audio_params(request)
+    phrase_audio = await run_in_threadpool(get_phrase_audio, text, speed)
+    if phrase_audio is None:
+        raise HTTPException(503, "Speech synthesis failed")
+    return JSONResponse({
+        "text": text,
+        "format": phrase_audio.format,
+        "duration_ms": phrase_audio.duration_ms,
+        "words": [timing._asdict() for timing in phrase_audio.timings]
+    })
+
+
+async def phrase_word_clip(request):
+    text, speed = _audio_params(request)
+    try:
+        index = int(request.path_params["index"])
+    except ValueError:
+        raise HTTPException(400, "index must be an integer")
+    # Synthesized once per phrase; every word clip is a byte range of the cached audio
+    phrase_audio = await run_in_threadpool(get_phrase_audio, text, speed)
+    if phrase_audio is None:
+        raise HTTPException(503, "Speech synthesis failed")
+    if not 0 <= index < len(phrase_audio):
+        raise HTTPException(404, f"No word at position {index}")
+    return _audio_response(request, phrase_audio.clip(index))
+
+
+routes = [
+    Route("/levels", list_levels),
+    Route("/levels/{level}/categories", list_categories),
+    Route("/levels/{level}/words", list_words),
+    Route("/levels/{level}/words/{word}", get_word),
+    Route("/levels/{level}/quiz", quiz_batch),
+    Route("/search", search),
+    Route("/answers", submit_answer, methods=["POST"]),
+    Route("/audio", audio),
+    Route("/audio/words", phrase_words),
+    Route("/audio/words/{index}", phrase_word_clip)
+]
+
+app = Starlette(routes=routes, middleware=[Middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the vocabulary HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is not installed: pip install -r requirements_api.txt", file=sys.stderr)
+        return 1
+    uvicorn.run("api:app" if args.workers > 1 else app, host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,334 +1,35 @@
 import streamlit as st 
+import logging
 import os
 import random
-from main import (
+from services import (
     load_word_pools, 
-    create_audio_file, 
+    get_audio, 
     load_vocabulary_from_file, 
+    load_category_from_file,
+    count_vocabulary_words,
     save_word_pools_to_file,
-    filter_words_by_category,
     validate_word_entry,
-    cleanup_audio_file,
+    get_phonetic,
+    get_difficulty,
+    save_to_learned,
+    load_learned_words,
+    delete_learned_word,
+    migrate_legacy_learned_file,
+    update_phrase_in_json,
+    delete_word_from_file,
+    write_vocabulary,
+    append_entry,
+    DIFFICULTY_FILTERS,
     DEFAULT_CATEGORIES,
     DEFAULT_VOCABULARY_FILE,
-    DIFFICULTY_LEVELS,
     LEVEL_DESCRIPTIONS,
     SPEED_OPTIONS,
     SPEED_LABELS
 )
+from profiling import start_run, finish_run
 
-def update_phrase_in_file(word_to_update, new_phrase, word_file):
-    """Update the phrase for a specific word in the vocabulary file"""
-    # Read all lines
-    with open(word_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Update the specific word's phrase
-    updated_lines = []
-    updated = False
-    for line in lines:
-        if line.strip():
-            parts = line.strip().split(' | ')
-            if len(parts) >= 4 and parts[0].lower() == word_to_update.lower():
-                # Update the phrase (index 2)
-                parts[2] = new_phrase
-                updated_lines.append(' | '.join(parts) + '\n')
-                updated = True
-            else:
-                updated_lines.append(line)
-        else:
-            updated_lines.append(line)
-    
-    # Write back to file
-    if updated:
-        with open(word_file, 'w', encoding='utf-8') as f:
-            f.writelines(updated_lines)
-    
-    return updated
-
-def update_phrase_in_json(word_to_update, new_phrase, level):
-    """Update the phrase for a specific word in the JSON level files"""
-    import json
-    
-    if level == "learned":
-        return update_phrase_in_learned_json(word_to_update, new_phrase)
-    
-    # Map level to filename
-    level_files = {
-        1: "data/level1.json",
-        2: "data/level2.json", 
-        3: "data/level3.json",
-        4: "data/korean.json"
-    }
-    
-    filename = level_files.get(level)
-    if not filename or not os.path.exists(filename):
-        return False
-    
-    try:
-        # Read the JSON file
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Find and update the word's phrase
-        updated = False
-        for category, words in data.items():
-            for word_entry in words:
-                if word_entry.get('word', '').lower() == word_to_update.lower():
-                    word_entry['phrase'] = new_phrase
-                    updated = True
-                    break
-            if updated:
-                break
-        
-        # Write back to file if updated
-        if updated:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return updated
-    except (json.JSONDecodeError, FileNotFoundError, Exception):
-        return False
-
-def update_phrase_in_learned_json(word_to_update, new_phrase):
-    """Update the phrase for a specific word in the learned.json file"""
-    import json
-    
-    learned_file = "learned.json"
-    if not os.path.exists(learned_file):
-        return False
-    
-    try:
-        # Read the learned.json file
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Find and update the word's phrase
-        updated = False
-        for word_entry in learned_words:
-            if word_entry.get('word', '').lower() == word_to_update.lower():
-                word_entry['phrase'] = new_phrase
-                updated = True
-                break
-        
-        # Write back to file if updated
-        if updated:
-            with open(learned_file, 'w', encoding='utf-8') as f:
-                json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        
-        return updated
-    except (json.JSONDecodeError, FileNotFoundError, Exception):
-        return False
-
-# Phonetic transcriptions for vocabulary words
-PHONETICS = {
-    # General
-    "serendipity": "/ˌsɛrənˈdɪpɪti/",
-    "eloquent": "/ˈɛləkwənt/",
-    "resilient": "/rɪˈzɪliənt/",
-    "pragmatic": "/prægˈmætɪk/",
-    "ubiquitous": "/juˈbɪkwɪtəs/",
-    "meticulous": "/məˈtɪkjələs/",
-    "ephemeral": "/ɪˈfɛmərəl/",
-    "versatile": "/ˈvɜrsətaɪl/",
-    "ambiguous": "/æmˈbɪgjuəs/",
-    "innovative": "/ˈɪnəˌveɪtɪv/",
-    "tenacious": "/təˈneɪʃəs/",
-    "profound": "/prəˈfaʊnd/",
-    "subtle": "/ˈsʌtəl/",
-    "coherent": "/koʊˈhɪrənt/",
-    "diligent": "/ˈdɪlɪdʒənt/",
-    "intricate": "/ˈɪntrɪkət/",
-    "benevolent": "/bəˈnɛvələnt/",
-    "authentic": "/ɔˈθɛntɪk/",
-    "efficient": "/ɪˈfɪʃənt/",
-    "contemplative": "/kənˈtɛmplətɪv/",
-    
-    # Science
-    "hypothesis": "/haɪˈpɑθəsɪs/",
-    "catalyst": "/ˈkætəlɪst/",
-    "molecule": "/ˈmɑləˌkjul/",
-    "ecosystem": "/ˈikoʊˌsɪstəm/",
-    "photosynthesis": "/ˌfoʊtoʊˈsɪnθəsɪs/",
-    "chromosome": "/ˈkroʊməˌsoʊm/",
-    "quantum": "/ˈkwɑntəm/",
-    "biodiversity": "/ˌbaɪoʊdaɪˈvɜrsəti/",
-    "metabolism": "/məˈtæbəˌlɪzəm/",
-    "neuron": "/ˈnʊrɑn/",
-    "osmosis": "/ɑzˈmoʊsɪs/",
-    "mitosis": "/maɪˈtoʊsɪs/",
-    "genome": "/ˈdʒinoʊm/",
-    "thermodynamics": "/ˌθɜrmoʊdaɪˈnæmɪks/",
-    "evolution": "/ˌɛvəˈluʃən/",
-    "isotope": "/ˈaɪsəˌtoʊp/",
-    "enzyme": "/ˈɛnzaɪm/",
-    "gravity": "/ˈgrævəti/",
-    "radiation": "/ˌreɪdiˈeɪʃən/",
-    "symbiosis": "/ˌsɪmbaɪˈoʊsɪs/",
-    
-    # Business
-    "entrepreneur": "/ˌɑntrəprəˈnɜr/",
-    "revenue": "/ˈrɛvəˌnu/",
-    "stakeholder": "/ˈsteɪkˌhoʊldər/",
-    "portfolio": "/pɔrtˈfoʊlioʊ/",
-    "synergy": "/ˈsɪnərdʒi/",
-    "leverage": "/ˈlɛvərɪdʒ/",
-    "equity": "/ˈɛkwəti/",
-    "margin": "/ˈmɑrdʒən/",
-    "franchise": "/ˈfrænˌtʃaɪz/",
-    "diversification": "/daɪˌvɜrsəfəˈkeɪʃən/",
-    "acquisition": "/ˌækwəˈzɪʃən/",
-    "liability": "/ˌlaɪəˈbɪləti/",
-    "liquidate": "/ˈlɪkwəˌdeɪt/",
-    "compliance": "/kəmˈplaɪəns/",
-    "benchmark": "/ˈbɛnʧˌmɑrk/",
-    "scalable": "/ˈskeɪləbəl/",
-    "subsidiary": "/səbˈsɪdiˌɛri/",
-    "turnover": "/ˈtɜrnˌoʊvər/",
-    "valuation": "/ˌvæljuˈeɪʃən/",
-    
-    # Add more categories as needed...
-}
-
-# Difficulty levels for words
-DIFFICULTY_LEVELS = {
-    # General - Easy to Hard
-    "efficient": "⭐",
-    "authentic": "⭐",
-    "versatile": "⭐⭐",
-    "pragmatic": "⭐⭐",
-    "resilient": "⭐⭐",
-    "innovative": "⭐⭐",
-    "profound": "⭐⭐",
-    "coherent": "⭐⭐",
-    "diligent": "⭐⭐",
-    "benevolent": "⭐⭐⭐",
-    "eloquent": "⭐⭐⭐",
-    "meticulous": "⭐⭐⭐",
-    "ubiquitous": "⭐⭐⭐",
-    "ephemeral": "⭐⭐⭐",
-    "ambiguous": "⭐⭐⭐",
-    "tenacious": "⭐⭐⭐",
-    "subtle": "⭐⭐⭐",
-    "intricate": "⭐⭐⭐",
-    "contemplative": "⭐⭐⭐",
-    "serendipity": "⭐⭐⭐",
-    
-    # Science
-    "gravity": "⭐",
-    "molecule": "⭐",
-    "ecosystem": "⭐⭐",
-    "evolution": "⭐⭐",
-    "catalyst": "⭐⭐",
-    "enzyme": "⭐⭐",
-    "neuron": "⭐⭐",
-    "genome": "⭐⭐⭐",
-    "hypothesis": "⭐⭐⭐",
-    "photosynthesis": "⭐⭐⭐",
-    "chromosome": "⭐⭐⭐",
-    "quantum": "⭐⭐⭐",
-    "biodiversity": "⭐⭐⭐",
-    "metabolism": "⭐⭐⭐",
-    "osmosis": "⭐⭐⭐",
-    "mitosis": "⭐⭐⭐",
-    "thermodynamics": "⭐⭐⭐",
-    "isotope": "⭐⭐⭐",
-    "radiation": "⭐⭐⭐",
-    "symbiosis": "⭐⭐⭐",
-}
-
-def get_phonetic(word):
-    """Get phonetic transcription for a word"""
-    return PHONETICS.get(word.lower(), "")
-
-def get_difficulty(word):
-    """Get difficulty level for a word"""
-    return DIFFICULTY_LEVELS.get(word.lower(), "⭐⭐")
-
-def save_to_learned(word_entry, learned_file="learned.json"):
-    """Save a word entry to learned.json file"""
-    import json
-    
-    # Load existing learned words
-    learned_words = []
-    if os.path.exists(learned_file):
-        try:
-            with open(learned_file, 'r', encoding='utf-8') as f:
-                learned_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            learned_words = []
-    
-    # Add timestamp to the entry
-    import datetime
-    word_entry_with_timestamp = word_entry.copy()
-    word_entry_with_timestamp['learned_date'] = datetime.datetime.now().isoformat()
-    
-    # Check if word already exists in learned list
-    existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
-    if not existing_word:
-        learned_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(learned_file, 'w', encoding='utf-8') as f:
-            json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        return True
-    return False
-
-def load_learned_words(learned_file="learned.json"):
-    """Load learned words from learned.json and convert to vocabulary format"""
-    import json
-    
-    if not os.path.exists(learned_file):
-        return []
-    
-    try:
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Convert to the same format as regular vocabulary
-        formatted_words = []
-        for word_entry in learned_words:
-            formatted_word = {
-                'word': word_entry.get('word', ''),
-                'meaning': word_entry.get('meaning', ''),
-                'phrase': word_entry.get('phrase', ''),
-                'category': word_entry.get('category', 'general'),
-                'learned_date': word_entry.get('learned_date', '')
-            }
-            formatted_words.append(formatted_word)
-        
-        return formatted_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def save_learned_words_to_file(learned_words, learned_file="learned.json"):
-    """Save learned words back to JSON file"""
-    import json
-    
-    with open(learned_file, 'w', encoding='utf-8') as f:
-        json.dump(learned_words, f, ensure_ascii=False, indent=2)
-    
-    return True
-
-def delete_word_from_file(word_to_delete, word_file):
-    """Delete a word from the vocabulary file"""
-    # Read all lines
-    with open(word_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Filter out the word to delete
-    updated_lines = []
-    for line in lines:
-        if line.strip():
-            parts = line.strip().split(' | ')
-            if len(parts) >= 1 and parts[0].lower() != word_to_delete.lower():
-                updated_lines.append(line)
-    
-    # Write back to file
-    with open(word_file, 'w', encoding='utf-8') as f:
-        f.writelines(updated_lines)
-    
-    return True
+logger = logging.getLogger(__name__)
 
 # Configure the app
 st.set_page_config(
@@ -337,6 +38,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# Profile this script run when requested with ?profile=1 or VOCAB_PROFILE=1
+profile_run = start_run(__file__)
+
+# Learned words moved from ./learned.json to data/learned.json
+migrate_legacy_learned_file()
+
 # Custom CSS to increase base font size by 80% for senior users (30% + 50% additional)
 st.markdown("""
 <style>
@@ -579,13 +286,11 @@ category_list = DEFAULT_CATEGORIES
 col1, col2 = st.columns(2)
 with col1:
     if current_level == "learned":
-        if st.button(f"📚 Load Learned Words", help="Load your learned vocabulary from learned.json"):
+        if st.button(f"📚 Load Learned Words", help="Load your learned vocabulary from data/learned.json"):
             learned_words = load_learned_words()
             if learned_words:
                 # Convert learned words to the standard vocabulary format and save to the working file
-                with open(word_file, "w", encoding='utf-8') as f:
-                    for word_entry in learned_words:
-                        f.write(f"{word_entry['word']} | {word_entry['meaning']} | {word_entry['phrase']} | {word_entry['category']}\n")
+                write_vocabulary(word_file, learned_words)
                 st.success(f"✅ Successfully loaded {len(learned_words)} learned words!")
                 st.info("Navigate to other sections to review your learned vocabulary.")
             else:
@@ -598,7 +303,7 @@ with col1:
                 success = save_word_pools_to_file(word_pools, word_file)
                 if success:
                     word_length = len(load_vocabulary_from_file(word_file))
-                    print(f"Total words saved to {word_file}: {word_length}")
+                    logger.info("Total words saved to %s: %d", word_file, word_length)
                     st.success(f"✅ Successfully loaded Level {current_level} vocabulary across all categories!")
                     #st.info("Navigate to other sections to explore the features.")
                 else:
@@ -608,9 +313,9 @@ with col1:
 
 with col2:
     # Statistics display
-    all_words = load_vocabulary_from_file(word_file)
-    if all_words:
-        st.metric("📊 Total Words", len(all_words))
+    total_words = count_vocabulary_words(word_file)
+    if total_words:
+        st.metric("📊 Total Words", total_words)
 
 # Main navigation
 select = st.sidebar.radio("Select Learning Mode", [
@@ -644,13 +349,12 @@ if select == "📖 Study Mode":
     )
     
     if selected_category:
-        # Load vocabulary from vocabulary.txt for Study Mode
-        all_words = load_vocabulary_from_file(word_file)
-        filtered_words = filter_words_by_category(all_words, selected_category)
+        # Load only the selected category from vocabulary.txt for Study Mode
+        filtered_words = load_category_from_file(word_file, selected_category)
         # Apply difficulty filter
         if difficulty_filter != "All Levels":
-            target_level = difficulty_filter
-            filtered_words = [w for w in filtered_words if get_difficulty(w['word']) == target_level]
+            target_level = DIFFICULTY_FILTERS[difficulty_filter]
+            filtered_words = [w for w in filtered_words if get_difficulty(w['word'], current_level) == target_level]
         if filtered_words:
             st.info(f"📚 Showing {len(filtered_words)} words from {selected_category}")
             for entry in filtered_words:
@@ -658,7 +362,7 @@ if select == "📖 Study Mode":
                     col1, col2 = st.columns([4, 1])
                     
                     with col1:
-                        difficulty = get_difficulty(entry['word'])
+                        difficulty = get_difficulty(entry['word'], current_level)
                         
                         # Simple card with visual border using Streamlit components
                         with st.container():
@@ -668,6 +372,11 @@ if select == "📖 Study Mode":
                             # Word title with emoji
                             st.markdown(f"### 📚 {entry['word']} {difficulty}")
                             
+                            # Phonetic transcription if available
+                            phonetic = get_phonetic(entry['word'])
+                            if phonetic:
+                                st.markdown(f"*{phonetic}*")
+                            
                             # Meaning
                             st.markdown(f"**Meaning:** {entry['meaning']}")
                             
@@ -752,24 +461,16 @@ if select == "📖 Study Mode":
                         
                         # Play buttons
                         if st.button(f"🔊 Word", key=f"word_{entry['word']}"):
-                            audio_file = create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    # Detect audio format based on file extension
-                                    audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                    st.audio(audio.read(), format=audio_format)
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['word'], is_phrase=False, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
                         
                         if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}"):
-                            audio_file = create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    # Detect audio format based on file extension
-                                    audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                    st.audio(audio.read(), format=audio_format)
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['phrase'], is_phrase=True, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
                         
@@ -781,13 +482,10 @@ if select == "📖 Study Mode":
                             # Move back to vocabulary button for learned words
                             if st.button(f"↩️ Move Back", key=f"moveback_{entry['word']}", help="Move back to main vocabulary"):
                                 # Add word back to main vocabulary file
-                                with open(word_file, "a", encoding='utf-8') as f:
-                                    f.write(f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | {entry['category']}\n")
+                                append_entry(word_file, entry)
                                 
-                                # Remove from learned.json
-                                learned_words = load_learned_words()
-                                updated_learned = [w for w in learned_words if w['word'].lower() != entry['word'].lower()]
-                                save_learned_words_to_file(updated_learned)
+                                # Remove from data/learned.json
+                                delete_learned_word(entry['word'])
                                 
                                 st.success(f"'{entry['word']}' moved back to main vocabulary!")
                                 st.rerun()  # Refresh the page to update the list
@@ -805,10 +503,8 @@ if select == "📖 Study Mode":
                         # Delete button (available for all levels)
                         if st.button(f"🗑️ Delete", key=f"delete_{entry['word']}", help="Delete this word"):
                             if current_level == "learned":
-                                # Delete from learned.json
-                                learned_words = load_learned_words()
-                                updated_learned = [w for w in learned_words if w['word'].lower() != entry['word'].lower()]
-                                save_learned_words_to_file(updated_learned)
+                                # Delete from data/learned.json
+                                delete_learned_word(entry['word'])
                             else:
                                 # Delete from main vocabulary file
                                 delete_word_from_file(entry['word'], word_file)
@@ -856,11 +552,12 @@ elif select == "📊 Progress":
         
         # Difficulty distribution (if available)
         st.markdown("### ⭐ Difficulty Distribution")
-        difficulty_stats = {"⭐ Easy": 0, "⭐⭐ Medium": 0, "⭐⭐⭐ Hard": 0}
+        difficulty_stats = {label: 0 for label in DIFFICULTY_FILTERS}
+        star_labels = {stars: label for label, stars in DIFFICULTY_FILTERS.items()}
         for word in all_words:
-            diff = get_difficulty(word['word'])
-            if diff in difficulty_stats:
-                difficulty_stats[diff] += 1
+            diff = get_difficulty(word['word'], current_level)
+            if diff in star_labels:
+                difficulty_stats[star_labels[diff]] += 1
         
         diff_cols = st.columns(3)
         for i, (level, count) in enumerate(difficulty_stats.items()):
@@ -878,3 +575,5 @@ elif select == "📊 Progress":
 # Footer
 st.markdown("---")
 st.markdown("**Advanced 1 Features:** Phonetic transcription, difficulty levels, interactive quizzes, progress tracking")
+
+finish_run(profile_run)
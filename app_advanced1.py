@@ -1,381 +1,47 @@
 import streamlit as st 
+import logging
 import os
-import random
-from main import (
+from services import (
     load_word_pools, 
-    create_audio_file, 
+    get_audio, 
     load_vocabulary_from_file, 
+    load_category_from_file,
+    count_vocabulary_words,
     save_word_pools_to_file,
     filter_words_by_category,
     validate_word_entry,
-    cleanup_audio_file,
+    get_phonetic,
+    get_difficulty,
+    load_vocabulary_with_expressions,
+    QuizSession,
+    get_quiz_words,
+    grade_answer,
+    update_phrase_in_json,
+    get_user_store,
+    migrate_legacy_learned_file,
+    delete_word_from_file,
+    write_vocabulary,
+    append_entry,
+    DIFFICULTY_FILTERS,
     DEFAULT_CATEGORIES,
-    DEFAULT_VOCABULARY_FILE,
-    DIFFICULTY_LEVELS,
     LEVEL_DESCRIPTIONS,
     SPEED_OPTIONS,
-    SPEED_LABELS
+    SPEED_LABELS,
+    QUIZ_TYPES,
+    TYPED_QUIZ_TYPE,
+    CORRECT,
+    NEAR_MISS,
+    NO_ANSWER,
+    DEFAULT_OPTION_COUNT
 )
+from profiling import start_run, finish_run
+from importer import import_vocabulary
+from exporter import export_to_bytes, export_file_name, EXPORT_FORMATS, MIME_TYPES
+from answer_log import DEFAULT_USER
+from answer_analytics import hardest_words
+import instrumentation
 
-def update_phrase_in_file(word_to_update, new_phrase, word_file):
-    """Update the phrase for a specific word in the vocabulary file"""
-    # Read all lines
-    with open(word_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Update the specific word's phrase
-    updated_lines = []
-    updated = False
-    for line in lines:
-        if line.strip():
-            parts = line.strip().split(' | ')
-            if len(parts) >= 4 and parts[0].lower() == word_to_update.lower():
-                # Update the phrase (index 2)
-                parts[2] = new_phrase
-                updated_lines.append(' | '.join(parts) + '\n')
-                updated = True
-            else:
-                updated_lines.append(line)
-        else:
-            updated_lines.append(line)
-    
-    # Write back to file
-    if updated:
-        with open(word_file, 'w', encoding='utf-8') as f:
-            f.writelines(updated_lines)
-    
-    return updated
-
-def update_phrase_in_json(word_to_update, new_phrase, level):
-    """Update the phrase for a specific word in the JSON level files"""
-    import json
-    
-    if level == "learned":
-        return update_phrase_in_learned_json(word_to_update, new_phrase)
-    
-    # Map level to filename
-    level_files = {
-        1: "data/level1.json",
-        2: "data/level2.json", 
-        3: "data/level3.json",
-        4: "data/korean.json"
-    }
-    
-    filename = level_files.get(level)
-    if not filename or not os.path.exists(filename):
-        return False
-    
-    try:
-        # Read the JSON file
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Find and update the word's phrase
-        updated = False
-        for category, words in data.items():
-            for word_entry in words:
-                if word_entry.get('word', '').lower() == word_to_update.lower():
-                    word_entry['phrase'] = new_phrase
-                    updated = True
-                    break
-            if updated:
-                break
-        
-        # Write back to file if updated
-        if updated:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return updated
-    except (json.JSONDecodeError, FileNotFoundError, Exception):
-        return False
-
-def update_phrase_in_learned_json(word_to_update, new_phrase):
-    """Update the phrase for a specific word in the learned.json file"""
-    import json
-    
-    learned_file = "learned.json"
-    if not os.path.exists(learned_file):
-        return False
-    
-    try:
-        # Read the learned.json file
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Find and update the word's phrase
-        updated = False
-        for word_entry in learned_words:
-            if word_entry.get('word', '').lower() == word_to_update.lower():
-                word_entry['phrase'] = new_phrase
-                updated = True
-                break
-        
-        # Write back to file if updated
-        if updated:
-            with open(learned_file, 'w', encoding='utf-8') as f:
-                json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        
-        return updated
-    except (json.JSONDecodeError, FileNotFoundError, Exception):
-        return False
-
-# Phonetic transcriptions for vocabulary words
-PHONETICS = {
-    # General
-    "serendipity": "/ˌsɛrənˈdɪpɪti/",
-    "eloquent": "/ˈɛləkwənt/",
-    "resilient": "/rɪˈzɪliənt/",
-    "pragmatic": "/prægˈmætɪk/",
-    "ubiquitous": "/juˈbɪkwɪtəs/",
-    "meticulous": "/məˈtɪkjələs/",
-    "ephemeral": "/ɪˈfɛmərəl/",
-    "versatile": "/ˈvɜrsətaɪl/",
-    "ambiguous": "/æmˈbɪgjuəs/",
-    "innovative": "/ˈɪnəˌveɪtɪv/",
-    "tenacious": "/təˈneɪʃəs/",
-    "profound": "/prəˈfaʊnd/",
-    "subtle": "/ˈsʌtəl/",
-    "coherent": "/koʊˈhɪrənt/",
-    "diligent": "/ˈdɪlɪdʒənt/",
-    "intricate": "/ˈɪntrɪkət/",
-    "benevolent": "/bəˈnɛvələnt/",
-    "authentic": "/ɔˈθɛntɪk/",
-    "efficient": "/ɪˈfɪʃənt/",
-    "contemplative": "/kənˈtɛmplətɪv/",
-    
-    # Science
-    "hypothesis": "/haɪˈpɑθəsɪs/",
-    "catalyst": "/ˈkætəlɪst/",
-    "molecule": "/ˈmɑləˌkjul/",
-    "ecosystem": "/ˈikoʊˌsɪstəm/",
-    "photosynthesis": "/ˌfoʊtoʊˈsɪnθəsɪs/",
-    "chromosome": "/ˈkroʊməˌsoʊm/",
-    "quantum": "/ˈkwɑntəm/",
-    "biodiversity": "/ˌbaɪoʊdaɪˈvɜrsəti/",
-    "metabolism": "/məˈtæbəˌlɪzəm/",
-    "neuron": "/ˈnʊrɑn/",
-    "osmosis": "/ɑzˈmoʊsɪs/",
-    "mitosis": "/maɪˈtoʊsɪs/",
-    "genome": "/ˈdʒinoʊm/",
-    "thermodynamics": "/ˌθɜrmoʊdaɪˈnæmɪks/",
-    "evolution": "/ˌɛvəˈluʃən/",
-    "isotope": "/ˈaɪsəˌtoʊp/",
-    "enzyme": "/ˈɛnzaɪm/",
-    "gravity": "/ˈgrævəti/",
-    "radiation": "/ˌreɪdiˈeɪʃən/",
-    "symbiosis": "/ˌsɪmbaɪˈoʊsɪs/",
-    
-    # Business
-    "entrepreneur": "/ˌɑntrəprəˈnɜr/",
-    "revenue": "/ˈrɛvəˌnu/",
-    "stakeholder": "/ˈsteɪkˌhoʊldər/",
-    "portfolio": "/pɔrtˈfoʊlioʊ/",
-    "synergy": "/ˈsɪnərdʒi/",
-    "leverage": "/ˈlɛvərɪdʒ/",
-    "equity": "/ˈɛkwəti/",
-    "margin": "/ˈmɑrdʒən/",
-    "franchise": "/ˈfrænˌtʃaɪz/",
-    "diversification": "/daɪˌvɜrsəfəˈkeɪʃən/",
-    "acquisition": "/ˌækwəˈzɪʃən/",
-    "liability": "/ˌlaɪəˈbɪləti/",
-    "liquidate": "/ˈlɪkwəˌdeɪt/",
-    "compliance": "/kəmˈplaɪəns/",
-    "benchmark": "/ˈbɛnʧˌmɑrk/",
-    "scalable": "/ˈskeɪləbəl/",
-    "subsidiary": "/səbˈsɪdiˌɛri/",
-    "turnover": "/ˈtɜrnˌoʊvər/",
-    "valuation": "/ˌvæljuˈeɪʃən/",
-    
-    # Add more categories as needed...
-}
-
-# Difficulty levels for words
-DIFFICULTY_LEVELS = {
-    # General - Easy to Hard
-    "efficient": "⭐",
-    "authentic": "⭐",
-    "versatile": "⭐⭐",
-    "pragmatic": "⭐⭐",
-    "resilient": "⭐⭐",
-    "innovative": "⭐⭐",
-    "profound": "⭐⭐",
-    "coherent": "⭐⭐",
-    "diligent": "⭐⭐",
-    "benevolent": "⭐⭐⭐",
-    "eloquent": "⭐⭐⭐",
-    "meticulous": "⭐⭐⭐",
-    "ubiquitous": "⭐⭐⭐",
-    "ephemeral": "⭐⭐⭐",
-    "ambiguous": "⭐⭐⭐",
-    "tenacious": "⭐⭐⭐",
-    "subtle": "⭐⭐⭐",
-    "intricate": "⭐⭐⭐",
-    "contemplative": "⭐⭐⭐",
-    "serendipity": "⭐⭐⭐",
-    
-    # Science
-    "gravity": "⭐",
-    "molecule": "⭐",
-    "ecosystem": "⭐⭐",
-    "evolution": "⭐⭐",
-    "catalyst": "⭐⭐",
-    "enzyme": "⭐⭐",
-    "neuron": "⭐⭐",
-    "genome": "⭐⭐⭐",
-    "hypothesis": "⭐⭐⭐",
-    "photosynthesis": "⭐⭐⭐",
-    "chromosome": "⭐⭐⭐",
-    "quantum": "⭐⭐⭐",
-    "biodiversity": "⭐⭐⭐",
-    "metabolism": "⭐⭐⭐",
-    "osmosis": "⭐⭐⭐",
-    "mitosis": "⭐⭐⭐",
-    "thermodynamics": "⭐⭐⭐",
-    "isotope": "⭐⭐⭐",
-    "radiation": "⭐⭐⭐",
-    "symbiosis": "⭐⭐⭐",
-}
-
-def get_phonetic(word):
-    """Get phonetic transcription for a word"""
-    return PHONETICS.get(word.lower(), "")
-
-def get_difficulty(word):
-    """Get difficulty level for a word"""
-    return DIFFICULTY_LEVELS.get(word.lower(), "⭐⭐")
-
-def save_to_learned(word_entry, learned_file="learned.json"):
-    """Save a word entry to learned.json file"""
-    import json
-    
-    # Load existing learned words
-    learned_words = []
-    if os.path.exists(learned_file):
-        try:
-            with open(learned_file, 'r', encoding='utf-8') as f:
-                learned_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            learned_words = []
-    
-    # Add timestamp to the entry
-    import datetime
-    word_entry_with_timestamp = word_entry.copy()
-    word_entry_with_timestamp['learned_date'] = datetime.datetime.now().isoformat()
-    
-    # Check if word already exists in learned list
-    existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
-    if not existing_word:
-        learned_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(learned_file, 'w', encoding='utf-8') as f:
-            json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        return True
-    return False
-
-def load_learned_words(learned_file="learned.json"):
-    """Load learned words from learned.json and convert to vocabulary format"""
-    import json
-    
-    if not os.path.exists(learned_file):
-        return []
-    
-    try:
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Convert to the same format as regular vocabulary
-        formatted_words = []
-        for word_entry in learned_words:
-            formatted_word = {
-                'word': word_entry.get('word', ''),
-                'meaning': word_entry.get('meaning', ''),
-                'phrase': word_entry.get('phrase', ''),
-                'category': word_entry.get('category', 'general'),
-                'learned_date': word_entry.get('learned_date', '')
-            }
-            formatted_words.append(formatted_word)
-        
-        return formatted_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def save_learned_words_to_file(learned_words, learned_file="learned.json"):
-    """Save learned words back to JSON file"""
-    import json
-    
-    with open(learned_file, 'w', encoding='utf-8') as f:
-        json.dump(learned_words, f, ensure_ascii=False, indent=2)
-    
-    return True
-
-def delete_word_from_file(word_to_delete, word_file):
-    """Delete a word from the vocabulary file"""
-    # Read all lines
-    with open(word_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Filter out the word to delete
-    updated_lines = []
-    for line in lines:
-        if line.strip():
-            parts = line.strip().split(' | ')
-            if len(parts) >= 1 and parts[0].lower() != word_to_delete.lower():
-                updated_lines.append(line)
-    
-    # Write back to file
-    with open(word_file, 'w', encoding='utf-8') as f:
-        f.writelines(updated_lines)
-    
-    return True
-
-def load_vocabulary_with_expressions(level):
-    """Load vocabulary from JSON files with expressions included"""
-    import json
-    
-    if level == "learned":
-        return load_learned_words()
-    
-    # Map level to filename
-    level_files = {
-        1: "level1.json",
-        2: "level2.json", 
-        3: "level3.json"
-    }
-    
-    filename = level_files.get(level)
-    if not filename or not os.path.exists(filename):
-        return []
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
-        
-        return all_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def generate_quiz_question(words, correct_word):
-    """Generate a multiple choice quiz question"""
-    options = [correct_word]
-    other_words = [w for w in words if w['word'] != correct_word['word']]
-    
-    # Add 3 random wrong options
-    wrong_options = random.sample(other_words, min(3, len(other_words)))
-    for word in wrong_options:
-        options.append(word)
-    
-    random.shuffle(options)
-    return options
+logger = logging.getLogger(__name__)
 
 # Configure the app
 st.set_page_config(
@@ -384,6 +50,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# Profile this script run when requested with ?profile=1 or VOCAB_PROFILE=1
+profile_run = start_run(__file__)
+
+# Learned words moved from ./learned.json to data/learned.json
+migrate_legacy_learned_file()
+
 # Custom CSS to increase base font size by 80% for senior users (30% + 50% additional)
 st.markdown("""
 <style>
@@ -583,6 +255,16 @@ st.subheader("Perfect for intermediate ESL learners")
 # Main Menu Navigation
 st.sidebar.title("🎯 Advanced Navigation")
 
+# Learner login: each user has their own learned words, answer history and word list
+user_name = st.sidebar.text_input("👤 User", value=st.session_state.get('user_id', DEFAULT_USER))
+try:
+    user_store = get_user_store(user_name)
+except ValueError:
+    st.sidebar.error("User names may only use letters, digits, _ . @ and -")
+    user_store = get_user_store(st.session_state.get('user_id', DEFAULT_USER))
+st.session_state.user_id = user_store.user_id
+user_store.ensure_directory()
+
 # Level Selection
 st.sidebar.markdown("### 🎯 Select Your Learning Level")
 level_col1, level_col2, level_col3, level_col4, level_col5 = st.sidebar.columns(5)
@@ -621,20 +303,18 @@ else:
     st.info(f"🎯 **Current Level: {current_level}** - {LEVEL_DESCRIPTIONS[level_key]}")
 
 # Configuration
-word_file = DEFAULT_VOCABULARY_FILE
+word_file = user_store.vocabulary_file
 category_list = DEFAULT_CATEGORIES
 
 # Load sample vocabulary button
 col1, col2 = st.columns(2)
 with col1:
     if current_level == "learned":
-        if st.button(f"📚 Load Learned Words", help="Load your learned vocabulary from learned.json"):
-            learned_words = load_learned_words()
+        if st.button(f"📚 Load Learned Words", help="Load your learned vocabulary from data/learned.json"):
+            learned_words = user_store.load_learned_words()
             if learned_words:
                 # Convert learned words to the standard vocabulary format and save to the working file
-                with open(word_file, "w", encoding='utf-8') as f:
-                    for word_entry in learned_words:
-                        f.write(f"{word_entry['word']} | {word_entry['meaning']} | {word_entry['phrase']} | {word_entry['category']}\n")
+                write_vocabulary(word_file, learned_words)
                 st.success(f"✅ Successfully loaded {len(learned_words)} learned words!")
                 st.info("Navigate to other sections to review your learned vocabulary.")
             else:
@@ -647,7 +327,7 @@ with col1:
                 success = save_word_pools_to_file(word_pools, word_file)
                 if success:
                     word_length = len(load_vocabulary_from_file(word_file))
-                    print(f"Total words saved to {word_file}: {word_length}")
+                    logger.info("Total words saved to %s: %d", word_file, word_length)
                     st.success(f"✅ Successfully loaded Level {current_level} vocabulary across all categories!")
                     #st.info("Navigate to other sections to explore the features.")
                 else:
@@ -657,9 +337,9 @@ with col1:
 
 with col2:
     # Statistics display
-    all_words = load_vocabulary_from_file(word_file)
-    if all_words:
-        st.metric("📊 Total Words", len(all_words))
+    total_words = count_vocabulary_words(word_file)
+    if total_words:
+        st.metric("📊 Total Words", total_words)
 
 # Main navigation
 select = st.sidebar.radio("Select Learning Mode", [
@@ -688,10 +368,18 @@ if select in ["📖 Study Mode", "🎯 Quiz Mode"]:
         st.sidebar.markdown("🎯 **Quiz Type:**")
         quiz_type = st.sidebar.radio(
             "Quiz Type Selection",
-            ["Meaning → Word", "Word → Meaning"],
+            QUIZ_TYPES + [TYPED_QUIZ_TYPE],
             key="quiz_type_radio",
             label_visibility="hidden"
         )
+        
+        # Round settings: the question deck is drawn up front for the whole round
+        round_length = st.sidebar.selectbox("Questions per Round", [10, 20, "All"], index=1)
+        time_limit = st.sidebar.selectbox(
+            "Round Timer",
+            [None, 60, 180, 300],
+            format_func=lambda x: "Untimed" if x is None else f"{x // 60} min" if x >= 60 else f"{x} sec"
+        )
 
 if select == "📖 Study Mode":
     st.subheader("📖 Enhanced Study Mode")
@@ -704,13 +392,12 @@ if select == "📖 Study Mode":
     )
     
     if selected_category:
-        # Load vocabulary from vocabulary.txt for Study Mode
-        all_words = load_vocabulary_from_file(word_file)
-        filtered_words = filter_words_by_category(all_words, selected_category)
+        # Load only the selected category from vocabulary.txt for Study Mode
+        filtered_words = load_category_from_file(word_file, selected_category)
         # Apply difficulty filter
         if difficulty_filter != "All Levels":
-            target_level = difficulty_filter
-            filtered_words = [w for w in filtered_words if get_difficulty(w['word']) == target_level]
+            target_level = DIFFICULTY_FILTERS[difficulty_filter]
+            filtered_words = [w for w in filtered_words if get_difficulty(w['word'], current_level) == target_level]
         if filtered_words:
             st.info(f"📚 Showing {len(filtered_words)} words from {selected_category}")
             for entry in filtered_words:
@@ -718,7 +405,7 @@ if select == "📖 Study Mode":
                     col1, col2 = st.columns([4, 1])
                     
                     with col1:
-                        difficulty = get_difficulty(entry['word'])
+                        difficulty = get_difficulty(entry['word'], current_level)
                         
                         # Simple card with visual border using Streamlit components
                         with st.container():
@@ -728,6 +415,11 @@ if select == "📖 Study Mode":
                             # Word title with emoji
                             st.markdown(f"### 📚 {entry['word']} {difficulty}")
                             
+                            # Phonetic transcription if available
+                            phonetic = get_phonetic(entry['word'])
+                            if phonetic:
+                                st.markdown(f"*{phonetic}*")
+                            
                             # Meaning
                             st.markdown(f"**Meaning:** {entry['meaning']}")
                             
@@ -783,7 +475,8 @@ if select == "📖 Study Mode":
                                 with col_save:
                                     if st.button("💾 Save", key=f"save_{entry['word']}"):
                                         if new_phrase.strip():
-                                            success = update_phrase_in_json(entry['word'], new_phrase.strip(), current_level)
+                                            success = update_phrase_in_json(entry['word'], new_phrase.strip(), current_level,
+                                                                            user_store.learned_file)
                                             if success:
                                                 st.success(f"✅ Phrase updated for '{entry['word']}'!")
                                                 # Clear editing state
@@ -812,24 +505,16 @@ if select == "📖 Study Mode":
                         
                         # Play buttons
                         if st.button(f"🔊 Word", key=f"word_{entry['word']}"):
-                            audio_file = create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    # Detect audio format based on file extension
-                                    audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                    st.audio(audio.read(), format=audio_format)
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['word'], is_phrase=False, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
                         
                         if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}"):
-                            audio_file = create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    # Detect audio format based on file extension
-                                    audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                    st.audio(audio.read(), format=audio_format)
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['phrase'], is_phrase=True, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
                         
@@ -841,20 +526,17 @@ if select == "📖 Study Mode":
                             # Move back to vocabulary button for learned words
                             if st.button(f"↩️ Move Back", key=f"moveback_{entry['word']}", help="Move back to main vocabulary"):
                                 # Add word back to main vocabulary file
-                                with open(word_file, "a", encoding='utf-8') as f:
-                                    f.write(f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | {entry['category']}\n")
+                                append_entry(word_file, entry)
                                 
-                                # Remove from learned.json
-                                learned_words = load_learned_words()
-                                updated_learned = [w for w in learned_words if w['word'].lower() != entry['word'].lower()]
-                                save_learned_words_to_file(updated_learned)
+                                # Remove from data/learned.json
+                                user_store.delete_learned_word(entry['word'])
                                 
                                 st.success(f"'{entry['word']}' moved back to main vocabulary!")
                                 st.rerun()  # Refresh the page to update the list
                         else:
                             # Learned button for regular levels
                             if st.button(f"✅ Learned", key=f"learned_{entry['word']}", help="Move to learned words"):
-                                success = save_to_learned(entry)
+                                success = user_store.save_to_learned(entry)
                                 if success:
                                     delete_word_from_file(entry['word'], word_file)
                                     st.success(f"'{entry['word']}' moved to learned words!")
@@ -865,10 +547,8 @@ if select == "📖 Study Mode":
                         # Delete button (available for all levels)
                         if st.button(f"🗑️ Delete", key=f"delete_{entry['word']}", help="Delete this word"):
                             if current_level == "learned":
-                                # Delete from learned.json
-                                learned_words = load_learned_words()
-                                updated_learned = [w for w in learned_words if w['word'].lower() != entry['word'].lower()]
-                                save_learned_words_to_file(updated_learned)
+                                # Delete from data/learned.json
+                                user_store.delete_learned_word(entry['word'])
                             else:
                                 # Delete from main vocabulary file
                                 delete_word_from_file(entry['word'], word_file)
@@ -886,12 +566,14 @@ elif select == "🎯 Quiz Mode":
         st.session_state.quiz_score = 0
     if 'quiz_total' not in st.session_state:
         st.session_state.quiz_total = 0
-    if 'current_question' not in st.session_state:
-        st.session_state.current_question = None
+    if 'quiz_session' not in st.session_state:
+        st.session_state.quiz_session = None
     
-    # Load words for quiz using sidebar selections with expressions
-    all_words = load_vocabulary_with_expressions(current_level)
-    quiz_words = filter_words_by_category(all_words, selected_category)
+    # Word pool for the quiz: a cached corpus category, or the learned words
+    quiz_words = get_quiz_words(current_level, selected_category)
+    if quiz_words is None:
+        quiz_words = filter_words_by_category(
+            load_vocabulary_with_expressions(current_level, user_store.learned_file), selected_category)
     
     # Display current quiz settings
     st.info(f"📚 **Category:** {selected_category} | 🎯 **Quiz Type:** {quiz_type}")
@@ -902,63 +584,96 @@ elif select == "🎯 Quiz Mode":
             accuracy = (st.session_state.quiz_score / st.session_state.quiz_total) * 100
             st.metric("Quiz Accuracy", f"{accuracy:.1f}%", f"{st.session_state.quiz_score}/{st.session_state.quiz_total}")
         
-        # Generate new question button
-        if st.button("🎲 New Question") or st.session_state.current_question is None:
-            correct_word = random.choice(quiz_words)
-            options = generate_quiz_question(quiz_words, correct_word)
-            st.session_state.current_question = {
-                'correct': correct_word,
-                'options': options,
-                'answered': False
-            }
+        # Build a new deck when the pool or the round settings changed
+        quiz_session = st.session_state.quiz_session
+        deck_size = None if round_length == "All" else round_length
+        # Typed answers need no distractors: the only option is the answer itself
+        option_count = 1 if quiz_type == TYPED_QUIZ_TYPE else DEFAULT_OPTION_COUNT
+        new_round = st.button("🔄 New Round")
+        if (new_round or quiz_session is None
+                or not quiz_session.matches(current_level, selected_category, len(quiz_words))
+                or quiz_session.deck_size != (deck_size or len(quiz_words))
+                or quiz_session.option_count != option_count
+                or quiz_session.time_limit != time_limit):
+            quiz_session = QuizSession(current_level, selected_category, len(quiz_words),
+                                       deck_size=deck_size, option_count=option_count, time_limit=time_limit)
+            st.session_state.quiz_session = quiz_session
+        
+        # Next question button
+        if st.button("🎲 New Question"):
+            quiz_session.next_question()
         
-        # Display current question
-        if st.session_state.current_question:
-            question = st.session_state.current_question
-            correct_word = question['correct']
+        # Round progress
+        round_info = f"Question {min(quiz_session.position + 1, quiz_session.deck_size)} of {quiz_session.deck_size} | Round score: {quiz_session.score}/{quiz_session.total}"
+        if quiz_session.time_limit is not None:
+            round_info += f" | ⏱️ {int(quiz_session.time_remaining())}s left"
+        st.caption(round_info)
+        
+        if quiz_session.finished:
+            if quiz_session.expired:
+                st.warning("⏱️ Time is up for this round!")
+            st.success(f"🏁 Round complete! You scored {quiz_session.score}/{quiz_session.total}. Press 🔄 New Round to play again.")
+        else:
+            correct_word, question_options = quiz_session.current_question(quiz_words)
             
-            if quiz_type == "Meaning → Word":
+            if quiz_type in ("Meaning → Word", TYPED_QUIZ_TYPE):
                 st.markdown(f'<h3 style="font-size: 2.4em;">What word has this meaning?</h3>', unsafe_allow_html=True)
                 st.markdown(f'<div style="background-color: #d1ecf1; padding: 15px; border-radius: 10px; border-left: 5px solid #0c5460; font-size: 1.95em;"><strong>Meaning:</strong> {correct_word["meaning"]}</div>', unsafe_allow_html=True)
                 
                 # Multiple choice options
-                option_labels = [opt['word'] for opt in question['options']]
+                option_labels = [opt['word'] for opt in question_options]
             else:  # Word → Meaning
                 st.markdown(f'<h3 style="font-size: 2.4em;">What is the meaning of: <strong>{correct_word["word"]}</strong></h3>', unsafe_allow_html=True)
                 
                 # Multiple choice options
-                option_labels = [opt['meaning'] for opt in question['options']]
+                option_labels = [opt['meaning'] for opt in question_options]
             
-            # Radio button for answer selection
-            if not question['answered']:
-                st.markdown('<p style="font-size: 1.95em; font-weight: bold; margin-top: 20px;">Choose your answer:</p>', unsafe_allow_html=True)
-                selected_answer = st.radio(
-                    "Answer Selection",
-                    option_labels,
-                    key="quiz_answer",
-                    label_visibility="hidden"
-                )
+            # Text box (typed answers) or radio button for answer selection
+            if not quiz_session.answered:
+                if quiz_type == TYPED_QUIZ_TYPE:
+                    st.markdown('<p style="font-size: 1.95em; font-weight: bold; margin-top: 20px;">Type your answer:</p>', unsafe_allow_html=True)
+                    typed_answer = st.text_input(
+                        "Answer",
+                        key=f"quiz_typed_{quiz_session.position}",
+                        label_visibility="hidden"
+                    )
+                else:
+                    st.markdown('<p style="font-size: 1.95em; font-weight: bold; margin-top: 20px;">Choose your answer:</p>', unsafe_allow_html=True)
+                    selected_position = st.radio(
+                        "Answer Selection",
+                        range(len(option_labels)),
+                        format_func=lambda i: option_labels[i],
+                        key=f"quiz_answer_{quiz_session.position}",
+                        label_visibility="hidden"
+                    )
                 
                 if st.button("✅ Submit Answer"):
-                    # Check if answer is correct
-                    if quiz_type == "Meaning → Word":
-                        is_correct = selected_answer == correct_word['word']
+                    latency_ms = quiz_session.latency_ms()
+                    grade = None
+                    if quiz_type == TYPED_QUIZ_TYPE:
+                        # Fuzzy grading: only an exact match (after normalization) scores
+                        grade = grade_answer(typed_answer, correct_word['word'])
+                        is_correct = quiz_session.answer(0 if grade.verdict == CORRECT else NO_ANSWER)
+                        chosen = typed_answer
                     else:
-                        is_correct = selected_answer == correct_word['meaning']
+                        # Check if answer is correct (index comparison against the deck)
+                        is_correct = quiz_session.answer(selected_position)
+                        chosen = question_options[selected_position]['word']
+                    user_store.log_answer(current_level, selected_category, correct_word['word'], quiz_type,
+                                          chosen, is_correct, latency_ms)
                     
                     # Update score
                     st.session_state.quiz_total += 1
                     if is_correct:
                         st.session_state.quiz_score += 1
                         st.success("🎉 Correct! Well done!")
+                    elif grade is not None and grade.verdict == NEAR_MISS:
+                        st.warning(f"✏️ Almost! Check the spelling: **{correct_word['word']}**")
                     else:
-                        st.error(f"❌ Incorrect. The correct answer was: **{correct_word['word'] if quiz_type == 'Meaning → Word' else correct_word['meaning']}**")
-                    
-                    # Mark as answered
-                    st.session_state.current_question['answered'] = True
+                        st.error(f"❌ Incorrect. The correct answer was: **{correct_word['meaning'] if quiz_type == 'Word → Meaning' else correct_word['word']}**")
                     
                     # Show word details with new structure
-                    difficulty = get_difficulty(correct_word['word'])
+                    difficulty = get_difficulty(correct_word['word'], current_level)
                     
                     # Simple quiz result card
                     st.success("Word Details:")
@@ -1028,14 +743,41 @@ elif select == "➕ Add Word":
         if is_valid:
             st.success(f"Word '{word}' added successfully!")
             # Note: In a full implementation, you'd also save the phonetic and difficulty data
-            with open(word_file, "a", encoding='utf-8') as f:
-                f.write(f"{word} | {meaning} | {phrase} | {category.lower()}\n")
+            append_entry(word_file, {'word': word, 'meaning': meaning, 'phrase': phrase, 'category': category.lower()})
         else:
             st.error(error_msg)
+    
+    # Bulk import into the level files
+    st.markdown("---")
+    st.markdown("### 📥 Bulk Import")
+    st.caption("CSV, XLSX or JSON Lines with word, meaning, phrase and category columns (expressions separated by ';')")
+    import_col1, import_col2 = st.columns(2)
+    with import_col1:
+        import_file = st.file_uploader("Word list", type=["csv", "tsv", "xlsx", "jsonl"])
+    with import_col2:
+        import_level = st.selectbox("Import into Level", [1, 2, 3, "Korean"], index=[1, 2, 3, "Korean"].index(current_level) if current_level in [1, 2, 3, "Korean"] else 0)
+        import_category = st.selectbox("Category for rows without one", category_list)
+        import_dry_run = st.checkbox("Dry run (validate only)")
+    
+    if import_file is not None and st.button("📥 Import Words"):
+        try:
+            with st.spinner("Importing..."):
+                result = import_vocabulary(import_file, import_level, default_category=import_category, dry_run=import_dry_run)
+        except (OSError, ValueError, ImportError) as e:
+            st.error(f"❌ Import failed: {e}")
+        else:
+            st.success(f"✅ {result.summary()}")
+            if result.errors:
+                st.warning("\n".join(f"Row {row_number}: {message}" for row_number, message in result.errors[:20]))
 
 elif select == "📊 Progress":
     st.subheader("📊 Learning Progress & Statistics")
     
+    # Quiz counters are created by Quiz Mode; the page can be opened before it
+    if 'quiz_total' not in st.session_state:
+        st.session_state.quiz_score = 0
+        st.session_state.quiz_total = 0
+    
     all_words = load_vocabulary_from_file(word_file)
     
     if all_words:
@@ -1070,17 +812,46 @@ elif select == "📊 Progress":
         
         # Difficulty distribution (if available)
         st.markdown("### ⭐ Difficulty Distribution")
-        difficulty_stats = {"⭐ Easy": 0, "⭐⭐ Medium": 0, "⭐⭐⭐ Hard": 0}
+        difficulty_stats = {label: 0 for label in DIFFICULTY_FILTERS}
+        star_labels = {stars: label for label, stars in DIFFICULTY_FILTERS.items()}
         for word in all_words:
-            diff = get_difficulty(word['word'])
-            if diff in difficulty_stats:
-                difficulty_stats[diff] += 1
+            diff = get_difficulty(word['word'], current_level)
+            if diff in star_labels:
+                difficulty_stats[star_labels[diff]] += 1
         
         diff_cols = st.columns(3)
         for i, (level, count) in enumerate(difficulty_stats.items()):
             with diff_cols[i]:
                 st.metric(level, count)
         
+        # Answer history from the persistent quiz log
+        st.markdown("### 📒 Answer History")
+        progress = user_store.get_progress()
+        summary = progress['summary']
+        if summary['total']:
+            current_streak, best_streak = progress['streaks']
+            hist_cols = st.columns(4)
+            with hist_cols[0]:
+                st.metric("Answers Logged", summary['total'])
+            with hist_cols[1]:
+                st.metric("All-time Accuracy", f"{summary['accuracy']:.1f}%")
+            with hist_cols[2]:
+                st.metric("Current Streak", current_streak, f"Best: {best_streak}", delta_color="off")
+            with hist_cols[3]:
+                st.metric("Avg. Answer Time", f"{summary['average_latency_ms'] / 1000:.1f}s")
+            
+            st.markdown("**Accuracy by Category**")
+            for category, (right, attempts) in sorted(progress['categories'].items()):
+                st.progress(right / attempts, text=f"{category.title()}: {right}/{attempts} ({right / attempts * 100:.0f}%)")
+            
+            hardest = hardest_words(progress['error_rates'], limit=10)
+            if hardest:
+                st.markdown("**Most Missed Words**")
+                for word, errors, attempts in hardest:
+                    st.markdown(f"• **{word}** — missed {errors} of {attempts}")
+        else:
+            st.info("Answer some quiz questions to build your answer history.")
+        
         # Reset progress button
         if st.button("🔄 Reset Quiz Progress"):
             st.session_state.quiz_score = 0
@@ -1088,7 +859,37 @@ elif select == "📊 Progress":
             st.success("Quiz progress reset!")
     else:
         st.info("Load vocabulary words to see progress statistics.")
+    
+    # Export to other tools
+    st.markdown("---")
+    st.markdown("### 📤 Export Vocabulary")
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        export_level = st.selectbox("Words to export", ["learned", 1, 2, 3, "Korean"],
+                                    format_func=lambda x: "Learned Words" if x == "learned" else f"Level {x}")
+    with export_col2:
+        export_format = st.selectbox("Format", EXPORT_FORMATS,
+                                     format_func=lambda x: {"csv": "CSV", "jsonl": "JSON Lines", "apkg": "Anki Deck (.apkg)"}[x])
+    
+    if st.button("📤 Prepare Export"):
+        with st.spinner("Exporting..."):
+            data, exported = export_to_bytes(export_level, export_format, learned_file=user_store.learned_file)
+        st.session_state.export_file = (data, export_file_name(export_level, export_format), MIME_TYPES[export_format], exported)
+    
+    if st.session_state.get('export_file'):
+        data, file_name, mime, exported = st.session_state.export_file
+        st.download_button(f"⬇️ Download {file_name} ({exported} words)", data, file_name=file_name, mime=mime)
+
+# Timing metrics of this process (VOCAB_METRICS=1)
+if instrumentation.ENABLED:
+    with st.sidebar.expander("⏱️ Performance Metrics"):
+        for operation, stats in sorted(instrumentation.get_metrics()['operations'].items()):
+            st.caption(f"{operation}: {stats['calls']} calls, {stats['mean_seconds'] * 1000:.1f} ms avg")
+        st.download_button("Download JSON", instrumentation.render_json(), file_name="metrics.json", mime="application/json")
+        st.download_button("Download Prometheus", instrumentation.render_prometheus(), file_name="metrics.prom", mime="text/plain")
 
 # Footer
 st.markdown("---")
-st.markdown("**Advanced 1 Features:** Phonetic transcription, difficulty levels, interactive quizzes, progress tracking")
\ No newline at end of file
+st.markdown("**Advanced 1 Features:** Phonetic transcription, difficulty levels, interactive quizzes, progress tracking")
+
+finish_run(profile_run)
@@ -1,50 +1,20 @@
 import streamlit as st 
 import os
-from main import (
+from services import (
     load_word_pools, 
-    create_audio_file, 
-    load_vocabulary_from_file, 
+    get_audio, 
+    load_category_from_file,
     save_word_pools_to_file,
-    filter_words_by_category,
     validate_word_entry,
-    cleanup_audio_file,
     DEFAULT_CATEGORIES,
     DEFAULT_VOCABULARY_FILE,
-    DIFFICULTY_LEVELS,
     LEVEL_DESCRIPTIONS,
     SPEED_OPTIONS,
-    SPEED_LABELS
+    SPEED_LABELS,
+    update_phrase_in_file,
+    append_entry
 ) 
 
-def update_phrase_in_file(word_to_update, new_phrase, word_file):
-    """Update the phrase for a specific word in the vocabulary file"""
-    # Read all lines
-    with open(word_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Update the specific word's phrase
-    updated_lines = []
-    updated = False
-    for line in lines:
-        if line.strip():
-            parts = line.strip().split(' | ')
-            if len(parts) >= 4 and parts[0].lower() == word_to_update.lower():
-                # Update the phrase (index 2)
-                parts[2] = new_phrase
-                updated_lines.append(' | '.join(parts) + '\n')
-                updated = True
-            else:
-                updated_lines.append(line)
-        else:
-            updated_lines.append(line)
-    
-    # Write back to file
-    if updated:
-        with open(word_file, 'w', encoding='utf-8') as f:
-            f.writelines(updated_lines)
-    
-    return updated
-
 st.title("My Vocabulary Builder")
 
 st.header("Welcome to My Vocabulary Builder!")
@@ -113,8 +83,7 @@ if select == "Add Word":
             st.success(f"Word '{word}' added successfully!")
             if phrase:
                 # Append to file
-                with open(word_file, "a", encoding='utf-8') as f:
-                    f.write(f"{word} | {meaning} | {phrase} | {category}\n")
+                append_entry(word_file, {'word': word, 'meaning': meaning, 'phrase': phrase, 'category': category})
         else:
             st.error(error_msg)
             
@@ -134,11 +103,8 @@ elif select == "View Words":
     st.subheader(f"Here are the words in your vocabulary list for {selected_category}:")
     
     if selected_category:
-        # Load words from file using main.py function
-        all_words = load_vocabulary_from_file(word_file)
-        
-        # Filter words by category using main.py function
-        filtered_words = filter_words_by_category(all_words, selected_category)
+        # Load only the selected category using main.py function
+        filtered_words = load_category_from_file(word_file, selected_category)
         
         if filtered_words:
             for entry in filtered_words:
@@ -226,21 +192,17 @@ elif select == "View Words":
                         
                         # Play button for the word
                         if st.button(f"🔊 Word", key=f"word_{entry['word']}"):
-                            audio_file = create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    st.audio(audio.read(), format='audio/wav')
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['word'], is_phrase=False, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
                         
                         # Play button for the phrase
                         if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}"):
-                            audio_file = create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as audio:
-                                    st.audio(audio.read(), format='audio/wav')
-                                cleanup_audio_file(audio_file)
+                            audio = get_audio(entry['phrase'], is_phrase=True, speed=selected_speed)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
                             else:
                                 st.error("Audio generation failed")
         else:
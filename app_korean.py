@@ -1,251 +1,368 @@
-import streamlit as st 
-import json
-import os
-import random
-from main import (
-    create_audio_file, 
-    cleanup_audio_file,
-    SPEED_OPTIONS,
-    SPEED_LABELS
-)
-
-def load_korean_vocabulary():
-    """Load vocabulary from korean.json file"""
-    korean_file = 'data/korean.json'
-    if os.path.exists(korean_file):
-        with open(korean_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def display_media_content(word):
-    """Display image/video if available for the word"""
-    media_folder = 'media'
-    if not os.path.exists(media_folder):
-        return
-    
-    # Look for image files
-    for ext in ['.jpg', '.jpeg', '.png', '.gif']:
-        image_path = os.path.join(media_folder, f"{word.lower()}{ext}")
-        if os.path.exists(image_path):
-            st.image(image_path, caption=f"Image for: {word}", use_column_width=True)
-            return
-    
-    # Look for video files
-    for ext in ['.mp4', '.avi', '.mov']:
-        video_path = os.path.join(media_folder, f"{word.lower()}{ext}")
-        if os.path.exists(video_path):
-            st.video(video_path)
-            return
-
-def korean_study_mode():
-    """Korean vocabulary study mode"""
-    korean_data = load_korean_vocabulary()
-    
-    if not korean_data:
-        st.error("Korean vocabulary file (korean.json) not found!")
-        return
-    
-    st.header("🇰🇷 Korean Vocabulary Study")
-    
-    # Category selection
-    categories = list(korean_data.keys())
-    selected_category = st.selectbox("Choose a category:", categories)
-    
-    if selected_category and selected_category in korean_data:
-        words = korean_data[selected_category]
-        
-        if words:
-            # Word selection
-            word_options = [f"{word['word']} ({word.get('meaning', 'No meaning')})" for word in words]
-            selected_word_index = st.selectbox("Choose a word:", range(len(word_options)), 
-                                             format_func=lambda x: word_options[x])
-            
-            if selected_word_index is not None:
-                word_data = words[selected_word_index]
-                
-                # Display word information
-                col1, col2 = st.columns([1, 1])
-                
-                with col1:
-                    st.subheader("📝 Word Information")
-                    st.write(f"**Korean Word:** {word_data['word']}")
-                    st.write(f"**English Meaning:** {word_data.get('meaning', 'No meaning provided')}")
-                    
-                    # Display phrase
-                    if 'phrase' in word_data:
-                        st.write("**English Phrase:**")
-                        st.info(word_data['phrase'])
-                    
-                    # Display Korean phrase if available
-                    if 'korean_phrase' in word_data:
-                        st.write("**Korean Phrase:**")
-                        st.success(word_data['korean_phrase'])
-                
-                with col2:
-                    # Display media content
-                    display_media_content(word_data['word'])
-                    
-                    # Audio controls
-                    st.subheader("🔊 Audio")
-                    
-                    # Speed selection
-                    speed_key = st.selectbox("Select speech speed:", 
-                                           SPEED_OPTIONS, 
-                                           format_func=lambda x: SPEED_LABELS[x])
-                    speed = 1.0 if speed_key == "normal" else float(speed_key)
-                    
-                    col_audio1, col_audio2 = st.columns(2)
-                    
-                    with col_audio1:
-                        # Korean word audio
-                        if st.button("🎵 Play Korean Word"):
-                            audio_file = create_audio_file(word_data['word'], speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as f:
-                                    st.audio(f.read(), format='audio/mp3')
-                                cleanup_audio_file(audio_file)
-                    
-                    with col_audio2:
-                        # Korean phrase audio
-                        if st.button("🎵 Play Korean Phrase") and 'korean_phrase' in word_data:
-                            audio_file = create_audio_file(word_data['korean_phrase'], speed)
-                            if audio_file and os.path.exists(audio_file):
-                                with open(audio_file, 'rb') as f:
-                                    st.audio(f.read(), format='audio/mp3')
-                                cleanup_audio_file(audio_file)
-                
-                # Display expressions
-                st.subheader("💬 Expressions")
-                
-                if 'expressions' in word_data and word_data['expressions']:
-                    col_expr1, col_expr2 = st.columns(2)
-                    
-                    with col_expr1:
-                        st.write("**English Expressions:**")
-                        for expr in word_data['expressions']:
-                            st.write(f"• {expr}")
-                    
-                    with col_expr2:
-                        if 'korean_expressions' in word_data and word_data['korean_expressions']:
-                            st.write("**Korean Expressions:**")
-                            for expr in word_data['korean_expressions']:
-                                st.write(f"• {expr}")
-
-def korean_quiz_mode():
-    """Korean vocabulary quiz mode"""
-    korean_data = load_korean_vocabulary()
-    
-    if not korean_data:
-        st.error("Korean vocabulary file (korean.json) not found!")
-        return
-    
-    st.header("🧠 Korean Vocabulary Quiz")
-    
-    # Category selection for quiz
-    categories = list(korean_data.keys())
-    selected_category = st.selectbox("Choose quiz category:", categories, key="quiz_category")
-    
-    if selected_category and selected_category in korean_data:
-        words = korean_data[selected_category]
-        
-        if len(words) < 4:
-            st.warning("Need at least 4 words in category for quiz mode.")
-            return
-        
-        if st.button("🎯 Start New Quiz"):
-            # Initialize quiz session
-            quiz_word = random.choice(words)
-            other_words = [w for w in words if w['word'] != quiz_word['word']]
-            wrong_answers = random.sample(other_words, min(3, len(other_words)))
-            
-            # Store in session state
-            st.session_state.quiz_word = quiz_word
-            st.session_state.quiz_options = [quiz_word] + wrong_answers
-            random.shuffle(st.session_state.quiz_options)
-            st.session_state.quiz_answered = False
-            st.session_state.quiz_score = getattr(st.session_state, 'quiz_score', 0)
-            st.session_state.quiz_total = getattr(st.session_state, 'quiz_total', 0)
-        
-        # Display quiz if active
-        if hasattr(st.session_state, 'quiz_word') and not st.session_state.get('quiz_answered', False):
-            quiz_word = st.session_state.quiz_word
-            
-            st.subheader("Question:")
-            st.write(f"**English Meaning:** {quiz_word['meaning']}")
-            
-            if 'phrase' in quiz_word:
-                st.write(f"**Example Phrase:** {quiz_word['phrase']}")
-            
-            st.write("**What is the Korean word?**")
-            
-            # Quiz options
-            for i, option in enumerate(st.session_state.quiz_options):
-                if st.button(f"{chr(65+i)}. {option['word']}", key=f"option_{i}"):
-                    st.session_state.quiz_total += 1
-                    
-                    if option['word'] == quiz_word['word']:
-                        st.session_state.quiz_score += 1
-                        st.success(f"✅ Correct! The answer is: {quiz_word['word']}")
-                        
-                        # Play audio for correct answer
-                        audio_file = create_audio_file(quiz_word['word'], 1.0)
-                        if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, 'rb') as f:
-                                st.audio(f.read(), format='audio/mp3')
-                            cleanup_audio_file(audio_file)
-                    else:
-                        st.error(f"❌ Wrong! The correct answer is: {quiz_word['word']}")
-                    
-                    st.session_state.quiz_answered = True
-                    
-                    # Show score
-                    accuracy = (st.session_state.quiz_score / st.session_state.quiz_total) * 100
-                    st.info(f"Score: {st.session_state.quiz_score}/{st.session_state.quiz_total} ({accuracy:.1f}%)")
-        
-        elif hasattr(st.session_state, 'quiz_score'):
-            # Show current score
-            accuracy = (st.session_state.quiz_score / max(st.session_state.quiz_total, 1)) * 100
-            st.info(f"Current Score: {st.session_state.quiz_score}/{st.session_state.quiz_total} ({accuracy:.1f}%)")
-
-def main():
-    st.set_page_config(
-        page_title="Korean Vocabulary Builder",
-        page_icon="🇰🇷",
-        layout="wide"
-    )
-    
-    st.title("🇰🇷 Korean Vocabulary Builder")
-    
-    # Sidebar navigation
-    st.sidebar.title("Navigation")
-    mode = st.sidebar.radio(
-        "Select Mode:",
-        ["Study Mode", "Quiz Mode"]
-    )
-    
-    # Main content based on selected mode
-    if mode == "Study Mode":
-        korean_study_mode()
-    elif mode == "Quiz Mode":
-        korean_quiz_mode()
-    
-    # Sidebar information
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### 💡 Korean Learning Tips")
-    st.sidebar.markdown("""
-    - Listen to pronunciation carefully
-    - Practice writing Korean characters
-    - Use phrases in context
-    - Review expressions regularly
-    - Take quizzes to test knowledge
-    """)
-    
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### 📊 Categories Available")
-    korean_data = load_korean_vocabulary()
-    if korean_data:
-        for category, words in korean_data.items():
-            st.sidebar.markdown(f"- **{category.title()}**: {len(words)} words")
-
-if __name__ == "__main__":
+import streamlit as st 
+from services import (
+    get_audio,
+    get_korean_corpus,
+    find_media,
+    QuizSession,
+    get_quiz_words,
+    prompt_text,
+    option_text,
+    grade_answer,
+    get_user_store,
+    get_phrase_audio,
+    contains_hangul,
+    KOREAN_QUIZ_TYPES,
+    TYPED_QUIZ_TYPE,
+    DEFAULT_OPTION_COUNT,
+    CORRECT,
+    NEAR_MISS,
+    NO_ANSWER,
+    SPEED_OPTIONS,
+    SPEED_LABELS
+)
+from answer_log import DEFAULT_USER
+
+# Constants
+KOREAN_QUIZ_MODES = ["Meaning → Word"] + KOREAN_QUIZ_TYPES + [TYPED_QUIZ_TYPE]
+
+def display_media_content(word):
+    """Display image/video if available for the word"""
+    # Shared media index: no file system lookups per word
+    media = find_media(word)
+    if media is None:
+        return
+    
+    media_path, kind = media
+    if kind == "image":
+        st.image(media_path, caption=f"Image for: {word}", use_column_width=True)
+    else:
+        st.video(media_path)
+
+def korean_study_mode():
+    """Korean vocabulary study mode"""
+    corpus = get_korean_corpus()
+    
+    if not corpus:
+        st.error("Korean vocabulary file (korean.json) not found!")
+        return
+    
+    st.header("🇰🇷 Korean Vocabulary Study")
+    
+    # Category selection
+    categories = corpus.category_names()
+    selected_category = st.selectbox("Choose a category:", categories)
+    
+    if selected_category and selected_category in corpus.categories:
+        words = corpus.get_category(selected_category)
+        
+        if words:
+            # Word selection
+            word_options = [f"{word['word']} ({word.get('meaning', 'No meaning')})" for word in words]
+            selected_word_index = st.selectbox("Choose a word:", range(len(word_options)), 
+                                             format_func=lambda x: word_options[x])
+            
+            if selected_word_index is not None:
+                word_data = words[selected_word_index]
+                
+                # Display word information
+                col1, col2 = st.columns([1, 1])
+                
+                with col1:
+                    st.subheader("📝 Word Information")
+                    st.write(f"**Korean Word:** {word_data['word']}")
+                    if word_data.get('romanization'):
+                        st.write(f"**Pronunciation:** [{word_data['romanization']}] ({word_data['pronunciation']})")
+                    st.write(f"**English Meaning:** {word_data.get('meaning', 'No meaning provided')}")
+                    
+                    # Display phrase
+                    if 'phrase' in word_data:
+                        st.write("**English Phrase:**")
+                        st.info(word_data['phrase'])
+                    
+                    # Display Korean phrase if available
+                    if 'korean_phrase' in word_data:
+                        st.write("**Korean Phrase:**")
+                        st.success(word_data['korean_phrase'])
+                        if word_data.get('korean_phrase_romanization'):
+                            st.caption(word_data['korean_phrase_romanization'])
+                
+                with col2:
+                    # Display media content
+                    display_media_content(word_data['word'])
+                    
+                    # Audio controls
+                    st.subheader("🔊 Audio")
+                    
+                    # Speed selection
+                    speed_key = st.selectbox("Select speech speed:", 
+                                           SPEED_OPTIONS, 
+                                           format_func=lambda x: SPEED_LABELS[x])
+                    
+                    col_audio1, col_audio2 = st.columns(2)
+                    
+                    with col_audio1:
+                        # Korean word audio
+                        if st.button("🎵 Play Korean Word"):
+                            audio = get_audio(word_data['word'], is_phrase=False, speed=speed_key)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
+                    
+                    with col_audio2:
+                        # Korean phrase audio
+                        if st.button("🎵 Play Korean Phrase") and 'korean_phrase' in word_data:
+                            audio = get_audio(word_data['korean_phrase'], is_phrase=True, speed=speed_key)
+                            if audio:
+                                st.audio(audio[0], format=audio[1])
+                
+                # Display expressions
+                st.subheader("💬 Expressions")
+                
+                if 'expressions' in word_data and word_data['expressions']:
+                    col_expr1, col_expr2 = st.columns(2)
+                    
+                    with col_expr1:
+                        st.write("**English Expressions:**")
+                        for expr in word_data['expressions']:
+                            st.write(f"• {expr}")
+                    
+                    with col_expr2:
+                        if 'korean_expressions' in word_data and word_data['korean_expressions']:
+                            st.write("**Korean Expressions:**")
+                            for expr in word_data['korean_expressions']:
+                                st.write(f"• {expr}")
+
+def korean_listening_mode():
+    """Korean listening practice: play a phrase, then replay it word by word"""
+    corpus = get_korean_corpus()
+    
+    if not corpus:
+        st.error("Korean vocabulary file (korean.json) not found!")
+        return
+    
+    st.header("🎧 Korean Listening Practice")
+    
+    categories = corpus.category_names()
+    selected_category = st.selectbox("Choose a category:", categories, key="listening_category")
+    if not selected_category or selected_category not in corpus.categories:
+        return
+    
+    # Only entries whose Korean phrase is actually Korean
+    words = [word for word in corpus.get_category(selected_category)
+             if contains_hangul(word.get('korean_phrase', ''))]
+    if not words:
+        st.warning("No Korean phrases in this category.")
+        return
+    
+    speed_key = st.selectbox("Select speech speed:", SPEED_OPTIONS,
+                             format_func=lambda x: SPEED_LABELS[x], key="listening_speed")
+    
+    position = st.session_state.get('listening_position', 0) % len(words)
+    word_data = words[position]
+    st.subheader(f"Phrase {position + 1} of {len(words)}")
+    
+    # Synthesized once; word clips are byte ranges of the same audio
+    phrase_audio = get_phrase_audio(word_data['korean_phrase'], speed_key)
+    if phrase_audio is None:
+        st.error("Audio is not available for this phrase.")
+        return
+    
+    st.write("**🔊 Whole phrase:**")
+    st.audio(phrase_audio.audio, format=phrase_audio.format)
+    
+    show_text = st.checkbox("Show the text", key=f"listening_text_{position}")
+    st.write("**🔉 Word by word:**")
+    columns = st.columns(min(len(phrase_audio), 6))
+    for i, word in enumerate(phrase_audio.words):
+        label = word if show_text else f"Word {i + 1}"
+        if columns[i % len(columns)].button(label, key=f"listening_word_{position}_{i}"):
+            st.session_state.listening_word = (position, i)
+    
+    selected = st.session_state.get('listening_word')
+    if selected and selected[0] == position and selected[1] < len(phrase_audio):
+        clip = phrase_audio.clip(selected[1])
+        st.audio(clip[0], format=clip[1])
+    
+    if show_text:
+        st.success(word_data['korean_phrase'])
+        if word_data.get('korean_phrase_romanization'):
+            st.caption(word_data['korean_phrase_romanization'])
+        if word_data.get('phrase'):
+            st.info(word_data['phrase'])
+        st.write(f"**Word:** {word_data['word']} — {word_data.get('meaning', '')}")
+    
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("⬅️ Previous Phrase"):
+            st.session_state.listening_position = position - 1
+            st.rerun()
+    with col_next:
+        if st.button("➡️ Next Phrase"):
+            st.session_state.listening_position = position + 1
+            st.rerun()
+
+def korean_quiz_mode():
+    """Korean vocabulary quiz mode"""
+    corpus = get_korean_corpus()
+    
+    if not corpus:
+        st.error("Korean vocabulary file (korean.json) not found!")
+        return
+    
+    st.header("🧠 Korean Vocabulary Quiz")
+    
+    # Category and question type selection for quiz
+    categories = corpus.category_names()
+    selected_category = st.selectbox("Choose quiz category:", categories, key="quiz_category")
+    quiz_type = st.radio("Question type:", KOREAN_QUIZ_MODES, horizontal=True, key="quiz_type")
+    
+    if not selected_category or selected_category not in corpus.categories:
+        return
+    
+    # Entries with the fields this question type needs (cloze items are built at load time)
+    words = get_quiz_words("Korean", selected_category, quiz_type)
+    if len(words) < 4:
+        st.warning("Need at least 4 words with this kind of question in the category for quiz mode.")
+        return
+    
+    if 'quiz_score' not in st.session_state:
+        st.session_state.quiz_score = 0
+        st.session_state.quiz_total = 0
+    
+    quiz_session = st.session_state.get('korean_quiz_session')
+    if (st.button("🎯 Start New Quiz") or quiz_session is None
+            or not quiz_session.matches(("Korean", quiz_type), selected_category, len(words))):
+        # Typed answers need no distractors: the only option is the answer itself
+        option_count = 1 if quiz_type == TYPED_QUIZ_TYPE else DEFAULT_OPTION_COUNT
+        quiz_session = QuizSession(("Korean", quiz_type), selected_category, len(words), option_count=option_count)
+        st.session_state.korean_quiz_session = quiz_session
+    
+    if quiz_session.finished:
+        st.success(f"🏁 Quiz complete! Score: {quiz_session.score}/{quiz_session.total}")
+        return
+    
+    quiz_word, options = quiz_session.current_question(words)
+    
+    # Display the question (prompts are precomputed fields of the entry)
+    st.subheader(f"Question {quiz_session.position + 1} of {quiz_session.deck_size}:")
+    if quiz_type == "Fill in the Blank":
+        st.write(f"**Korean Phrase:** {prompt_text(quiz_word, quiz_type)}")
+        st.write(f"**English Meaning:** {quiz_word['meaning']}")
+        st.write("**Which word fills the blank?**")
+    elif quiz_type == "Expression Match":
+        st.write(f"**English Expression:** {prompt_text(quiz_word, quiz_type)}")
+        st.write("**Which Korean expression means this?**")
+    elif quiz_type == "Listening":
+        audio = get_audio(prompt_text(quiz_word, quiz_type), is_phrase=False, speed="normal")
+        if audio:
+            st.audio(audio[0], format=audio[1])
+        st.write("**Which word did you hear?**")
+    elif quiz_type == TYPED_QUIZ_TYPE:
+        st.write(f"**English Meaning:** {prompt_text(quiz_word, quiz_type)}")
+        st.write("**Type the Korean word:**")
+    else:
+        st.write(f"**English Meaning:** {quiz_word['meaning']}")
+        if 'phrase' in quiz_word:
+            st.write(f"**Example Phrase:** {quiz_word['phrase']}")
+        st.write("**What is the Korean word?**")
+    
+    # Learner signed in on the main app (answers go to their answer log)
+    user_store = get_user_store(st.session_state.get('user_id', DEFAULT_USER))
+    
+    if not quiz_session.answered and quiz_type == TYPED_QUIZ_TYPE:
+        # Typed answer, graded on jamo so one wrong vowel is a near miss
+        typed_answer = st.text_input("Your answer", key=f"typed_answer_{quiz_session.position}")
+        if st.button("✅ Submit Answer"):
+            latency_ms = quiz_session.latency_ms()
+            grade = grade_answer(typed_answer, quiz_word['word'])
+            st.session_state.korean_typed_grade = grade
+            st.session_state.quiz_total += 1
+            is_correct = quiz_session.answer(0 if grade.verdict == CORRECT else NO_ANSWER)
+            if is_correct:
+                st.session_state.quiz_score += 1
+            user_store.log_answer("Korean", selected_category, quiz_word['word'], quiz_type,
+                                  typed_answer, is_correct, latency_ms)
+            st.rerun()
+    elif not quiz_session.answered:
+        # Quiz options
+        for i, option in enumerate(options):
+            if st.button(f"{chr(65+i)}. {option_text(option, quiz_type)}", key=f"option_{i}"):
+                latency_ms = quiz_session.latency_ms()
+                st.session_state.quiz_total += 1
+                is_correct = quiz_session.answer(i)
+                if is_correct:
+                    st.session_state.quiz_score += 1
+                user_store.log_answer("Korean", selected_category, quiz_word['word'], quiz_type,
+                                      option['word'], is_correct, latency_ms)
+                st.rerun()
+    else:
+        answer_text = option_text(quiz_word, quiz_type)
+        # Compare pool indexes: shared corpora decode a new dict per lookup
+        chosen = quiz_session.answers[-1]
+        correct, option_indexes = quiz_session.current_indexes()
+        grade = st.session_state.get('korean_typed_grade') if quiz_type == TYPED_QUIZ_TYPE else None
+        if chosen != NO_ANSWER and option_indexes[chosen] == correct:
+            st.success(f"✅ Correct! The answer is: {answer_text}")
+        elif grade is not None and grade.verdict == NEAR_MISS:
+            st.warning(f"✏️ Almost! Check the spelling: {answer_text}")
+        else:
+            st.error(f"❌ Wrong! The correct answer is: {answer_text}")
+        if quiz_type == "Fill in the Blank":
+            st.write(f"**Full Phrase:** {quiz_word['korean_phrase']}")
+        
+        # Play audio for the correct answer
+        audio = get_audio(quiz_word['word'], is_phrase=False, speed="normal")
+        if audio:
+            st.audio(audio[0], format=audio[1])
+        
+        if st.button("➡️ Next Question"):
+            quiz_session.next_question()
+            st.rerun()
+    
+    # Show score
+    accuracy = (st.session_state.quiz_score / max(st.session_state.quiz_total, 1)) * 100
+    st.info(f"Score: {st.session_state.quiz_score}/{st.session_state.quiz_total} ({accuracy:.1f}%)")
+
+def main():
+    st.set_page_config(
+        page_title="Korean Vocabulary Builder",
+        page_icon="🇰🇷",
+        layout="wide"
+    )
+    
+    st.title("🇰🇷 Korean Vocabulary Builder")
+    
+    # Sidebar navigation
+    st.sidebar.title("Navigation")
+    mode = st.sidebar.radio(
+        "Select Mode:",
+        ["Study Mode", "Listening Mode", "Quiz Mode"]
+    )
+    
+    # Main content based on selected mode
+    if mode == "Study Mode":
+        korean_study_mode()
+    elif mode == "Listening Mode":
+        korean_listening_mode()
+    elif mode == "Quiz Mode":
+        korean_quiz_mode()
+    
+    # Sidebar information
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 💡 Korean Learning Tips")
+    st.sidebar.markdown("""
+    - Listen to pronunciation carefully
+    - Practice writing Korean characters
+    - Use phrases in context
+    - Review expressions regularly
+    - Take quizzes to test knowledge
+    """)
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 📊 Categories Available")
+    corpus = get_korean_corpus()
+    if corpus:
+        for category, count in corpus.category_counts.items():
+            st.sidebar.markdown(f"- **{category.title()}**: {count} words")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
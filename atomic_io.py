@@ -0,0 +1,220 @@
+"""
+Crash-safe writes for the vocabulary, level and learned-word files
+Files are never rewritten in place: the new contents go to a temporary file in
+the same directory, are fsynced and then swapped in with os.replace, so a
+crash or a concurrent rerun leaves either the old or the new file, never a
+truncated one.
+
+Writers of the same file are serialized with an advisory lock (fcntl.flock on
+a ".lock" file next to it, shared across processes) and a per-file lock within
+the process. Read-modify-write updates hold the lock around both steps.
+
+Whole-file writes are coalesced: when several threads save the same file at
+once, the thread that gets the lock writes the newest snapshot and the
+callers whose snapshots it superseded return without writing again.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+
+from instrumentation import timed, record_file
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks between processes, writes are still atomic
+    fcntl = None
+
+# Constants
+LOCK_SUFFIX = ".lock"
+DEFAULT_FILE_MODE = 0o644
+
+logger = logging.getLogger(__name__)
+
+_states = {}
+_states_lock = threading.Lock()
+
+
+class _FileState:
+    """Lock and pending-write bookkeeping for one file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()   # held while the file is locked by this process
+        self.depth = 0                  # nesting level of file_lock in the owning thread
+        self.lock_file = None
+        self.mutex = threading.Lock()   # guards the fields below
+        self.sequence = 0               # last snapshot handed to replace_file
+        self.written = 0                # last snapshot on disk
+        self.pending = None             # newest snapshot not yet written
+
+
+def _state(file_path):
+    key = os.path.abspath(file_path)
+    state = _states.get(key)
+    if state is None:
+        with _states_lock:
+            state = _states.setdefault(key, _FileState(key))
+    return state
+
+
+@contextlib.contextmanager
+def file_lock(file_path):
+    """
+    Hold the write lock of a file (reentrant within a thread)
+
+    Args:
+        file_path (str): File to lock; the advisory lock lives in file_path + ".lock"
+    """
+    state = _state(file_path)
+    with state.lock:
+        state.depth += 1
+        try:
+            if state.depth == 1 and fcntl is not None:
+                lock_file = open(state.path + LOCK_SUFFIX, 'a')
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                except BaseException:
+                    lock_file.close()
+                    raise
+                state.lock_file = lock_file
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0 and state.lock_file is not None:
+                # Closing the descriptor releases the flock
+                state.lock_file.close()
+                state.lock_file = None
+
+
+def _write_replace(path, text):
+    directory = os.path.dirname(path)
+    name = os.path.basename(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        # mkstemp creates the file private; keep the permissions of the file it replaces
+        mode = stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else DEFAULT_FILE_MODE
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@timed()
+def replace_file(file_path, content):
+    """
+    Atomically replace the contents of a text file
+
+    Args:
+        file_path (str): File to write
+        content (str or callable): New contents, or a function returning them;
+            a function is only called if this snapshot is the one written
+
+    Returns:
+        bool: True if this call wrote the file, False if a newer snapshot
+            saved concurrently was written in its place
+    """
+    state = _state(file_path)
+    with state.mutex:
+        state.sequence += 1
+        ticket = state.sequence
+        state.pending = content
+
+    with file_lock(file_path):
+        with state.mutex:
+            if state.written >= ticket:
+                logger.debug("Write of %s coalesced into a newer snapshot", file_path)
+                return False
+            ticket, content = state.sequence, state.pending
+        _write_replace(state.path, content() if callable(content) else content)
+        with state.mutex:
+            state.written = ticket
+            if state.sequence == ticket:
+                state.pending = None
+    record_file("replace_file", file_path, written=True)
+    return True
+
+
+def dump_json(data):
+    """
+    Serialize data the way the JSON data files are stored
+
+    Returns:
+        str: Indented JSON text with non-ASCII characters kept
+    """
+    # One dumps + write: json.dump streams through many small writes
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def replace_json(file_path, data):
+    """
+    Atomically replace a JSON file
+
+    Args:
+        file_path (str): File to write
+        data: JSON-serializable data
+
+    Returns:
+        bool: True if this call wrote the file (see replace_file)
+    """
+    return replace_file(file_path, lambda: dump_json(data))
+
+
+def update_json(file_path, update, default=None):
+    """
+    Read, modify and atomically rewrite a JSON file under its lock
+
+    Args:
+        file_path (str): JSON file
+        update (callable): Called with the parsed data; changes it in place and
+            returns a true value if the file should be written
+        default: Data to start from if the file does not exist
+            (None to leave a missing file alone and return None)
+
+    Returns:
+        The value returned by update (None if the file is missing)
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    with file_lock(file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if default is None:
+                return None
+            data = default
+        result = update(data)
+        if result:
+            replace_json(file_path, data)
+        return result
+
+
+def append_text(file_path, text):
+    """
+    Append text to a file under its lock and flush it to disk
+
+    A crash can at most cut the appended text short; the existing contents
+    are never touched.
+
+    Args:
+        file_path (str): File to append to
+        text (str): Text to append
+    """
+    with file_lock(file_path):
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
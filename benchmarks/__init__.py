@@ -0,0 +1,9 @@
+"""
+Benchmark suite for the data-loading and quiz hot paths
+Run with: python -m benchmarks.run
+"""
+
+import os
+
+# Keep the application's progress logging out of the reports
+os.environ.setdefault("VOCAB_LOG_LEVEL", "WARNING")
@@ -0,0 +1,28 @@
+"""
+Benchmarks for the learned-word helpers
+"""
+
+import itertools
+
+from benchmarks.datasets import WorkspaceBenchmark
+from learned import save_to_learned, load_learned_words, save_learned_words_to_file
+
+
+class TimeLearnedWords(WorkspaceBenchmark):
+    """Reading, appending to and rewriting data/learned.json"""
+
+    def setup_workspace(self, size):
+        self.learned_words = load_learned_words()
+        self._counter = itertools.count()
+
+    def time_load_learned_words(self, size):
+        load_learned_words()
+
+    def time_save_to_learned(self, size):
+        save_to_learned({'word': f"benchword{next(self._counter)}", 'meaning': "", 'phrase': "", 'category': "general"})
+
+    def time_save_to_learned_existing(self, size):
+        save_to_learned(self.learned_words[-1])
+
+    def time_save_learned_words_to_file(self, size):
+        save_learned_words_to_file(self.learned_words, "learned_out.json")
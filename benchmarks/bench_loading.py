@@ -0,0 +1,73 @@
+"""
+Benchmarks for loading, saving and summarizing vocabulary
+"""
+
+import json
+
+from benchmarks.datasets import WorkspaceBenchmark
+from main import (
+    load_word_pools,
+    load_vocabulary_from_file,
+    save_word_pools_to_file,
+    filter_words_by_category,
+    get_category_statistics
+)
+from corpus import load_vocabulary_with_expressions, clear_corpus_cache
+
+
+class TimeLoadWordPools(WorkspaceBenchmark):
+    """load_word_pools for an English level file and the cached Korean corpus"""
+
+    def setup_workspace(self, size):
+        load_word_pools("Korean")
+
+    def time_level_file(self, size):
+        load_word_pools(1)
+
+    def time_korean_cached(self, size):
+        load_word_pools("Korean")
+
+
+class TimeVocabularyFile(WorkspaceBenchmark):
+    """Pipe-separated vocabulary text file round trip"""
+
+    def setup_workspace(self, size):
+        with open("data/level1.json", 'r', encoding='utf-8') as f:
+            self.word_pools = json.load(f)
+
+    def time_load_vocabulary_from_file(self, size):
+        load_vocabulary_from_file("vocabulary.txt")
+
+    def time_save_word_pools_to_file(self, size):
+        save_word_pools_to_file(self.word_pools, "vocabulary_out.txt")
+
+
+class TimeLoadVocabularyWithExpressions(WorkspaceBenchmark):
+    """Flattened level entries, cold (parse and score) and warm (cached corpus)"""
+
+    def setup_workspace(self, size):
+        load_vocabulary_with_expressions(1)
+        load_vocabulary_with_expressions("Korean")
+
+    def time_cold(self, size):
+        clear_corpus_cache()
+        load_vocabulary_with_expressions(1)
+
+    def time_warm(self, size):
+        load_vocabulary_with_expressions(1)
+
+    def time_korean_warm(self, size):
+        load_vocabulary_with_expressions("Korean")
+
+
+class TimeCategoryHelpers(WorkspaceBenchmark):
+    """Category filtering and statistics over a flattened level"""
+
+    def setup_workspace(self, size):
+        self.words = load_vocabulary_from_file("vocabulary.txt")
+
+    def time_filter_words_by_category(self, size):
+        filter_words_by_category(self.words, "science")
+
+    def time_get_category_statistics(self, size):
+        get_category_statistics(self.words)
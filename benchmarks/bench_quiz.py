@@ -0,0 +1,33 @@
+"""
+Benchmarks for building and answering quiz questions
+"""
+
+from benchmarks.datasets import WorkspaceBenchmark
+from quiz import QuizSession, generate_quiz_question, get_quiz_words
+
+ROUND_LENGTH = 20
+
+
+class TimeQuizQuestions(WorkspaceBenchmark):
+    """Deck-based sessions against the per-question option sampling they replaced"""
+
+    def setup_workspace(self, size):
+        self.words = get_quiz_words(1, "general")
+        self.session = QuizSession(1, "general", len(self.words), deck_size=ROUND_LENGTH, seed=0)
+
+    def time_new_round(self, size):
+        QuizSession(1, "general", len(self.words), deck_size=ROUND_LENGTH)
+
+    def time_full_deck(self, size):
+        QuizSession(1, "general", len(self.words))
+
+    def time_answer_round(self, size):
+        session = self.session
+        for position in range(ROUND_LENGTH):
+            session.position = position
+            session.current_question(self.words)
+            session.answer(0)
+        del session.answers[:]
+
+    def time_generate_quiz_question(self, size):
+        generate_quiz_question(self.words, self.words[0])
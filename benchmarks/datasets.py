@@ -0,0 +1,171 @@
+"""
+Benchmark workspaces: the shipped data and synthetic corpora of a given size
+Each workspace is a temporary directory laid out like the repository
+(data/level1.json, data/korean.json, data/learned.json, vocabulary.txt), so the
+application functions can run against it with their default relative paths
+"""
+
+import atexit
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from vocabulary_format import write_word_pools
+
+# Constants
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHIPPED = "shipped"
+SIZES = [SHIPPED, 10_000, 100_000, 1_000_000]
+
+# Same categories as main.DEFAULT_CATEGORIES
+CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
+
+# Building blocks for unique, realistic-looking synthetic headwords
+ENGLISH_SYLLABLES = [onset + vowel for onset in ("b", "c", "d", "f", "g", "l", "m", "n", "p", "r", "s", "t")
+                     for vowel in ("a", "e", "i", "o", "u")]
+KOREAN_SYLLABLES = [chr(0xAC00 + index) for index in range(0, 11172, 56)]
+
+_workspace_root = None
+_workspaces = {}
+
+
+def _root():
+    global _workspace_root
+    if _workspace_root is None:
+        _workspace_root = tempfile.mkdtemp(prefix="vocab-bench-")
+        atexit.register(shutil.rmtree, _workspace_root, True)
+    return _workspace_root
+
+
+def _headword(number, syllables):
+    """Spell a number in base len(syllables), giving every number a unique word"""
+    base = len(syllables)
+    parts = [syllables[number % base]]
+    number //= base
+    while number:
+        parts.append(syllables[number % base])
+        number //= base
+    return "".join(parts)
+
+
+def synthetic_entries(size, korean=False, seed=0):
+    """
+    Generate deterministic word entries spread over the categories
+
+    Args:
+        size (int): Number of entries
+        korean (bool): Use Hangul headwords and Korean phrases
+        seed (int): Random seed
+
+    Returns:
+        dict: Category name -> list of word entries
+    """
+    rng = random.Random(seed)
+    syllables = KOREAN_SYLLABLES if korean else ENGLISH_SYLLABLES
+    pools = {category: [] for category in CATEGORIES}
+    for number in range(size):
+        word = _headword(number, syllables)
+        if not korean:
+            word = word.capitalize()
+        entry = {
+            "word": word,
+            "meaning": f"Synthetic meaning number {number}",
+            "phrase": f"This sentence uses {word} as an example.",
+            "expressions": [f"{word} again.", f"Say {word} twice."]
+        }
+        if korean:
+            entry["korean_phrase"] = f"{word}{rng.choice(syllables)}를 사용합니다."
+        pools[CATEGORIES[number % len(CATEGORIES)]].append(entry)
+    return pools
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _build_synthetic(path, size):
+    os.makedirs(os.path.join(path, "data"))
+    pools = synthetic_entries(size)
+    _write_json(os.path.join(path, "data", "level1.json"), pools)
+    _write_json(os.path.join(path, "data", "korean.json"), synthetic_entries(size, korean=True))
+
+    write_word_pools(os.path.join(path, "vocabulary.txt"), pools)
+
+    learned = [dict(entry, category=category, learned_date="2025-01-01T00:00:00")
+               for category, words in pools.items() for entry in words]
+    _write_json(os.path.join(path, "data", "learned.json"), learned)
+
+
+def _build_shipped(path):
+    shutil.copytree(os.path.join(REPO_DIR, "data"), os.path.join(path, "data"),
+                    ignore=shutil.ignore_patterns("answers", "*.xlsx"))
+    shutil.copy(os.path.join(REPO_DIR, "vocabulary.txt"), path)
+
+
+def get_workspace(size):
+    """
+    Get (building on first use) the workspace directory for a corpus size
+
+    Args:
+        size (int or str): Number of synthetic words, or "shipped" for the repository data
+
+    Returns:
+        str: Absolute path of the workspace
+    """
+    path = _workspaces.get(size)
+    if path is None:
+        path = os.path.join(_root(), str(size))
+        if size == SHIPPED:
+            _build_shipped(path)
+        else:
+            _build_synthetic(path, size)
+        _workspaces[size] = path
+    return path
+
+
+def copy_workspace(size):
+    """
+    Get a private, writable copy of a workspace
+
+    Args:
+        size (int or str): Number of synthetic words, or "shipped" for the repository data
+
+    Returns:
+        str: Absolute path of the new workspace
+    """
+    path = tempfile.mkdtemp(prefix=f"{size}-", dir=_root())
+    shutil.copytree(get_workspace(size), path, dirs_exist_ok=True)
+    return path
+
+
+class WorkspaceBenchmark:
+    """
+    Base class for benchmarks that run inside a corpus workspace
+
+    Subclasses are parameterized over SIZES and run with the workspace as the
+    current directory; setup_workspace() is the hook for per-size preparation.
+    """
+
+    params = SIZES
+    param_names = ["corpus"]
+
+    def setup(self, size):
+        from corpus import clear_corpus_cache
+
+        self.workspace = get_workspace(size)
+        self._previous_dir = os.getcwd()
+        os.chdir(self.workspace)
+        clear_corpus_cache()
+        self.setup_workspace(size)
+
+    def setup_workspace(self, size):
+        pass
+
+    def teardown(self, size):
+        from corpus import clear_corpus_cache
+
+        clear_corpus_cache()
+        os.chdir(self._previous_dir)
@@ -0,0 +1,233 @@
+"""
+Deterministic stand-ins for the TTS backends used by main.create_audio_file
+FakePyttsx3 replaces the pyttsx3 module with an engine that writes generated
+WAV files; GTTSStub serves gTTS requests from a local HTTP server, so the
+audio path can be measured without a speech driver or network access
+"""
+
+import base64
+import json
+import math
+import os
+import threading
+import time
+import urllib.parse
+import wave
+import zlib
+from array import array
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import main
+
+# Constants
+SAMPLE_RATE = 16000
+DEFAULT_ENGINE_LATENCY = 0.02   # seconds per runAndWait, standing in for the driver
+DEFAULT_STUB_LATENCY = 0.05     # seconds per HTTP request, standing in for the network
+CHARACTERS_PER_WORD = 6
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz) for the fake gTTS audio
+MP3_FRAME = b"\xff\xfb\x90\x00" + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def synthesize_wav(text, rate, path):
+    """
+    Write a deterministic tone whose pitch and length depend on the text
+
+    Args:
+        text (str): Text being "spoken"
+        rate (int): Speech rate in words per minute
+        path (str): Output WAV file path
+    """
+    seconds = max(0.2, len(text) / CHARACTERS_PER_WORD / max(rate, 1) * 60)
+    frequency = 200 + zlib.crc32(text.encode('utf-8')) % 400
+    period = max(1, int(SAMPLE_RATE / frequency))
+    cycle = array('h', (int(8000 * math.sin(2 * math.pi * i / period)) for i in range(period)))
+    samples = cycle * (int(seconds * SAMPLE_RATE) // period + 1)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+
+def synthesize_mp3(text, slow=False):
+    """
+    Build deterministic MP3 bytes (silent frames) sized like speech for the text
+
+    Args:
+        text (str): Text being "spoken"
+        slow (bool): gTTS slow mode, which produces longer audio
+
+    Returns:
+        bytes: MP3 data
+    """
+    seconds = max(0.2, len(text) / CHARACTERS_PER_WORD / 150 * 60) * (1.5 if slow else 1.0)
+    return MP3_FRAME * (int(seconds / MP3_FRAME_SECONDS) + 1)
+
+
+class FakeVoice:
+    def __init__(self, voice_id, name):
+        self.id = voice_id
+        self.name = name
+        self.languages = []
+
+
+class FakeEngine:
+    """Subset of the pyttsx3 engine API used by create_audio_file"""
+
+    VOICES = [
+        FakeVoice("HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech\\Voices\\Tokens\\TTS_MS_EN-US_ZIRA_11.0", "Zira"),
+        FakeVoice("HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech\\Voices\\Tokens\\TTS_MS_KO-KR_HEAMI_11.0", "Heami")
+    ]
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.properties = {'voices': self.VOICES, 'voice': self.VOICES[0].id, 'rate': 200, 'volume': 1.0}
+        self.queue = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, filename):
+        self.queue.append((text, filename))
+
+    def runAndWait(self):
+        if self.latency:
+            time.sleep(self.latency)
+        for text, filename in self.queue:
+            synthesize_wav(text, self.properties['rate'], filename)
+        self.queue = []
+
+
+class FakePyttsx3:
+    """Replacement for the pyttsx3 module"""
+
+    def __init__(self, latency=DEFAULT_ENGINE_LATENCY):
+        self.latency = latency
+        self.engines = 0
+
+    def init(self, driverName=None, debug=False):
+        self.engines += 1
+        return FakeEngine(self.latency)
+
+
+class UnavailablePyttsx3:
+    """Replacement for the pyttsx3 module on a host without a speech driver"""
+
+    def init(self, driverName=None, debug=False):
+        raise RuntimeError("no speech driver available")
+
+
+class GTTSStub:
+    """
+    Local HTTP server answering gTTS batchexecute requests
+
+    Responses use the same envelope as translate.google.com, with the audio
+    base64 encoded under the jQ1olc RPC id that gTTS looks for.
+    """
+
+    def __init__(self, latency=DEFAULT_STUB_LATENCY):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                text, slow = _parse_request(body)
+                audio = base64.b64encode(synthesize_mp3(text, slow)).decode('ascii')
+                rpc = json.dumps([["wrb.fr", "jQ1olc", json.dumps([audio]), None, None, None, "generic"]],
+                                 separators=(",", ":"))
+                payload = f")]}}'\n\n{len(rpc)}\n{rpc}\n".encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _parse_request(body):
+    """Extract the text and slow flag from a gTTS f.req form body"""
+    try:
+        form = urllib.parse.parse_qs(body.decode('utf-8'))
+        rpc = json.loads(form['f.req'][0])
+        text, _, slow, _ = json.loads(rpc[0][0][1])
+        return text, bool(slow)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return body.decode('utf-8', 'replace'), False
+
+
+@contextmanager
+def fake_pyttsx3_backend(latency=DEFAULT_ENGINE_LATENCY):
+    """
+    Route main.create_audio_file to the fake pyttsx3 engine
+
+    Yields:
+        FakePyttsx3: The fake module (engines counts init() calls)
+    """
+    original = main.pyttsx3
+    main.pyttsx3 = FakePyttsx3(latency)
+    try:
+        yield main.pyttsx3
+    finally:
+        main.pyttsx3 = original
+
+
+@contextmanager
+def gtts_stub_backend(latency=DEFAULT_STUB_LATENCY):
+    """
+    Route main.create_audio_file to gTTS talking to a local stub server
+
+    pyttsx3 is made unavailable, as on a cloud host, so every call takes the
+    gTTS fallback.
+
+    Yields:
+        GTTSStub: The running stub server (requests counts HTTP requests)
+    """
+    import gtts.tts
+
+    stub = GTTSStub(latency).start()
+    original_pyttsx3 = main.pyttsx3
+    original_url = gtts.tts._translate_url
+    proxies = {name: os.environ.pop(name) for name in ("http_proxy", "HTTP_PROXY") if name in os.environ}
+    main.pyttsx3 = UnavailablePyttsx3()
+    gtts.tts._translate_url = lambda tld="com", path="": stub.url + path
+    try:
+        yield stub
+    finally:
+        gtts.tts._translate_url = original_url
+        main.pyttsx3 = original_pyttsx3
+        os.environ.update(proxies)
+        stub.stop()
+
+
+BACKENDS = {
+    "fake-pyttsx3": fake_pyttsx3_backend,
+    "gtts-stub": gtts_stub_backend
+}
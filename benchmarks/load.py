@@ -0,0 +1,315 @@
+"""
+Streamlit rerun load generator for app_advanced1.py
+
+Simulates N concurrent learners against one process, the way one Streamlit
+server instance carries its sessions: every user is a thread driving its own
+AppTest session through a scripted visit (pick a level, load it, browse Study
+Mode, play a word, answer a quiz round, mark words learned). Each AppTest
+run() is one script rerun; the harness reports rerun latency distributions
+per action, rerun throughput, process CPU time and resident memory.
+
+AppTest swaps process-wide state (the Runtime singleton, config options) on
+every run, so reruns are executed one at a time. Reruns are CPU-bound under
+the GIL in a real server too, so throughput is comparable; each rerun reports
+its response time (queueing included, what the learner waits) and its service
+time (the rerun alone).
+
+All users share one private copy of the shipped data, as the sessions of a
+real instance share its files. Audio uses the fake pyttsx3 engine.
+
+Usage:
+    python -m benchmarks.load                        # 1, 5 and 10 users
+    python -m benchmarks.load --users 25 --questions 20 --think-time 0.5
+"""
+
+import argparse
+import datetime
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.datasets import REPO_DIR, SHIPPED, copy_workspace
+from benchmarks.fake_tts import fake_pyttsx3_backend
+from benchmarks.run import percentiles, write_results, _git_commit, _format_seconds
+
+# Constants
+APP_FILE = os.path.join(REPO_DIR, "app_advanced1.py")
+DEFAULT_USERS = [1, 5, 10]
+DEFAULT_QUESTIONS = 20
+DEFAULT_LEARNED = 2
+RERUN_TIMEOUT = 60
+LEVELS = [1, 2, 3]
+CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
+RSS_SAMPLE_INTERVAL = 0.1
+
+
+# AppTest is not thread-safe: reruns of all sessions go through this lock
+_rerun_lock = threading.Lock()
+
+
+class SessionError(Exception):
+    """The app raised an exception or the scripted widget was missing"""
+
+
+def _rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Background thread sampling the resident set size"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append(_rss_bytes())
+
+    def summary(self):
+        return {
+            'start': self.samples[0],
+            'peak': max(self.samples),
+            'end': self.samples[-1],
+            'mean': sum(self.samples) / len(self.samples)
+        }
+
+
+class LearnerSession:
+    """One simulated learner driving an AppTest session"""
+
+    def __init__(self, user_id, questions, learned, think_time, seed):
+        self.user_id = user_id
+        self.questions = questions
+        self.learned = learned
+        self.think_time = think_time
+        self.rng = random.Random(seed * 1000 + user_id)
+        self.timings = []
+        self.app = AppTest.from_file(APP_FILE, default_timeout=RERUN_TIMEOUT)
+
+    def _rerun(self, action, widget=None):
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        queued = time.perf_counter()
+        with _rerun_lock:
+            started = time.perf_counter()
+            (widget or self.app).run()
+        finished = time.perf_counter()
+        self.timings.append((action, finished - queued, finished - started))
+        if self.app.exception:
+            raise SessionError(f"{action}: {self.app.exception[0].message}")
+
+    def _button(self, key=None, label_prefix=None):
+        for button in self.app.button:
+            if (key is not None and button.key == key) or (label_prefix and button.label.startswith(label_prefix)):
+                return button
+        raise SessionError(f"button {key or label_prefix!r} not found")
+
+    def _widget(self, widgets, label):
+        for widget in widgets:
+            if widget.label == label:
+                return widget
+        raise SessionError(f"widget {label!r} not found")
+
+    def _buttons_with_prefix(self, prefix):
+        return [button for button in self.app.button if button.key and button.key.startswith(prefix)]
+
+    def run(self):
+        app = self.app
+        self._rerun("open app")
+
+        level = self.rng.choice(LEVELS)
+        self._rerun("select level", self._button(key=f"adv1_level{level}").click())
+        self._rerun("load vocabulary", self._button(label_prefix="📚 Load Level").click())
+
+        # Study Mode: browse categories and difficulty filters
+        for category in self.rng.sample(CATEGORIES, 2):
+            self._rerun("browse category", self._widget(app.selectbox, "Select a Category").select(category))
+        for stars in ("⭐ Easy", "All Levels"):
+            self._rerun("filter difficulty", self._widget(app.radio, "Filter by Difficulty:").set_value(stars))
+        words = self._buttons_with_prefix("word_")
+        if words:
+            self._rerun("play word", self.rng.choice(words).click())
+
+        # Quiz Mode: one round of questions
+        self._rerun("open quiz", self._widget(app.radio, "Select Learning Mode").set_value("🎯 Quiz Mode"))
+        for _ in range(self.questions):
+            if "quiz_session" not in app.session_state or app.session_state["quiz_session"] is None:
+                break
+            quiz_session = app.session_state["quiz_session"]
+            if quiz_session.finished:
+                break
+            answer = app.radio(key=f"quiz_answer_{quiz_session.position}")
+            answer.set_value(self.rng.randrange(len(answer.options)))
+            self._rerun("choose answer", answer)
+            self._rerun("submit answer", self._button(label_prefix="✅ Submit Answer").click())
+            self._rerun("next question", self._button(label_prefix="🎲 New Question").click())
+
+        # Back to Study Mode to mark words as learned
+        self._rerun("open study", self._widget(app.radio, "Select Learning Mode").set_value("📖 Study Mode"))
+        for _ in range(self.learned):
+            learned = self._buttons_with_prefix("learned_")
+            if not learned:
+                break
+            self._rerun("mark learned", self.rng.choice(learned).click())
+        return self.timings
+
+
+def share_script_cache():
+    """
+    Compile the app once for every simulated session, like a real server
+
+    AppTest builds a fresh ScriptCache on every run, so each rerun recompiles
+    the script; concurrent compile() calls are both unrepresentative and able
+    to crash CPython's parser. A Streamlit server keeps one cache per process.
+    """
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+
+
+def run_users(users, questions, learned, think_time, seed, ramp):
+    """
+    Run one load level: `users` concurrent learner sessions
+
+    Returns:
+        dict: Per-action and overall rerun latency, throughput, CPU and RSS
+    """
+    workspace = copy_workspace(SHIPPED)
+    previous_dir = os.getcwd()
+    os.chdir(workspace)
+
+    def visit(user_id):
+        if ramp:
+            time.sleep(ramp * user_id / users)
+        session = LearnerSession(user_id, questions, learned, think_time, seed)
+        try:
+            session.run()
+            return session.timings, None
+        except Exception as e:
+            return session.timings, f"{type(e).__name__}: {e}"
+
+    cpu_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        with RssSampler() as rss:
+            with ThreadPoolExecutor(max_workers=users) as pool:
+                outcomes = list(pool.map(visit, range(users)))
+    finally:
+        os.chdir(previous_dir)
+    elapsed = time.perf_counter() - started
+    cpu_after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+
+    by_action = defaultdict(list)
+    service = []
+    for timings, _ in outcomes:
+        for action, latency, service_time in timings:
+            by_action[action].append(latency)
+            service.append(service_time)
+    latencies = [latency for values in by_action.values() for latency in values]
+    errors = [error for _, error in outcomes if error]
+
+    return {
+        'users': users,
+        'sessions_completed': users - len(errors),
+        'errors': errors,
+        'reruns': len(latencies),
+        'elapsed': elapsed,
+        'reruns_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency': percentiles(latencies),
+        'service_time': percentiles(service),
+        'actions': {action: dict(percentiles(values), count=len(values)) for action, values in by_action.items()},
+        'cpu_seconds': cpu_seconds,
+        'cpu_utilization': cpu_seconds / elapsed if elapsed else 0.0,
+        'rss_bytes': rss.summary()
+    }
+
+
+def _print_level(result):
+    latency = result['latency']
+    rss = result['rss_bytes']
+    print(f"{result['users']:>3} users: {result['reruns']} reruns, {result['reruns_per_second']:.1f}/s  "
+          f"p50 {_format_seconds(latency['p50'])}  p95 {_format_seconds(latency['p95'])}  "
+          f"p99 {_format_seconds(latency['p99'])}  service p50 {_format_seconds(result['service_time']['p50'])}  CPU {result['cpu_seconds']:.1f}s "
+          f"({result['cpu_utilization']:.0%})  RSS peak {rss['peak'] / 2 ** 20:.0f} MB")
+    for action, stats in sorted(result['actions'].items(), key=lambda item: -item[1]['p95']):
+        print(f"      {action:18} x{stats['count']:<5} p50 {_format_seconds(stats['p50'])}  "
+              f"p95 {_format_seconds(stats['p95'])}")
+    for error in result['errors']:
+        print(f"      ERROR {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app_advanced1.py with simulated learners")
+    parser.add_argument("--users", type=lambda value: [int(count) for count in value.split(",")],
+                        default=DEFAULT_USERS, help="Comma-separated concurrent user counts")
+    parser.add_argument("--questions", type=int, default=DEFAULT_QUESTIONS, help="Quiz questions per session")
+    parser.add_argument("--learned", type=int, default=DEFAULT_LEARNED, help="Words marked learned per session")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause in seconds before each interaction (0 for maximum load)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which user start times are spread")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/load-<commit>-<date>.json)")
+    args = parser.parse_args(argv)
+
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    share_script_cache()
+
+    levels = []
+    with fake_pyttsx3_backend():
+        for users in args.users:
+            result = run_users(users, args.questions, args.learned, args.think_time, args.seed, args.ramp)
+            levels.append(result)
+            _print_level(result)
+
+    document = {
+        'commit': _git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'app': os.path.basename(APP_FILE),
+        'questions': args.questions,
+        'learned': args.learned,
+        'think_time': args.think_time,
+        'ramp': args.ramp,
+        'seed': args.seed,
+        'levels': levels
+    }
+    write_results(document, args.output, prefix="load-")
+    return 1 if any(result['errors'] for result in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
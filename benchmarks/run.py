@@ -0,0 +1,259 @@
+"""
+Benchmark runner
+
+Discovers the asv-style benchmark classes in benchmarks/bench_*.py (classes
+named Time*, methods named time_*, parameterized by `params`), times every
+method for every corpus size and writes the results to a JSON file.
+
+Usage:
+    python -m benchmarks.run                          # every size, shipped to 1M words
+    python -m benchmarks.run --sizes shipped,10000    # quick run
+    python -m benchmarks.run --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import datetime
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import benchmarks
+from benchmarks.datasets import REPO_DIR, SIZES, SHIPPED
+
+# Constants
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+DEFAULT_REPEAT = 5
+MIN_SAMPLE_TIME = 0.02      # seconds per sample before calls are batched
+MAX_TIME_PER_CASE = 20.0    # seconds of sampling per benchmark and size
+DEFAULT_THRESHOLD = 1.2     # slowdown ratio reported as a regression
+
+
+def discover(pattern=None):
+    """
+    Find the benchmark methods
+
+    Args:
+        pattern (str): Optional regular expression matched against benchmark names
+
+    Returns:
+        tuple: (list of (name, class, method name), dict of module name -> import error)
+    """
+    found = []
+    skipped = {}
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module_name = f"benchmarks.{module_info.name}"
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            skipped[module_name] = str(e)
+            continue
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if not class_name.startswith("Time") or cls.__module__ != module_name:
+                continue
+            for method_name, _ in inspect.getmembers(cls, inspect.isfunction):
+                name = f"{module_info.name}.{class_name}.{method_name}"
+                if method_name.startswith("time_") and (not pattern or re.search(pattern, name)):
+                    found.append((name, cls, method_name))
+    return found, skipped
+
+
+def time_case(method, size, repeat=DEFAULT_REPEAT, max_time=MAX_TIME_PER_CASE):
+    """
+    Time one benchmark method for one size
+
+    The first call calibrates how many calls are batched per sample, so fast
+    methods are timed over at least MIN_SAMPLE_TIME.
+
+    Returns:
+        dict: Per-call statistics in seconds
+    """
+    started = time.perf_counter()
+    method(size)
+    first = time.perf_counter() - started
+    number = max(1, min(10_000, int(MIN_SAMPLE_TIME / first))) if first > 0 else 10_000
+
+    samples = []
+    deadline = time.perf_counter() + max_time
+    while len(samples) < repeat and (not samples or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        for _ in range(number):
+            method(size)
+        samples.append((time.perf_counter() - started) / number)
+
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': len(samples),
+        'number': number
+    }
+
+
+def run_benchmarks(sizes, pattern=None, repeat=DEFAULT_REPEAT, max_time=MAX_TIME_PER_CASE):
+    """
+    Run every discovered benchmark for every size
+
+    Returns:
+        dict: Results document (environment and benchmark name -> size -> statistics)
+    """
+    cases, skipped = discover(pattern)
+    results = {}
+    for name, cls, method_name in cases:
+        params = [size for size in getattr(cls, 'params', [None]) if size in sizes]
+        results[name] = {}
+        for size in params:
+            instance = cls()
+            try:
+                instance.setup(size)
+                try:
+                    stats = time_case(getattr(instance, method_name), size, repeat, max_time)
+                finally:
+                    instance.teardown(size)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                stats = {'error': f"{type(e).__name__}: {e}"}
+            results[name][str(size)] = stats
+            _print_case(name, size, stats)
+
+    return {
+        'commit': _git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'sizes': [str(size) for size in sizes],
+        'skipped': skipped,
+        'results': results
+    }
+
+
+def percentiles(latencies):
+    """
+    Summarize call latencies
+
+    Returns:
+        dict: p50, p95, p99, mean and max in seconds
+    """
+    if len(latencies) < 2:
+        value = latencies[0] if latencies else 0.0
+        return {'p50': value, 'p95': value, 'p99': value, 'mean': value, 'max': value}
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'p50': cuts[49],
+        'p95': cuts[94],
+        'p99': cuts[98],
+        'mean': statistics.mean(latencies),
+        'max': max(latencies)
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare median times against a baseline results document
+
+    Returns:
+        list: (name, size, baseline median, current median, ratio) for every regression
+    """
+    regressions = []
+    for name, by_size in current['results'].items():
+        for size, stats in by_size.items():
+            old = baseline.get('results', {}).get(name, {}).get(size)
+            if not old or 'median' not in old or 'median' not in stats or not old['median']:
+                continue
+            ratio = stats['median'] / old['median']
+            if ratio >= threshold:
+                regressions.append((name, size, old['median'], stats['median'], ratio))
+    return regressions
+
+
+def write_results(document, output=None, prefix=""):
+    """
+    Write a results document, by default to benchmarks/results/<prefix><commit>-<date>.json
+
+    Returns:
+        str: Path of the written file
+    """
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{prefix}{document.get('commit') or 'local'}-{stamp}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}")
+    return output
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def _print_case(name, size, stats):
+    if 'error' in stats:
+        print(f"{name} [{size}]: ERROR {stats['error']}")
+    else:
+        print(f"{name} [{size}]: {_format_seconds(stats['median'])} "
+              f"(min {_format_seconds(stats['min'])}, {stats['samples']}x{stats['number']})")
+
+
+def _parse_sizes(value):
+    return [SHIPPED if size == SHIPPED else int(size) for size in value.split(",") if size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the vocabulary builder benchmarks")
+    parser.add_argument("--sizes", type=_parse_sizes, default=SIZES,
+                        help="Comma-separated corpus sizes (default: shipped,10000,100000,1000000)")
+    parser.add_argument("--filter", help="Regular expression selecting benchmark names")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Samples per benchmark and size")
+    parser.add_argument("--max-time", type=float, default=MAX_TIME_PER_CASE,
+                        help="Sampling time limit per benchmark and size in seconds")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>-<date>.json)")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    document = run_benchmarks(args.sizes, args.filter, args.repeat, args.max_time)
+    for module_name, error in document['skipped'].items():
+        print(f"Skipped {module_name}: {error}")
+
+    write_results(document, args.output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(document, baseline, args.threshold)
+        for name, size, old, new, ratio in regressions:
+            print(f"REGRESSION {name} [{size}]: {_format_seconds(old)} -> {_format_seconds(new)} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
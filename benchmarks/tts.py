@@ -0,0 +1,171 @@
+"""
+TTS benchmark harness
+
+Replays a realistic stream of "play word/phrase" requests through the audio
+path with a fake TTS backend, at several concurrency levels, and reports
+per-call latency percentiles, throughput and audio cache hit rates.
+
+Two audio paths are measured:
+    uncached - create_audio_file + read + cleanup on every click (the old app code)
+    cached   - main.get_audio, which synthesizes each text once
+
+Usage:
+    python -m benchmarks.tts                                  # fake pyttsx3 backend
+    python -m benchmarks.tts --backend gtts-stub              # gTTS against a local HTTP stub
+    python -m benchmarks.tts --requests 1000 --concurrency 1,8,32 --distinct 300
+"""
+
+import argparse
+import datetime
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_tts import BACKENDS, DEFAULT_ENGINE_LATENCY, DEFAULT_STUB_LATENCY
+from benchmarks.run import percentiles, write_results, _git_commit, _format_seconds
+from corpus import get_level_corpus, SHIPPED_LEVELS
+from main import create_audio_file, cleanup_audio_file, get_audio, get_audio_cache_stats, clear_audio_cache, SPEED_OPTIONS
+
+# Constants
+PATHS = ["uncached", "cached"]
+DEFAULT_REQUESTS = 400
+DEFAULT_CONCURRENCY = [1, 4, 16]
+DEFAULT_DISTINCT = 200
+ZIPF_EXPONENT = 1.1     # learners replay a few words far more often than the rest
+
+
+def build_workload(requests, distinct, seed=0):
+    """
+    Draw a replayable request stream from the shipped vocabulary
+
+    Texts follow a Zipf distribution over `distinct` words and phrases
+    (English and Korean), with random speed settings.
+
+    Returns:
+        list: (text, is_phrase, speed) tuples
+    """
+    rng = random.Random(seed)
+    texts = []
+    for level in SHIPPED_LEVELS:
+        corpus = get_level_corpus(level)
+        if corpus:
+            for entry in corpus.words:
+                texts.append((entry['word'], False))
+                if entry.get('phrase'):
+                    texts.append((entry['phrase'], True))
+                if entry.get('korean_phrase'):
+                    texts.append((entry['korean_phrase'], True))
+    rng.shuffle(texts)
+    texts = texts[:distinct]
+    weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(len(texts))]
+    picks = rng.choices(texts, weights=weights, k=requests)
+    return [(text, is_phrase, rng.choice(SPEED_OPTIONS)) for text, is_phrase in picks]
+
+
+def _uncached_call(text, is_phrase, speed):
+    audio_file = create_audio_file(text, f"tts_{uuid.uuid4().hex}", is_phrase=is_phrase, speed=speed)
+    if not audio_file or not os.path.exists(audio_file):
+        return None
+    with open(audio_file, 'rb') as f:
+        audio = f.read()
+    cleanup_audio_file(audio_file)
+    return audio
+
+
+def _cached_call(text, is_phrase, speed):
+    return get_audio(text, is_phrase=is_phrase, speed=speed)
+
+
+def run_load(workload, path, concurrency):
+    """
+    Replay the workload through one audio path with a thread pool
+
+    Returns:
+        dict: Latency percentiles, throughput, failures and (cached path) cache statistics
+    """
+    call = _cached_call if path == "cached" else _uncached_call
+    clear_audio_cache()
+
+    def timed(request):
+        started = time.perf_counter()
+        result = call(*request)
+        return time.perf_counter() - started, result is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, workload))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in outcomes]
+    result = {
+        'requests': len(workload),
+        'failures': sum(1 for _, ok in outcomes if not ok),
+        'elapsed': elapsed,
+        'throughput': len(workload) / elapsed if elapsed else 0.0,
+        'latency': percentiles(latencies)
+    }
+    if path == "cached":
+        result['cache'] = get_audio_cache_stats()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the text-to-speech audio path with fake backends")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="fake-pyttsx3")
+    parser.add_argument("--latency", type=float,
+                        help=f"Simulated backend latency in seconds (default: {DEFAULT_ENGINE_LATENCY} for "
+                             f"fake-pyttsx3, {DEFAULT_STUB_LATENCY} for gtts-stub)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Requests per run")
+    parser.add_argument("--distinct", type=int, default=DEFAULT_DISTINCT, help="Distinct texts in the workload")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=DEFAULT_CONCURRENCY, help="Comma-separated thread counts")
+    parser.add_argument("--paths", type=lambda value: value.split(","), default=PATHS,
+                        help="Comma-separated audio paths: uncached,cached")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/tts-<commit>-<date>.json)")
+    args = parser.parse_args(argv)
+
+    workload = build_workload(args.requests, args.distinct, args.seed)
+    backend = BACKENDS[args.backend]
+    backend_args = {} if args.latency is None else {'latency': args.latency}
+
+    runs = []
+    with backend(**backend_args):
+        for path in args.paths:
+            for concurrency in args.concurrency:
+                result = run_load(workload, path, concurrency)
+                result.update(path=path, concurrency=concurrency)
+                runs.append(result)
+                latency = result['latency']
+                line = (f"{path:8} x{concurrency:<3} p50 {_format_seconds(latency['p50'])}  "
+                        f"p95 {_format_seconds(latency['p95'])}  p99 {_format_seconds(latency['p99'])}  "
+                        f"{result['throughput']:.1f} req/s")
+                if 'cache' in result:
+                    line += f"  hit rate {result['cache']['hit_rate']:.1%}"
+                if result['failures']:
+                    line += f"  FAILURES {result['failures']}"
+                print(line)
+
+    document = {
+        'commit': _git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'backend': args.backend,
+        'backend_latency': args.latency,
+        'requests': args.requests,
+        'distinct': args.distinct,
+        'seed': args.seed,
+        'runs': runs
+    }
+    write_results(document, args.output, prefix="tts-")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
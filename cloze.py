@@ -0,0 +1,129 @@
+"""
+Fill-in-the-blank (cloze) items for the Korean vocabulary
+Korean example phrases rarely contain the headword verbatim: 중요한 appears
+as 중요합니다, 아름다운 as 아름다웠습니다. The headword is located by comparing
+syllables from the start of each word of the phrase; the last matched
+syllable may differ in its final consonant or contract its vowel (ㅜ→ㅝ,
+ㅗ→ㅘ, ㅏ→ㅐ, ㅣ→ㅕ), which covers the common conjugated forms.
+
+Items are built in one batch when a level is indexed and stored on the
+entries as a ready-made template ('korean_cloze', with the blank already in
+place) and the blanked text ('cloze_answer'), so serving a question is a
+dictionary lookup.
+"""
+
+from hangul import decompose_syllable, contains_hangul, MEDIALS
+
+# Constants
+BLANK = "＿＿＿"
+MIN_MATCHED_SYLLABLES = 2   # shorter stems match too many unrelated words
+WORD_BOUNDARIES = " \t\n\"'“‘(["
+
+# Vowel contractions of verb and adjective stems (하 + 여 → 해, 되 + 어 → 돼 ...)
+_CONTRACTIONS = {
+    MEDIALS.index(stem): {MEDIALS.index(contracted) for contracted in forms}
+    for stem, forms in {'ㅏ': 'ㅐ', 'ㅗ': 'ㅘ', 'ㅜ': 'ㅝ', 'ㅣ': 'ㅕ', 'ㅚ': 'ㅙ', 'ㅡ': 'ㅓ'}.items()
+}
+
+
+def _loose_match(word_char, phrase_char):
+    """Same syllable up to a changed final consonant or a contracted vowel"""
+    word_parts = decompose_syllable(word_char)
+    phrase_parts = decompose_syllable(phrase_char)
+    if word_parts is None or phrase_parts is None or word_parts[0] != phrase_parts[0]:
+        return False
+    return word_parts[1] == phrase_parts[1] or phrase_parts[1] in _CONTRACTIONS.get(word_parts[1], ())
+
+
+def _match_length(word, phrase, start):
+    """Number of characters of phrase[start:] matching the headword"""
+    length = 0
+    limit = min(len(word), len(phrase) - start)
+    while length < limit and word[length] == phrase[start + length]:
+        length += 1
+    if length < limit and _loose_match(word[length], phrase[start + length]):
+        length += 1
+    return length
+
+
+def locate_headword(word, phrase):
+    """
+    Find the span of a Korean headword (or its conjugated form) in a phrase
+
+    Args:
+        word (str): Korean headword
+        phrase (str): Korean example phrase
+
+    Returns:
+        tuple or None: (start, end) of the matched text, or None if the
+        headword does not appear in the phrase
+    """
+    word = word.strip()
+    if not word or not phrase:
+        return None
+    # Exact occurrences count only at the start of a word (물 must not match 식물)
+    start = phrase.find(word)
+    while start >= 0:
+        if not start or phrase[start - 1] in WORD_BOUNDARIES:
+            return start, start + len(word)
+        start = phrase.find(word, start + 1)
+
+    required = min(len(word), MIN_MATCHED_SYLLABLES)
+    best = None
+    for start, char in enumerate(phrase):
+        if char != word[0] or (start and phrase[start - 1] not in WORD_BOUNDARIES):
+            continue
+        length = _match_length(word, phrase, start)
+        if length >= required and (best is None or length > best[1] - best[0]):
+            best = (start, start + length)
+    return best
+
+
+def build_cloze(word, phrase):
+    """
+    Build the cloze template of one phrase
+
+    Args:
+        word (str): Korean headword
+        phrase (str): Korean example phrase
+
+    Returns:
+        tuple or None: (template with the blank in place, blanked text), or
+        None if the headword is not found in the phrase
+    """
+    span = locate_headword(word, phrase)
+    if span is None:
+        return None
+    start, end = span
+    return phrase[:start] + BLANK + phrase[end:], phrase[start:end]
+
+
+def annotate_cloze(entries):
+    """
+    Add cloze items to every Korean entry of a word list in one batch
+
+    Entries whose 'korean_phrase' contains the headword gain 'korean_cloze'
+    (the phrase with the headword blanked) and 'cloze_answer' (the blanked
+    text); others are left untouched.
+
+    Args:
+        entries (list): List of word entry dictionaries (modified in place)
+
+    Returns:
+        int: Number of entries with a cloze item
+    """
+    items = {}
+    count = 0
+    for entry in entries:
+        word = entry.get('word', '')
+        phrase = entry.get('korean_phrase')
+        if not phrase or not contains_hangul(word) or not contains_hangul(phrase):
+            continue
+        key = (word, phrase)
+        if key not in items:
+            items[key] = build_cloze(word, phrase)
+        item = items[key]
+        if item is not None:
+            entry['korean_cloze'], entry['cloze_answer'] = item
+            count += 1
+    return count
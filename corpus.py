@@ -0,0 +1,401 @@
+"""
+Vocabulary corpus service shared by the vocabulary builder applications
+Parses each level file once per process and keeps precomputed indexes
+(category counts, category slices and headword lookup) for fast access
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from instrumentation import timer, record_bytes, record_cache
+from phrase_edits import flush_edits
+from shared_corpus import get_shared_corpus
+from pronunciation import annotate_entries
+from cloze import annotate_cloze
+from difficulty import score_entries, assign_stars
+from answer_analytics import load_error_rates
+from learned import load_learned_words, DEFAULT_LEARNED_FILE
+
+# Constants
+KOREAN_VOCABULARY_FILE = "data/korean.json"
+KOREAN_LEVELS = ("Korean", 4)
+LEVEL_FILES = {
+    1: "data/level1.json",
+    2: "data/level2.json",
+    3: "data/level3.json",
+    4: KOREAN_VOCABULARY_FILE,
+    "Korean": KOREAN_VOCABULARY_FILE
+}
+SHIPPED_LEVELS = (1, 2, 3, "Korean")
+
+# Process-wide cache: absolute path -> VocabularyCorpus
+_corpus_cache = {}
+_cache_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+# Set by track_changes(): keep per-category fingerprints so reloads reuse unchanged categories
+_tracking = {'enabled': False}
+
+# Merged headword index over the shipped levels, rebuilt when any level reloads.
+# The corpora themselves are kept (not their ids, which a reloaded corpus may reuse)
+_shipped_index = {'corpora': (), 'index': {}}
+
+
+class VocabularyCorpus:
+    """
+    Parsed level file with precomputed category and headword indexes
+
+    Entries are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, path, data, signature=None, level=None, error_rates=None,
+                 previous=None, fingerprint=False):
+        """
+        Build the corpus indexes from parsed level data
+
+        With a previous corpus of the same file that kept fingerprints, only
+        the categories whose content changed are annotated and scored again.
+
+        Args:
+            path (str): Path of the level file the data came from
+            data (dict): Dictionary of category name -> list of word entries
+            signature (tuple): File signature (mtime_ns, size) used for invalidation
+            level (int or str): Level identifier of the file (None if unknown)
+            error_rates (dict): Optional quiz history used by the difficulty scorer
+            previous (VocabularyCorpus): Earlier snapshot of the same file to reuse
+            fingerprint (bool): Keep category fingerprints for later incremental rebuilds
+        """
+        self.path = path
+        self.signature = signature
+        self.level = level
+        self.categories = {}
+        self.words = []
+        self.word_index = {}
+        self.fingerprints = None
+
+        reusable = getattr(previous, 'fingerprints', None)
+        if reusable is not None or fingerprint:
+            self.fingerprints = {category: _category_fingerprint(entries) for category, entries in data.items()}
+
+        changed = []
+        for category, entries in data.items():
+            if reusable is not None and reusable.get(category) == self.fingerprints[category]:
+                # Same content as the previous snapshot: copy its derived columns
+                category_words = [dict(entry) for entry in previous.categories[category]]
+            else:
+                category_words = [dict(entry, category=category) for entry in entries]
+                changed.extend(category_words)
+            for word_entry in category_words:
+                self.words.append(word_entry)
+                # First occurrence wins, matching the linear scans it replaces
+                self.word_index.setdefault(word_entry.get('word', '').strip().lower(), word_entry)
+            self.categories[category] = category_words
+
+        # Derived columns are computed once, at load time
+        annotate_entries(changed)
+        annotate_cloze(changed)
+        score_entries(changed, level, error_rates)
+        if len(changed) != len(self.words):
+            # Relative stars depend on the whole level, not just the changed categories
+            assign_stars(self.words)
+        self.reindexed = len(changed)
+
+        self.category_counts = {category: len(words) for category, words in self.categories.items()}
+        self._slices = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def category_names(self):
+        """
+        Get the category names in file order
+
+        Returns:
+            list: Category names
+        """
+        return list(self.categories.keys())
+
+    def get_category(self, category, limit=None):
+        """
+        Get the words of one category, optionally limited to the first N entries
+
+        Args:
+            category (str): Category name
+            limit (int): Maximum number of words to return (None for all)
+
+        Returns:
+            list: Word entries of the category (empty if the category is unknown)
+        """
+        words = self.categories.get(category)
+        if words is None:
+            words = self.categories.get(category.lower(), [])
+        if limit is None:
+            return words
+
+        key = (category, limit)
+        sliced = self._slices.get(key)
+        if sliced is None:
+            sliced = words[:limit]
+            self._slices[key] = sliced
+        return sliced
+
+    def lookup(self, word):
+        """
+        Find a word entry by its headword (Hangul or case-insensitive English)
+
+        Args:
+            word (str): Headword to look up
+
+        Returns:
+            dict or None: The word entry, or None if not found
+        """
+        return self.word_index.get(word.strip().lower())
+
+    def to_word_pools(self):
+        """
+        Get the corpus in the word pools format used by load_word_pools
+
+        Returns:
+            dict: Dictionary of category name -> list of word entries
+        """
+        return dict(self.categories)
+
+
+def _category_fingerprint(entries):
+    return hashlib.blake2b(json.dumps(entries, sort_keys=True).encode('utf-8'), digest_size=16).digest()
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _level_for_path(path):
+    path = os.path.normpath(path)
+    for level, level_file in LEVEL_FILES.items():
+        if os.path.normpath(level_file) == path:
+            return level
+    return None
+
+
+def get_corpus(path):
+    """
+    Get the cached corpus for a level file, reparsing it only when the file changed
+
+    Args:
+        path (str): Path to the level JSON file
+
+    Returns:
+        VocabularyCorpus or None: The corpus, or None if the file is missing or invalid
+    """
+    key = os.path.abspath(path)
+    # Buffered phrase edits go to disk first so the signature check sees them
+    flush_edits(key)
+    try:
+        signature = _file_signature(key)
+    except OSError:
+        logger.error("%s not found", path)
+        return None
+
+    # Multi-process mode: map the corpus compiled by the loader process (VOCAB_SHARED_CORPUS)
+    shared = get_shared_corpus(key, signature)
+    if shared is not None:
+        # Drop any private copy parsed while the compiled file was stale
+        _corpus_cache.pop(key, None)
+        record_cache("corpus", True)
+        return shared
+
+    corpus = _corpus_cache.get(key)
+    if corpus is not None and corpus.signature == signature:
+        record_cache("corpus", True)
+        return corpus
+
+    with _cache_lock:
+        corpus = _corpus_cache.get(key)
+        if corpus is not None and corpus.signature == signature:
+            record_cache("corpus", True)
+            return corpus
+        record_cache("corpus", False)
+        corpus = parse_corpus(path, signature, previous=_corpus_cache.get(key))
+        if corpus is not None:
+            _corpus_cache[key] = corpus
+        return corpus
+
+
+def parse_corpus(path, signature=None, previous=None):
+    """
+    Parse and index a level file, bypassing the caches
+
+    Args:
+        path (str): Path to the level JSON file
+        signature (tuple): File signature taken before reading (stat'ed here if omitted)
+        previous (VocabularyCorpus): Earlier snapshot whose unchanged categories are reused
+
+    Returns:
+        VocabularyCorpus or None: The corpus, or None if the file is missing or invalid
+    """
+    key = os.path.abspath(path)
+    try:
+        if signature is None:
+            signature = _file_signature(key)
+        with timer("corpus.parse"), open(key, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error("Error loading corpus %s: %s", path, e)
+        return None
+    record_bytes("corpus.parse", read=signature[1])
+    with timer("corpus.index"):
+        return VocabularyCorpus(path, data, signature, _level_for_path(path), load_error_rates(),
+                                previous=previous, fingerprint=_tracking['enabled'])
+
+
+def reload_corpus(path):
+    """
+    Rebuild the cached corpus of a changed level file and swap it in
+
+    Readers holding the old corpus keep a consistent snapshot; new readers
+    get the rebuilt one. Categories that did not change are reused when
+    change tracking is on (see track_changes).
+
+    Args:
+        path (str): Path to the level JSON file
+
+    Returns:
+        VocabularyCorpus or None: The new corpus, or None if the file is missing or invalid
+    """
+    key = os.path.abspath(path)
+    flush_edits(key)
+    with _cache_lock:
+        previous = _corpus_cache.get(key)
+        try:
+            signature = _file_signature(key)
+        except OSError:
+            _corpus_cache.pop(key, None)
+            return None
+        if previous is not None and previous.signature == signature:
+            return previous
+        corpus = parse_corpus(path, signature, previous=previous)
+        if corpus is not None:
+            _corpus_cache[key] = corpus
+            logger.info("Reloaded %s (%d of %d entries reindexed)", path, corpus.reindexed, len(corpus))
+        return corpus
+
+
+def track_changes(enabled=True):
+    """
+    Keep per-category fingerprints so reloads only reindex changed categories
+
+    Costs one hash of each category per build; turned on by the data watcher.
+
+    Args:
+        enabled (bool): Whether corpora built from now on keep fingerprints
+    """
+    _tracking['enabled'] = enabled
+
+
+def get_level_file(level):
+    """
+    Map a level identifier to its JSON file
+
+    Args:
+        level (int or str): Level number (1-4) or "Korean"
+
+    Returns:
+        str or None: Path to the level file, or None for unknown levels
+    """
+    return LEVEL_FILES.get(level)
+
+
+def get_level_corpus(level):
+    """
+    Get the cached corpus for a level identifier
+
+    Args:
+        level (int or str): Level number (1-4) or "Korean"
+
+    Returns:
+        VocabularyCorpus or None: The corpus, or None if unavailable
+    """
+    path = get_level_file(level)
+    if not path:
+        return None
+    return get_corpus(path)
+
+
+def get_korean_corpus():
+    """
+    Get the cached Korean vocabulary corpus
+
+    Returns:
+        VocabularyCorpus or None: The corpus, or None if korean.json is unavailable
+    """
+    return get_corpus(KOREAN_VOCABULARY_FILE)
+
+
+def load_vocabulary_with_expressions(level, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Load the word entries of a level with expressions included
+
+    Args:
+        level (int or str): Level number (1-4), "Korean" or "learned"
+        learned_file (str): Learned words file used for the "learned" level
+
+    Returns:
+        list: List of word entries with their category (empty for unknown levels)
+    """
+    if level == "learned":
+        return load_learned_words(learned_file)
+
+    # Level files are parsed once per process by the shared corpus cache
+    corpus = get_level_corpus(level)
+    return list(corpus.words) if corpus else []
+
+
+def find_entry(word, level=None):
+    """
+    Find a shipped word entry, preferring the given level
+
+    Args:
+        word (str): Headword to look up
+        level (int or str): Level to search first (None to search all shipped levels)
+
+    Returns:
+        dict or None: The word entry, or None if the word is not shipped
+    """
+    if level is not None:
+        corpus = get_level_corpus(level)
+        entry = corpus.lookup(word) if corpus else None
+        if entry is not None:
+            return entry
+
+    corpora = [get_level_corpus(shipped) for shipped in SHIPPED_LEVELS]
+    if any(getattr(corpus, 'shared', False) for corpus in corpora):
+        # Mapped corpora: look up each level rather than copying their indexes into this process
+        for corpus in corpora:
+            entry = corpus.lookup(word) if corpus else None
+            if entry is not None:
+                return entry
+        return None
+
+    indexed = _shipped_index['corpora']
+    if len(indexed) != len(corpora) or any(old is not new for old, new in zip(indexed, corpora)):
+        index = {}
+        for corpus in corpora:
+            if corpus:
+                for headword, entry in corpus.word_index.items():
+                    index.setdefault(headword, entry)
+        _shipped_index['index'] = index
+        _shipped_index['corpora'] = tuple(corpora)
+    return _shipped_index['index'].get(word.strip().lower())
+
+
+def clear_corpus_cache():
+    """
+    Drop all cached corpora so the next access reparses the files
+    """
+    with _cache_lock:
+        _corpus_cache.clear()
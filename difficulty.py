@@ -0,0 +1,212 @@
+"""
+Data-driven difficulty scoring for vocabulary entries
+Scores are computed in one batch per level load from word length,
+syllable/jamo counts, level membership and (when available) quiz error
+rates, and stored on each entry as a star rating
+"""
+
+import re
+
+from hangul import contains_hangul, count_syllables, to_jamo
+
+# Constants
+DIFFICULTY_STARS = ["⭐", "⭐⭐", "⭐⭐⭐"]
+DIFFICULTY_FILTERS = {
+    "⭐ Easy": "⭐",
+    "⭐⭐ Medium": "⭐⭐",
+    "⭐⭐⭐ Hard": "⭐⭐⭐"
+}
+DEFAULT_DIFFICULTY = "⭐⭐"
+
+# Baseline difficulty contributed by the level a word ships in
+LEVEL_WEIGHTS = {
+    1: 0.0,
+    2: 0.5,
+    3: 1.0,
+    4: 0.5,
+    "Korean": 0.5,
+    "learned": 0.5
+}
+
+# Relative weight of each signal in the combined score
+FORM_WEIGHT = 0.6
+LEVEL_WEIGHT = 0.2
+ERROR_WEIGHT = 0.2
+
+# Quiz answers needed before an error rate is trusted
+MIN_ATTEMPTS = 5
+
+# Absolute star thresholds, used for single words and small batches
+STAR_THRESHOLDS = (0.35, 0.55)
+
+# Batches at least this large are rated by rank (easiest third gets one star)
+RELATIVE_MIN_ENTRIES = 30
+
+_vowel_groups = re.compile(r'[aeiouy]+')
+
+
+def _clip(value):
+    return 0.0 if value < 0.0 else 1.0 if value > 1.0 else value
+
+
+def english_syllables(word):
+    """
+    Estimate the number of syllables in an English word from its vowel groups
+
+    Args:
+        word (str): English word
+
+    Returns:
+        int: Estimated syllable count (at least 1)
+    """
+    word = word.lower()
+    count = len(_vowel_groups.findall(word))
+    if word.endswith('e') and not word.endswith(('le', 'ee')) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def form_score(word):
+    """
+    Score how hard a word looks on its own, between 0.0 and 1.0
+
+    English words use letter and syllable counts; Korean words use
+    syllable and jamo counts.
+
+    Args:
+        word (str): The vocabulary word
+
+    Returns:
+        float: Form difficulty score
+    """
+    word = word.strip()
+    if contains_hangul(word):
+        syllables = count_syllables(word)
+        jamo = len(to_jamo(word).replace(' ', ''))
+        return 0.5 * _clip((syllables - 2) / 3) + 0.5 * _clip((jamo - 5) / 8)
+
+    letters = sum(1 for char in word if char.isalpha())
+    return 0.5 * _clip((letters - 4) / 9) + 0.5 * _clip((english_syllables(word) - 1) / 4)
+
+
+def score_to_stars(score):
+    """
+    Convert a combined score into a star rating
+
+    Args:
+        score (float): Combined difficulty score between 0.0 and 1.0
+
+    Returns:
+        str: "⭐", "⭐⭐" or "⭐⭐⭐"
+    """
+    if score < STAR_THRESHOLDS[0]:
+        return DIFFICULTY_STARS[0]
+    if score < STAR_THRESHOLDS[1]:
+        return DIFFICULTY_STARS[1]
+    return DIFFICULTY_STARS[2]
+
+
+def score_entries(entries, level=None, error_rates=None):
+    """
+    Compute difficulty for every entry of a level in one batch
+
+    Each entry gains 'difficulty_score' (0.0-1.0, comparable across levels)
+    and 'difficulty' (stars). In a full level the stars split the words into
+    thirds by score, so every level has easy, medium and hard words.
+
+    Args:
+        entries (list): List of word entry dictionaries (modified in place)
+        level (int or str): Level the entries belong to (None if unknown)
+        error_rates (dict): Optional word (lowercase) -> (errors, attempts) from quiz history
+
+    Returns:
+        int: Number of entries scored
+    """
+    level_score = LEVEL_WEIGHTS.get(level)
+    error_rates = error_rates or {}
+    form_cache = {}
+    scores = []
+
+    for entry in entries:
+        word = entry.get('word', '')
+        form = form_cache.get(word)
+        if form is None:
+            form = form_score(word)
+            form_cache[word] = form
+
+        total = FORM_WEIGHT * form
+        weight = FORM_WEIGHT
+        if level_score is not None:
+            total += LEVEL_WEIGHT * level_score
+            weight += LEVEL_WEIGHT
+        history = error_rates.get(word.lower())
+        if history and history[1] >= MIN_ATTEMPTS:
+            total += ERROR_WEIGHT * (history[0] / history[1])
+            weight += ERROR_WEIGHT
+
+        score = total / weight
+        entry['difficulty_score'] = round(score, 3)
+        scores.append(score)
+
+    assign_stars(entries, scores)
+    return len(entries)
+
+
+def assign_stars(entries, scores=None):
+    """
+    Set the star rating of scored entries
+
+    Batches of at least RELATIVE_MIN_ENTRIES are split into thirds by score;
+    smaller ones use the absolute thresholds.
+
+    Args:
+        entries (list): Word entries (modified in place)
+        scores (list): Unrounded scores in entry order (default: each entry's 'difficulty_score')
+    """
+    if scores is None:
+        scores = [entry.get('difficulty_score', 0.0) for entry in entries]
+    if len(entries) >= RELATIVE_MIN_ENTRIES:
+        order = sorted(range(len(entries)), key=scores.__getitem__)
+        third = len(entries) / 3
+        for rank, position in enumerate(order):
+            entries[position]['difficulty'] = DIFFICULTY_STARS[min(int(rank / third), 2)]
+    else:
+        for entry, score in zip(entries, scores):
+            entry['difficulty'] = score_to_stars(score)
+
+
+def get_word_difficulty(word, level=None):
+    """
+    Compute the difficulty of a single word that is not part of a loaded level
+
+    Args:
+        word (str): The vocabulary word
+        level (int or str): Level the word belongs to (None if unknown)
+
+    Returns:
+        str: Star rating
+    """
+    entry = {'word': word}
+    score_entries([entry], level)
+    return entry['difficulty']
+
+
+def get_difficulty(word, level=None):
+    """
+    Get the difficulty of a word from the precomputed level columns
+
+    Shipped words are a dictionary lookup; other words are scored on the fly.
+
+    Args:
+        word (str): The vocabulary word
+        level (int or str): Level to look the word up in first (None for any level)
+
+    Returns:
+        str: Star rating
+    """
+    from corpus import find_entry
+
+    entry = find_entry(word, level if level != "learned" else None)
+    if entry is not None:
+        return entry.get('difficulty', DEFAULT_DIFFICULTY)
+    return get_word_difficulty(word, level)
@@ -0,0 +1,404 @@
+"""
+Vocabulary export for the vocabulary builder applications
+Streams level words or learned words to CSV, JSON Lines or an Anki deck
+(.apkg). Rows are produced by generators and written as they come, so
+memory stays flat however long the list is; Anki decks bundle the images
+and any audio already in the audio cache without synthesizing new speech.
+The audio cache lives in the memory of the running app, so only the export
+button of the app bundles cached audio; the command line starts with an
+empty cache and bundles audio only with --synthesize-audio.
+
+Usage:
+    python exporter.py --level learned --format apkg --output learned.apkg
+    python exporter.py --level 2 --format csv --output level2.csv
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+
+from corpus import load_vocabulary_with_expressions
+from learned import migrate_legacy_learned_file, DEFAULT_LEARNED_FILE
+from instrumentation import timed, record_file
+from main import get_audio, get_cached_audio, SPEED_OPTIONS
+from services import find_media, IMAGE_EXTENSIONS
+
+# Constants
+EXPORT_FORMATS = ("csv", "jsonl", "apkg")
+EXPORT_FIELDS = ["word", "meaning", "phrase", "category", "korean_phrase", "expressions",
+                 "korean_expressions", "learned_date"]
+LIST_SEPARATOR = ";"        # joins expressions inside one CSV cell, as importer.py splits them
+MIME_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "apkg": "application/octet-stream"
+}
+
+# Anki note type: one note per word, a recognition and a recall card
+ANKI_FIELDS = ["Word", "Meaning", "Phrase", "Korean Phrase", "Category", "Audio", "Image"]
+ANKI_TEMPLATES = [
+    ("Word → Meaning", "<div class=word>{{Word}}</div>{{Audio}}",
+     "{{FrontSide}}<hr id=answer>{{Meaning}}<div class=phrase>{{Phrase}}</div>"
+     "<div class=phrase>{{Korean Phrase}}</div>{{Image}}"),
+    ("Meaning → Word", "{{Meaning}}",
+     "{{FrontSide}}<hr id=answer><div class=word>{{Word}}</div>{{Audio}}<div class=phrase>{{Phrase}}</div>{{Image}}")
+]
+ANKI_CSS = """.card { font-family: Arial; font-size: 22px; text-align: center; color: black; background-color: white; }
+.word { font-size: 34px; font-weight: bold; }
+.phrase { font-style: italic; margin-top: 12px; }
+img { max-width: 90%; margin-top: 12px; }"""
+ANKI_SCHEMA = """
+CREATE TABLE col (id integer primary key, crt integer not null, mod integer not null, scm integer not null,
+    ver integer not null, dty integer not null, usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null, tags text not null);
+CREATE TABLE notes (id integer primary key, guid text not null, mid integer not null, mod integer not null,
+    usn integer not null, tags text not null, flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null);
+CREATE TABLE cards (id integer primary key, nid integer not null, did integer not null, ord integer not null,
+    mod integer not null, usn integer not null, type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null, lapses integer not null,
+    left integer not null, odue integer not null, odid integer not null, flags integer not null, data text not null);
+CREATE TABLE revlog (id integer primary key, cid integer not null, usn integer not null, ease integer not null,
+    ivl integer not null, lastIvl integer not null, factor integer not null, time integer not null,
+    type integer not null);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def iter_export_entries(level, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Stream the entries of a level, or the learned words, restricted to EXPORT_FIELDS
+
+    Args:
+        level (int or str): Level number (1-4), "Korean" or "learned"
+        learned_file (str): Learned words file used for the "learned" level
+
+    Yields:
+        dict: Word entry with the exported fields that are present
+    """
+    for entry in load_vocabulary_with_expressions(level, learned_file):
+        yield {field: entry[field] for field in EXPORT_FIELDS if entry.get(field) not in (None, "")}
+
+
+def iter_csv(entries):
+    """
+    Serialize entries as CSV text, one chunk per row (header first)
+
+    Args:
+        entries (iterable): Word entries
+
+    Yields:
+        str: CSV text
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for entry in entries:
+        writer.writerow([LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                         for value in (entry.get(field, "") for field in EXPORT_FIELDS)])
+        yield flush()
+
+
+def iter_jsonl(entries):
+    """
+    Serialize entries as JSON Lines
+
+    Args:
+        entries (iterable): Word entries
+
+    Yields:
+        str: One JSON object and newline per entry
+    """
+    for entry in entries:
+        yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+def _find_image(entry):
+    """Image of a word: its 'media' path, or media/<word>.<ext> as the apps look it up"""
+    path = entry.get('media')
+    if path and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS and os.path.isfile(path):
+        return path
+    media = find_media(entry.get('word', ''), kinds=("image",))
+    return media[0] if media else None
+
+
+def _find_audio(text, synthesize=False):
+    """Speech for a word from this process's audio cache at any speed; synthesized only when asked to"""
+    for speed in SPEED_OPTIONS:
+        audio = get_cached_audio(text, is_phrase=False, speed=speed)
+        if audio:
+            return audio
+    return get_audio(text, is_phrase=False) if synthesize else None
+
+
+def _anki_id(*parts):
+    """Stable positive 63-bit id, so re-exporting the same deck updates it instead of duplicating"""
+    return int.from_bytes(hashlib.sha1("\x1f".join(str(part) for part in parts).encode('utf-8')).digest()[:8], 'big') >> 1
+
+
+def _field_checksum(text):
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _anki_collection(connection, deck_name, deck_id, model_id, now):
+    """Create the collection tables and the row describing the deck and note type"""
+    connection.executescript(ANKI_SCHEMA)
+    model = {
+        'id': model_id, 'name': "Vocabulary Builder", 'type': 0, 'mod': now, 'usn': -1, 'sortf': 0,
+        'did': deck_id, 'tags': [], 'vers': [], 'css': ANKI_CSS,
+        'latexPre': "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n\\usepackage{amssymb,amsmath}\n"
+                    "\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+        'latexPost': "\\end{document}", 'latexsvg': False,
+        'flds': [{'name': name, 'ord': index, 'sticky': False, 'rtl': False, 'font': "Arial", 'size': 20,
+                  'media': []} for index, name in enumerate(ANKI_FIELDS)],
+        'tmpls': [{'name': name, 'ord': index, 'qfmt': front, 'afmt': back, 'did': None, 'bqfmt': "", 'bafmt': ""}
+                  for index, (name, front, back) in enumerate(ANKI_TEMPLATES)],
+        'req': [[0, "any", [0]], [1, "any", [1]]]
+    }
+    deck_defaults = {'desc': "", 'mod': now, 'usn': -1, 'collapsed': False, 'browserCollapsed': False,
+                     'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0],
+                     'dyn': 0, 'extendNew': 10, 'extendRev': 50, 'conf': 1}
+    decks = {
+        "1": dict(deck_defaults, id=1, name="Default"),
+        str(deck_id): dict(deck_defaults, id=deck_id, name=deck_name)
+    }
+    deck_config = {"1": {
+        'id': 1, 'name': "Default", 'mod': 0, 'usn': 0, 'maxTaken': 60, 'autoplay': True, 'timer': 0,
+        'replayq': True, 'dyn': False,
+        'new': {'delays': [1, 10], 'ints': [1, 4, 7], 'initialFactor': 2500, 'separate': True, 'order': 1,
+                'perDay': 20, 'bury': True},
+        'lapse': {'delays': [10], 'mult': 0, 'minInt': 1, 'leechFails': 8, 'leechAction': 0},
+        'rev': {'perDay': 100, 'ease4': 1.3, 'fuzz': 0.05, 'minSpace': 1, 'ivlFct': 1, 'maxIvl': 36500,
+                'bury': True, 'hardFactor': 1.2}
+    }}
+    conf = {'activeDecks': [deck_id], 'curDeck': deck_id, 'newSpread': 0, 'collapseTime': 1200, 'timeLim': 0,
+            'estTimes': True, 'dueCounts': True, 'curModel': model_id, 'nextPos': 1, 'sortType': "noteFld",
+            'sortBackwards': False, 'addToCur': True}
+    connection.execute("INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+                       (now, now * 1000, now * 1000, json.dumps(conf), json.dumps({str(model_id): model}),
+                        json.dumps(decks), json.dumps(deck_config)))
+
+
+@timed()
+def write_apkg(entries, output, deck_name="Vocabulary Builder", include_audio=True, include_images=True,
+               synthesize_audio=False):
+    """
+    Write entries as an Anki deck package
+
+    Notes are inserted into an on-disk SQLite collection as they stream in and
+    media files are added to the zip one at a time, so memory stays flat.
+
+    Args:
+        entries (iterable): Word entries
+        output (str or file): Path or writable binary file for the .apkg
+        deck_name (str): Name of the Anki deck
+        include_audio (bool): Bundle word audio found in the audio cache
+        include_images (bool): Bundle word images found in the media folder
+        synthesize_audio (bool): Synthesize audio missing from the cache (slow)
+
+    Returns:
+        dict: notes, audio and images counts
+    """
+    now = int(time.time())
+    deck_id = _anki_id("deck", deck_name)
+    model_id = _anki_id("model", "Vocabulary Builder", len(ANKI_FIELDS), len(ANKI_TEMPLATES))
+    counts = {'notes': 0, 'audio': 0, 'images': 0}
+    media = {}          # index in the package -> file name shown to Anki
+    media_names = {}    # source key -> file name, so shared media is packed once
+
+    with tempfile.TemporaryDirectory(prefix="vocab-export-") as work_dir, \
+            zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as package:
+        collection_path = os.path.join(work_dir, "collection.anki2")
+        connection = sqlite3.connect(collection_path)
+        try:
+            _anki_collection(connection, deck_name, deck_id, model_id, now)
+
+            def add_media(key, name, data=None, path=None):
+                if key in media_names:
+                    return media_names[key]
+                index = str(len(media))
+                if path is not None:
+                    package.write(path, index, compress_type=zipfile.ZIP_STORED)
+                else:
+                    package.writestr(index, data, compress_type=zipfile.ZIP_STORED)
+                media[index] = name
+                media_names[key] = name
+                return name
+
+            for position, entry in enumerate(entries):
+                word = entry.get('word', '')
+                audio_field = image_field = ""
+                if include_audio and word:
+                    audio = _find_audio(word, synthesize_audio)
+                    if audio:
+                        extension = "mp3" if audio[1] == 'audio/mp3' else "wav"
+                        name = f"vocab_{hashlib.sha1(word.encode('utf-8')).hexdigest()[:12]}.{extension}"
+                        audio_field = f"[sound:{add_media(('audio', word), name, data=audio[0])}]"
+                        counts['audio'] += 1
+                if include_images:
+                    image_path = _find_image(entry)
+                    if image_path:
+                        digest = hashlib.sha1(os.path.abspath(image_path).encode('utf-8')).hexdigest()[:8]
+                        name = f"{digest}_{os.path.basename(image_path)}"
+                        image_field = f'<img src="{add_media(("image", image_path), name, path=image_path)}">'
+                        counts['images'] += 1
+
+                fields = [word, entry.get('meaning', ''), entry.get('phrase', ''), entry.get('korean_phrase', ''),
+                          entry.get('category', ''), audio_field, image_field]
+                note_id = _anki_id("note", deck_name, word, position)
+                guid = format(_anki_id("guid", deck_name, word.lower()), 'x')
+                connection.execute("INSERT INTO notes VALUES (?, ?, ?, ?, -1, ?, ?, ?, ?, 0, '')",
+                                   (note_id, guid, model_id, now, f" {entry.get('category', '')} ",
+                                    "\x1f".join(fields), word, _field_checksum(word)))
+                for template_index in range(len(ANKI_TEMPLATES)):
+                    connection.execute(
+                        "INSERT INTO cards VALUES (?, ?, ?, ?, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+                        (_anki_id("card", note_id, template_index), note_id, deck_id, template_index, now, position))
+                counts['notes'] += 1
+            connection.commit()
+        finally:
+            connection.close()
+
+        package.write(collection_path, "collection.anki2")
+        package.writestr("media", json.dumps(media))
+    return counts
+
+
+def _open_text(output):
+    if isinstance(output, (str, os.PathLike)):
+        return open(output, 'w', encoding='utf-8', newline=''), True
+    return io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True), False
+
+
+@timed()
+def export_vocabulary(level, file_format, output, deck_name=None, include_audio=True, include_images=True,
+                      synthesize_audio=False, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Export a level or the learned words
+
+    Args:
+        level (int or str): Level number (1-4), "Korean" or "learned"
+        file_format (str): "csv", "jsonl" or "apkg"
+        output (str or file): Path or writable binary file
+        deck_name (str): Anki deck name (defaults to one naming the level)
+        include_audio (bool): Anki only - bundle cached word audio
+        include_images (bool): Anki only - bundle word images
+        synthesize_audio (bool): Anki only - synthesize audio missing from the cache
+        learned_file (str): Learned words file used for the "learned" level
+
+    Returns:
+        int: Number of exported words
+    """
+    counts = {'words': 0}
+
+    def counted(entries):
+        for entry in entries:
+            counts['words'] += 1
+            yield entry
+
+    entries = counted(iter_export_entries(level, learned_file))
+    if file_format == "apkg":
+        name = deck_name or ("Vocabulary Builder - Learned Words" if level == "learned"
+                             else f"Vocabulary Builder - Level {level}")
+        media = write_apkg(entries, output, name, include_audio, include_images, synthesize_audio)
+        logger.debug("Packed %d audio files and %d images", media['audio'], media['images'])
+    elif file_format in ("csv", "jsonl"):
+        chunks = iter_csv(entries) if file_format == "csv" else iter_jsonl(entries)
+        text, owned = _open_text(output)
+        try:
+            for chunk in chunks:
+                text.write(chunk)
+        finally:
+            if owned:
+                text.close()
+            else:
+                text.detach()
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    if isinstance(output, (str, os.PathLike)):
+        record_file("export_vocabulary", output, written=True)
+    logger.debug("Exported %d words of level %s as %s", counts['words'], level, file_format)
+    return counts['words']
+
+
+def export_to_bytes(level, file_format, **options):
+    """
+    Export into memory, for download buttons
+
+    Args:
+        level (int or str): Level number (1-4), "Korean" or "learned"
+        file_format (str): "csv", "jsonl" or "apkg"
+        **options: Further export_vocabulary arguments
+
+    Returns:
+        tuple: (file contents as bytes, number of exported words)
+    """
+    buffer = io.BytesIO()
+    exported = export_vocabulary(level, file_format, buffer, **options)
+    return buffer.getvalue(), exported
+
+
+def export_file_name(level, file_format):
+    """
+    Suggest a download file name
+
+    Returns:
+        str: e.g. vocabulary-level2-20250101.csv
+    """
+    label = "learned" if level == "learned" else f"level{level}".lower()
+    return f"vocabulary-{label}-{datetime.date.today():%Y%m%d}.{file_format}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export vocabulary or learned words to CSV, JSON Lines or Anki")
+    parser.add_argument("--level", default="learned", help="1, 2, 3, Korean or learned (default: learned)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", help="Output file (default: vocabulary-<level>-<date>.<format>)")
+    parser.add_argument("--deck-name", help="Anki deck name")
+    parser.add_argument("--no-audio", action="store_true",
+                        help="Anki: do not bundle audio (without --synthesize-audio there is none to bundle: "
+                             "the audio cache is held by a running app, not on disk)")
+    parser.add_argument("--no-images", action="store_true", help="Anki: do not bundle images")
+    parser.add_argument("--synthesize-audio", action="store_true",
+                        help="Anki: synthesize speech for the words (slow; needed for audio from the command line)")
+    args = parser.parse_args(argv)
+
+    level = int(args.level) if args.level.isdigit() else args.level
+    migrate_legacy_learned_file()
+    output = args.output or export_file_name(level, args.format)
+    exported = export_vocabulary(level, args.format, output, args.deck_name, not args.no_audio,
+                                 not args.no_images, args.synthesize_audio)
+    print(f"Exported {exported} words to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
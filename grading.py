@@ -0,0 +1,243 @@
+"""
+Typed-answer grading for the vocabulary quizzes
+Answers are compared after normalization (case, spacing, trailing
+punctuation) and, for Hangul, after decomposition into jamo, so typing one
+wrong vowel in 중요한 is a single edit rather than a whole wrong syllable.
+The edit distance is a banded Levenshtein that stops as soon as every cell
+of a row exceeds the allowed distance, so grading one answer costs a few
+microseconds. The batch grader re-grades typed answers from the answer log
+for offline evaluation, grading each distinct (word, answer) pair once.
+
+Usage:
+    python grading.py --log-dir data/answers [--user NAME] [--max-distance N]
+"""
+
+import argparse
+import json
+import sys
+import unicodedata
+from collections import Counter, namedtuple
+from itertools import compress
+
+from hangul import to_jamo, contains_hangul
+from answer_log import get_answer_log, DEFAULT_ANSWER_LOG_DIR
+from answer_analytics import select_user
+from instrumentation import timed
+
+# Constants
+TYPED_QUIZ_TYPE = "Typed Answer"
+CORRECT = "correct"
+NEAR_MISS = "near_miss"
+WRONG = "wrong"
+UNITS_PER_EDIT = 4          # one allowed edit per 4 letters or jamo
+MAX_NEAR_MISS_DISTANCE = 3
+TRAILING_PUNCTUATION = ".!?,;:"
+
+Grade = namedtuple("Grade", ["verdict", "distance"])
+
+
+def normalize_answer(text):
+    """
+    Normalize a typed or expected answer for comparison
+
+    Args:
+        text (str): Answer text
+
+    Returns:
+        str: NFC text, lowercased, with single spaces and no trailing punctuation
+    """
+    text = unicodedata.normalize("NFC", str(text))
+    return " ".join(text.lower().split()).rstrip(TRAILING_PUNCTUATION).strip()
+
+
+def comparison_units(text):
+    """
+    Get the sequence an answer is compared on (jamo for Hangul, letters otherwise)
+
+    Args:
+        text (str): Normalized answer
+
+    Returns:
+        str: Jamo string for Hangul text, the text itself otherwise
+    """
+    return to_jamo(text) if contains_hangul(text) else text
+
+
+def bounded_levenshtein(a, b, limit):
+    """
+    Compute the edit distance of two sequences, giving up beyond a limit
+
+    Only the diagonal band of width 2 * limit + 1 is computed, and the
+    computation stops at the first row whose every cell exceeds the limit.
+
+    Args:
+        a (str): First sequence
+        b (str): Second sequence
+        limit (int): Largest distance of interest
+
+    Returns:
+        int: The distance, or limit + 1 if it is larger than limit
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > limit:
+        return limit + 1
+
+    # Common prefix and suffix do not change the distance
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a:
+        return len(b) if len(b) <= limit else limit + 1
+
+    beyond = limit + 1
+    len_b = len(b)
+    previous = [j if j <= limit else beyond for j in range(len_b + 1)]
+    for i, char in enumerate(a, 1):
+        low = max(1, i - limit)
+        high = min(len_b, i + limit)
+        current = [beyond] * (len_b + 1)
+        current[0] = i if i <= limit else beyond
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            insert = current[j - 1] + 1
+            delete = previous[j] + 1
+            value = min(cost, insert, delete, beyond)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return beyond
+        previous = current
+    return previous[len_b] if previous[len_b] <= limit else beyond
+
+
+def near_miss_distance(units):
+    """
+    Get the largest distance still graded as a near miss
+
+    Args:
+        units (str): Comparison units of the expected answer
+
+    Returns:
+        int: Allowed number of edits (at least 1)
+    """
+    return max(1, min(MAX_NEAR_MISS_DISTANCE, len(units) // UNITS_PER_EDIT))
+
+
+def _grade_units(typed_units, expected_units, max_distance=None):
+    if typed_units == expected_units:
+        return Grade(CORRECT, 0)
+    limit = near_miss_distance(expected_units) if max_distance is None else max_distance
+    if not typed_units:
+        return Grade(WRONG, limit + 1)
+    distance = bounded_levenshtein(typed_units, expected_units, limit)
+    return Grade(NEAR_MISS if distance <= limit else WRONG, distance)
+
+
+def grade_answer(typed, expected, max_distance=None):
+    """
+    Grade a typed answer against the expected word
+
+    Args:
+        typed (str): What the learner typed
+        expected (str): The headword
+        max_distance (int): Largest distance graded as a near miss (default: by length)
+
+    Returns:
+        Grade: (verdict, distance); verdict is CORRECT, NEAR_MISS or WRONG, and
+        distance is capped at the near-miss limit + 1 for wrong answers
+    """
+    return _grade_units(comparison_units(normalize_answer(typed)),
+                        comparison_units(normalize_answer(expected)), max_distance)
+
+
+@timed()
+def grade_many(pairs, max_distance=None):
+    """
+    Grade many (typed, expected) pairs, normalizing each distinct text once
+
+    Args:
+        pairs (iterable): (typed, expected) tuples
+        max_distance (int): Largest distance graded as a near miss (default: by length)
+
+    Returns:
+        list: Grade per pair, in order
+    """
+    units = {}
+
+    def to_units(text):
+        value = units.get(text)
+        if value is None:
+            value = units[text] = comparison_units(normalize_answer(text))
+        return value
+
+    return [_grade_units(to_units(typed), to_units(expected), max_distance) for typed, expected in pairs]
+
+
+@timed()
+def grade_answer_log(log_dir=DEFAULT_ANSWER_LOG_DIR, user=None, quiz_type=TYPED_QUIZ_TYPE, max_distance=None):
+    """
+    Re-grade the typed answers of an answer log
+
+    Typed answers are logged with the text the learner typed as 'chosen';
+    each distinct (word, typed text) pair is graded once.
+
+    Args:
+        log_dir (str): Directory of the answer log
+        user (str): Restrict to one user (None for everyone)
+        quiz_type (str): Quiz type label of the typed answers
+        max_distance (int): Largest distance graded as a near miss (default: by length)
+
+    Returns:
+        dict: total, verdicts (verdict -> count) and near_misses (word -> count)
+    """
+    log = get_answer_log(log_dir)
+    strings = log.strings()
+    columns = select_user(log.read_columns(), strings, user)
+    try:
+        type_id = strings.index(quiz_type)
+    except ValueError:
+        return {'total': 0, 'verdicts': {}, 'near_misses': {}}
+
+    selector = bytes(map(type_id.__eq__, columns['quiz_type']))
+    pairs = Counter(zip(compress(columns['word'], selector), compress(columns['chosen'], selector)))
+    keys = list(pairs)
+    grades = grade_many([(strings[chosen_id], strings[word_id]) for word_id, chosen_id in keys], max_distance)
+
+    verdicts = Counter()
+    near_misses = Counter()
+    for key, grade in zip(keys, grades):
+        verdicts[grade.verdict] += pairs[key]
+        if grade.verdict == NEAR_MISS:
+            near_misses[strings[key[0]]] += pairs[key]
+    return {
+        'total': sum(pairs.values()),
+        'verdicts': dict(verdicts),
+        'near_misses': dict(near_misses.most_common())
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-grade the typed answers of an answer log")
+    parser.add_argument("--log-dir", default=DEFAULT_ANSWER_LOG_DIR,
+                        help=f"Answer log directory (default: {DEFAULT_ANSWER_LOG_DIR})")
+    parser.add_argument("--user", help="Only grade this user's answers")
+    parser.add_argument("--max-distance", type=int, help="Largest edit distance graded as a near miss")
+    args = parser.parse_args(argv)
+
+    report = grade_answer_log(args.log_dir, args.user, max_distance=args.max_distance)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
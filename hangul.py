@@ -0,0 +1,123 @@
+"""
+Hangul syllable utilities for the Korean vocabulary features
+Decomposes and composes precomposed Hangul syllables arithmetically
+using the Unicode layout (0xAC00 + (initial * 21 + medial) * 28 + final)
+"""
+
+# Constants
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+MEDIAL_COUNT = 21
+FINAL_COUNT = 28
+SYLLABLE_COUNT = 19 * MEDIAL_COUNT * FINAL_COUNT
+
+# Compatibility jamo, indexed by their position in the syllable arithmetic
+INITIALS = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+MEDIALS = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ']
+FINALS = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+
+INITIAL_INDEX = {jamo: i for i, jamo in enumerate(INITIALS)}
+MEDIAL_INDEX = {jamo: i for i, jamo in enumerate(MEDIALS)}
+FINAL_INDEX = {jamo: i for i, jamo in enumerate(FINALS)}
+
+# Precomputed (initial, medial, final) index triples for every syllable
+SYLLABLE_TABLE = [
+    (offset // (MEDIAL_COUNT * FINAL_COUNT), (offset // FINAL_COUNT) % MEDIAL_COUNT, offset % FINAL_COUNT)
+    for offset in range(SYLLABLE_COUNT)
+]
+
+
+def is_hangul_syllable(char):
+    """
+    Check whether a character is a precomposed Hangul syllable
+
+    Args:
+        char (str): Single character
+
+    Returns:
+        bool: True for characters in the range 가-힣
+    """
+    return HANGUL_BASE <= ord(char) <= HANGUL_LAST
+
+
+def contains_hangul(text):
+    """
+    Check whether a text contains any precomposed Hangul syllable
+
+    Args:
+        text (str): Text to inspect
+
+    Returns:
+        bool: True if at least one Hangul syllable is present
+    """
+    return any(HANGUL_BASE <= ord(char) <= HANGUL_LAST for char in text)
+
+
+def decompose_syllable(char):
+    """
+    Split a Hangul syllable into its jamo indexes
+
+    Args:
+        char (str): Single Hangul syllable
+
+    Returns:
+        tuple or None: (initial, medial, final) indexes, or None for non-Hangul characters
+    """
+    offset = ord(char) - HANGUL_BASE
+    if 0 <= offset < SYLLABLE_COUNT:
+        return SYLLABLE_TABLE[offset]
+    return None
+
+
+def compose_syllable(initial, medial, final=0):
+    """
+    Build a Hangul syllable from jamo indexes
+
+    Args:
+        initial (int): Index into INITIALS
+        medial (int): Index into MEDIALS
+        final (int): Index into FINALS (0 for no final consonant)
+
+    Returns:
+        str: The composed syllable
+    """
+    return chr(HANGUL_BASE + (initial * MEDIAL_COUNT + medial) * FINAL_COUNT + final)
+
+
+def to_jamo(text):
+    """
+    Decompose a text into a string of compatibility jamo
+
+    Non-Hangul characters are kept as they are, so "밥 rice" becomes "ㅂㅏㅂ rice".
+
+    Args:
+        text (str): Text to decompose
+
+    Returns:
+        str: Jamo string
+    """
+    parts = []
+    for char in text:
+        offset = ord(char) - HANGUL_BASE
+        if 0 <= offset < SYLLABLE_COUNT:
+            initial, medial, final = SYLLABLE_TABLE[offset]
+            parts.append(INITIALS[initial])
+            parts.append(MEDIALS[medial])
+            if final:
+                parts.append(FINALS[final])
+        else:
+            parts.append(char)
+    return ''.join(parts)
+
+
+def count_syllables(text):
+    """
+    Count the Hangul syllables in a text
+
+    Args:
+        text (str): Text to inspect
+
+    Returns:
+        int: Number of precomposed Hangul syllables
+    """
+    return sum(1 for char in text if HANGUL_BASE <= ord(char) <= HANGUL_LAST)
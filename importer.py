@@ -0,0 +1,405 @@
+"""
+Bulk vocabulary import for the vocabulary builder applications
+Streams word lists from CSV, XLSX or JSON Lines sources in chunks, validates
+each chunk, skips words the level already has and writes all new words into
+the level file in one atomic replace
+
+Usage:
+    python importer.py words.csv --level 2
+    python importer.py words.xlsx --level Korean --category travel --dry-run
+"""
+
+import argparse
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+from itertools import islice
+
+from atomic_io import replace_json, file_lock
+from corpus import get_level_file
+from instrumentation import timed, record_file
+from main import validate_word_entry, DEFAULT_CATEGORIES
+
+try:
+    import openpyxl
+except ImportError:  # XLSX import is optional: pip install openpyxl
+    openpyxl = None
+
+# Constants
+IMPORT_FORMATS = ("csv", "xlsx", "jsonl")
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+TEXT_FIELDS = ("word", "meaning", "phrase", "category", "korean_phrase")
+LIST_FIELDS = ("expressions", "korean_expressions")
+LIST_SEPARATOR = ";"        # separates expressions inside one CSV/XLSX cell
+
+# Accepted header spellings -> entry field
+COLUMN_ALIASES = {
+    "word": "word", "headword": "word", "term": "word",
+    "meaning": "meaning", "definition": "meaning", "translation": "meaning",
+    "phrase": "phrase", "example": "phrase", "example phrase": "phrase", "sentence": "phrase",
+    "category": "category", "topic": "category",
+    "korean phrase": "korean_phrase", "korean_phrase": "korean_phrase",
+    "expressions": "expressions",
+    "korean expressions": "korean_expressions", "korean_expressions": "korean_expressions"
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ImportResult:
+    """
+    Outcome of one import: row counts and the first MAX_REPORTED_ERRORS problems
+    """
+
+    def __init__(self, target_file, dry_run=False):
+        self.target_file = target_file
+        self.dry_run = dry_run
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.categories = {}    # category -> number of imported words
+        self.errors = []        # (row number, message)
+        self.seconds = 0.0
+
+    def add_error(self, row_number, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+    def summary(self):
+        """
+        Describe the import in one line
+
+        Returns:
+            str: Counts of imported, duplicate and invalid rows
+        """
+        action = "Would import" if self.dry_run else "Imported"
+        return (f"{action} {self.imported} of {self.rows} rows into {self.target_file} "
+                f"({self.duplicates} duplicates, {self.invalid} invalid) in {self.seconds:.2f}s")
+
+
+def detect_format(filename):
+    """
+    Guess the import format from a file name
+
+    Args:
+        filename (str): Source file name
+
+    Returns:
+        str: "csv", "xlsx" or "jsonl"
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return "xlsx"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension in (".csv", ".tsv", ".txt"):
+        return "csv"
+    raise ValueError(f"Unsupported import file type: {extension or filename}")
+
+
+def _open_binary(source):
+    """Open a path, or pass an already open binary file (e.g. a Streamlit upload) through"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    return source, False
+
+
+def _normalize_header(header):
+    names = []
+    for name in header:
+        key = str(name or "").strip().lower().replace("-", " ")
+        names.append(COLUMN_ALIASES.get(key, COLUMN_ALIASES.get(key.replace("_", " "))))
+    return names
+
+
+def _rows_from_table(rows):
+    """Turn an iterator of cell tuples (header first) into field dictionaries"""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = _normalize_header(header)
+    if "word" not in fields or "meaning" not in fields:
+        raise ValueError("The first row must name at least a 'word' and a 'meaning' column")
+    for cells in rows:
+        yield {field: value for field, value in zip(fields, cells) if field and value is not None}
+
+
+def iter_csv_rows(source):
+    """
+    Stream rows from a CSV (or tab-separated) file with a header row
+
+    Args:
+        source (str or file): Path or binary file object
+
+    Yields:
+        dict: Field name -> cell text
+    """
+    binary, owned = _open_binary(source)
+    try:
+        text = io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+        sample = text.read(4096)
+        text.seek(0)
+        dialect = csv.excel_tab if sample.count("\t") > sample.count(",") else csv.excel
+        try:
+            yield from _rows_from_table(csv.reader(text, dialect))
+        finally:
+            text.detach()
+    finally:
+        if owned:
+            binary.close()
+
+
+def iter_xlsx_rows(source, sheet=None):
+    """
+    Stream rows from the first (or named) worksheet of an XLSX workbook
+
+    The workbook is opened in openpyxl's read-only mode, which parses the sheet
+    lazily instead of building the whole workbook in memory.
+
+    Args:
+        source (str or file): Path or binary file object
+        sheet (str): Worksheet name (defaults to the first sheet)
+
+    Yields:
+        dict: Field name -> cell value
+    """
+    if openpyxl is None:
+        raise ImportError("XLSX import requires openpyxl (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        yield from _rows_from_table(worksheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def iter_jsonl_rows(source):
+    """
+    Stream word entries from a JSON Lines file (one JSON object per line)
+
+    Args:
+        source (str or file): Path or binary file object
+
+    Yields:
+        dict: Word entry (invalid lines yield {'_error': message})
+    """
+    binary, owned = _open_binary(source)
+    try:
+        decoder = codecs.getreader('utf-8-sig')(binary)
+        for line in decoder:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {'_error': f"Invalid JSON: {e.msg}"}
+                continue
+            if not isinstance(entry, dict):
+                yield {'_error': "Expected a JSON object"}
+                continue
+            yield {COLUMN_ALIASES.get(str(key).strip().lower(), key): value for key, value in entry.items()}
+    finally:
+        if owned:
+            binary.close()
+
+
+def _resolve_format(source, file_format):
+    if file_format is None:
+        return detect_format(os.fspath(source) if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', ""))
+    return file_format
+
+
+def iter_rows(source, file_format=None, sheet=None):
+    """
+    Stream rows from any supported source
+
+    Args:
+        source (str or file): Path or binary file object
+        file_format (str): "csv", "xlsx" or "jsonl" (detected from the file name if omitted)
+        sheet (str): XLSX worksheet name
+
+    Yields:
+        dict: Field name -> value
+    """
+    file_format = _resolve_format(source, file_format)
+    if file_format == "csv":
+        return iter_csv_rows(source)
+    if file_format == "xlsx":
+        return iter_xlsx_rows(source, sheet)
+    if file_format == "jsonl":
+        return iter_jsonl_rows(source)
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def chunked(rows, size=DEFAULT_CHUNK_SIZE):
+    """
+    Group an iterator into lists of at most `size` items
+
+    Yields:
+        list: The next chunk
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [_text(item) for item in value if _text(item)]
+    return [part.strip() for part in str(value).split(LIST_SEPARATOR) if part.strip()]
+
+
+def validate_rows(rows, first_row_number, default_category="general", categories=DEFAULT_CATEGORIES):
+    """
+    Validate and normalize a chunk of rows
+
+    Args:
+        rows (list): Field dictionaries from one of the iter_*_rows readers
+        first_row_number (int): Source row number of the first row, for error messages
+        default_category (str): Category for rows without one
+        categories (list): Accepted category names
+
+    Returns:
+        tuple: (list of (row number, word entry, category), list of (row number, error message))
+    """
+    accepted = set(categories)
+    valid = []
+    errors = []
+    for row_number, row in enumerate(rows, first_row_number):
+        if '_error' in row:
+            errors.append((row_number, row['_error']))
+            continue
+        entry = {field: _text(row.get(field)) for field in TEXT_FIELDS}
+        category = (entry.pop('category') or default_category).lower()
+        is_valid, error_msg = validate_word_entry(entry['word'], entry['meaning'], entry['phrase'], category)
+        if not is_valid:
+            errors.append((row_number, error_msg))
+            continue
+        if category not in accepted:
+            errors.append((row_number, f"Unknown category '{category}'"))
+            continue
+        if not entry['korean_phrase']:
+            del entry['korean_phrase']
+        for field in LIST_FIELDS:
+            values = _list(row.get(field))
+            if values or field == "expressions":
+                entry[field] = values
+        valid.append((row_number, entry, category))
+    return valid, errors
+
+
+def _load_level_data(target_file):
+    if not os.path.exists(target_file):
+        return {}
+    with open(target_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@timed()
+def import_vocabulary(source, level, file_format=None, default_category="general", sheet=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Import a word list into a level file
+
+    Rows are read and validated chunk by chunk; headwords already in the level
+    (or earlier in the source) are skipped via a set of lowercase words. All
+    new words are written together: the level file is replaced atomically, so
+    a failed import leaves it untouched, and it stays locked during the import.
+
+    Args:
+        source (str or file): Path or binary file object
+        level (int or str): Target level (1, 2, 3 or "Korean")
+        file_format (str): "csv", "xlsx" or "jsonl" (detected from the file name if omitted)
+        default_category (str): Category for rows without one
+        sheet (str): XLSX worksheet name
+        chunk_size (int): Rows validated per batch
+        dry_run (bool): Validate and count without writing
+
+    Returns:
+        ImportResult: Counts and row errors
+    """
+    started = time.perf_counter()
+    target_file = get_level_file(level)
+    if target_file is None:
+        raise ValueError(f"Level {level} has no level file to import into")
+    result = ImportResult(target_file, dry_run)
+
+    # Hold the level file lock so edits made during the import are not overwritten
+    with file_lock(target_file):
+        data = _load_level_data(target_file)
+        seen = {entry['word'].strip().lower() for words in data.values() for entry in words}
+
+        file_format = _resolve_format(source, file_format)
+        # Tables start with a header row; JSON Lines records are numbered from 1
+        row_number = 1 if file_format == "jsonl" else 2
+        for chunk in chunked(iter_rows(source, file_format, sheet), chunk_size):
+            result.rows += len(chunk)
+            valid, errors = validate_rows(chunk, row_number, default_category)
+            row_number += len(chunk)
+            for error_row, message in errors:
+                result.add_error(error_row, message)
+            for _, entry, category in valid:
+                key = entry['word'].lower()
+                if key in seen:
+                    result.duplicates += 1
+                    continue
+                seen.add(key)
+                data.setdefault(category, []).append(entry)
+                result.categories[category] = result.categories.get(category, 0) + 1
+                result.imported += 1
+
+        if result.imported and not dry_run:
+            replace_json(target_file, data)
+            record_file("import_vocabulary", target_file, written=True)
+    result.seconds = time.perf_counter() - started
+    logger.debug(result.summary())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a CSV, XLSX or JSON Lines word list into a level file")
+    parser.add_argument("source", help="Word list with word, meaning, phrase and category columns")
+    parser.add_argument("--level", default="1", help="Target level: 1, 2, 3 or Korean (default: 1)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Source format (default: from the file extension)")
+    parser.add_argument("--category", default="general", help="Category for rows without one")
+    parser.add_argument("--sheet", help="XLSX worksheet name (default: the first sheet)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate and count without writing")
+    args = parser.parse_args(argv)
+
+    level = int(args.level) if args.level.isdigit() else args.level
+    try:
+        result = import_vocabulary(args.source, level, args.format, args.category, args.sheet,
+                                   args.chunk_size, args.dry_run)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Import failed: {e}")
+        return 1
+
+    print(result.summary())
+    for row_number, message in result.errors:
+        print(f"  row {row_number}: {message}")
+    if result.invalid > len(result.errors):
+        print(f"  ... and {result.invalid - len(result.errors)} more")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Lightweight instrumentation for the vocabulary builder hot paths
+Records call counts, durations, bytes read/written and cache hits/misses for
+the loaders, TTS and file writers, and exports them as Prometheus text or JSON.
+
+Metrics are off unless the VOCAB_METRICS environment variable is set (read
+once at import). When off, @timed returns the function unchanged and the
+record_* helpers return immediately, so the instrumentation costs nothing.
+Set VOCAB_METRICS_PORT as well to serve /metrics and /metrics.json over HTTP.
+"""
+
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Constants
+ENABLED = os.environ.get("VOCAB_METRICS", "").lower() not in ("", "0", "false", "no")
+METRICS_PORT = os.environ.get("VOCAB_METRICS_PORT")
+LOG_LEVEL = os.environ.get("VOCAB_LOG_LEVEL", "INFO").upper()
+METRIC_PREFIX = "vocab"
+
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_operations = {}    # operation -> {'calls', 'errors', 'seconds', 'max', 'buckets'}
+_bytes = {}         # operation -> {'read', 'written'}
+_caches = {}        # cache -> {'hits', 'misses'}
+_server = None
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Send the application loggers to stderr (no-op if logging is already configured)
+
+    Args:
+        level (str): Logging level name, VOCAB_LOG_LEVEL by default
+    """
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def _record_duration(operation, seconds, error):
+    with _lock:
+        stats = _operations.get(operation)
+        if stats is None:
+            stats = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max': 0.0, 'buckets': [0] * (len(DURATION_BUCKETS) + 1)}
+            _operations[operation] = stats
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        if seconds > stats['max']:
+            stats['max'] = seconds
+        if error:
+            stats['errors'] += 1
+        stats['buckets'][bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+
+def timed(operation=None):
+    """
+    Decorator recording the call count and duration of a function
+
+    Args:
+        operation (str): Metric label (defaults to the function name)
+
+    Returns:
+        function: The decorator (which returns the function itself when metrics are off)
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _record_duration(name, time.perf_counter() - started, error)
+        return wrapper
+    return decorate
+
+
+class _Timer:
+    __slots__ = ('operation', 'started')
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _record_duration(self.operation, time.perf_counter() - self.started, exc_type is not None)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(operation):
+    """
+    Context manager recording the duration of a block
+
+    Args:
+        operation (str): Metric label
+
+    Returns:
+        Context manager (a shared no-op when metrics are off)
+    """
+    return _Timer(operation) if ENABLED else _NULL_TIMER
+
+
+def record_bytes(operation, read=0, written=0):
+    """
+    Count bytes read or written by an operation
+
+    Args:
+        operation (str): Metric label
+        read (int): Bytes read
+        written (int): Bytes written
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        counts = _bytes.setdefault(operation, {'read': 0, 'written': 0})
+        counts['read'] += read
+        counts['written'] += written
+
+
+def record_file(operation, path, written=False):
+    """
+    Count the size of a file an operation read or wrote (stat only when metrics are on)
+
+    Args:
+        operation (str): Metric label
+        path (str): File path
+        written (bool): True if the file was written, False if read
+    """
+    if not ENABLED:
+        return
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    if written:
+        record_bytes(operation, written=size)
+    else:
+        record_bytes(operation, read=size)
+
+
+def record_cache(cache, hit):
+    """
+    Count a cache lookup
+
+    Args:
+        cache (str): Cache name
+        hit (bool): True for a hit, False for a miss
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        counts = _caches.setdefault(cache, {'hits': 0, 'misses': 0})
+        counts['hits' if hit else 'misses'] += 1
+
+
+def get_metrics():
+    """
+    Get a snapshot of every metric
+
+    Returns:
+        dict: enabled flag, operations, bytes and caches
+    """
+    with _lock:
+        operations = {}
+        for name, stats in _operations.items():
+            operations[name] = {
+                'calls': stats['calls'],
+                'errors': stats['errors'],
+                'seconds': stats['seconds'],
+                'mean_seconds': stats['seconds'] / stats['calls'] if stats['calls'] else 0.0,
+                'max_seconds': stats['max'],
+                'buckets': dict(zip([str(bound) for bound in DURATION_BUCKETS] + ["+Inf"], stats['buckets']))
+            }
+        caches = {}
+        for name, counts in _caches.items():
+            lookups = counts['hits'] + counts['misses']
+            caches[name] = dict(counts, hit_rate=counts['hits'] / lookups if lookups else 0.0)
+        return {
+            'enabled': ENABLED,
+            'operations': operations,
+            'bytes': {name: dict(counts) for name, counts in _bytes.items()},
+            'caches': caches
+        }
+
+
+def reset_metrics():
+    """
+    Clear every recorded metric
+    """
+    with _lock:
+        _operations.clear()
+        _bytes.clear()
+        _caches.clear()
+
+
+def render_json():
+    """
+    Render the metrics snapshot as JSON
+
+    Returns:
+        str: JSON document
+    """
+    return json.dumps(get_metrics(), indent=2)
+
+
+def render_prometheus():
+    """
+    Render the metrics in the Prometheus text exposition format
+
+    Returns:
+        str: Exposition text
+    """
+    metrics = get_metrics()
+    p = METRIC_PREFIX
+    lines = [
+        f"# HELP {p}_operation_duration_seconds Duration of instrumented operations",
+        f"# TYPE {p}_operation_duration_seconds histogram"
+    ]
+    for name, stats in sorted(metrics['operations'].items()):
+        cumulative = 0
+        for bound, count in stats['buckets'].items():
+            cumulative += count
+            lines.append(f'{p}_operation_duration_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{p}_operation_duration_seconds_sum{{operation="{name}"}} {stats["seconds"]}')
+        lines.append(f'{p}_operation_duration_seconds_count{{operation="{name}"}} {stats["calls"]}')
+
+    lines += [f"# HELP {p}_operation_errors_total Instrumented calls that raised",
+              f"# TYPE {p}_operation_errors_total counter"]
+    for name, stats in sorted(metrics['operations'].items()):
+        lines.append(f'{p}_operation_errors_total{{operation="{name}"}} {stats["errors"]}')
+
+    for direction in ('read', 'written'):
+        lines += [f"# HELP {p}_bytes_{direction}_total Bytes {direction} by instrumented operations",
+                  f"# TYPE {p}_bytes_{direction}_total counter"]
+        for name, counts in sorted(metrics['bytes'].items()):
+            lines.append(f'{p}_bytes_{direction}_total{{operation="{name}"}} {counts[direction]}')
+
+    for outcome in ('hits', 'misses'):
+        lines += [f"# HELP {p}_cache_{outcome}_total Cache lookup {outcome}",
+                  f"# TYPE {p}_cache_{outcome}_total counter"]
+        for name, counts in sorted(metrics['caches'].items()):
+            lines.append(f'{p}_cache_{outcome}_total{{cache="{name}"}} {counts[outcome]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body, content_type = render_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/metrics.json":
+            body, content_type = render_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics request: " + format, *args)
+
+
+def start_metrics_server(port=METRICS_PORT, host="127.0.0.1"):
+    """
+    Serve /metrics (Prometheus) and /metrics.json from a background thread, once per process
+
+    Args:
+        port (int or str): Port to listen on (None to skip)
+        host (str): Interface to bind
+
+    Returns:
+        ThreadingHTTPServer or None: The server, or None if not started
+    """
+    global _server
+    if not ENABLED or not port:
+        return None
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except OSError as e:
+                logger.warning("Could not start metrics server on port %s: %s", port, e)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+    return _server
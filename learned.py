@@ -0,0 +1,433 @@
+"""
+Learned-word storage for the vocabulary builder applications
+Words marked as learned are kept in a JSON list with the date they were learned
+(and, once reviewed, the date of the last review). The cached list is indexed
+by both dates, so date-range queries are bisections over sorted arrays.
+
+The list lives in data/learned.json next to the level files. Older installs
+kept it in learned.json at the working directory; migrate_legacy_learned_file
+merges that file into the data one.
+"""
+
+import bisect
+import datetime
+import json
+import logging
+import os
+
+from atomic_io import update_json, replace_json
+from phrase_edits import flush_edits
+from instrumentation import timed, record_file, record_cache
+
+# Constants
+DEFAULT_LEARNED_FILE = "data/learned.json"
+LEGACY_LEARNED_FILE = "learned.json"        # location used before data/learned.json
+MIGRATED_SUFFIX = ".migrated"
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache shared by every app: absolute path -> (file signature, formatted words, LearnedIndex)
+_learned_cache = {}
+
+
+def _iso(value):
+    """ISO text of a date or datetime, comparable with the stored ISO timestamps"""
+    return value if isinstance(value, str) else value.isoformat()
+
+
+class LearnedIndex:
+    """
+    Learned words sorted by learned date and by review date
+
+    Review order uses the last review date, or the learned date for words
+    never reviewed, so the front of it holds the words that went longest
+    without a review. Every query is a bisection over a sorted array of ISO
+    timestamps; the entries returned are copies.
+    """
+
+    def __init__(self, words):
+        by_learned = sorted((entry['learned_date'], position) for position, entry in enumerate(words)
+                            if entry.get('learned_date'))
+        by_review = sorted((entry.get('reviewed_date') or entry.get('learned_date', ''), position)
+                           for position, entry in enumerate(words))
+        self._words = words
+        self.learned_dates = [date for date, _ in by_learned]
+        self._learned_order = [position for _, position in by_learned]
+        self.review_dates = [date for date, _ in by_review]
+        self._review_order = [position for _, position in by_review]
+
+    def __len__(self):
+        return len(self._words)
+
+    def _entries(self, order, start, stop):
+        return [dict(self._words[position]) for position in order[start:stop]]
+
+    def count_learned_between(self, start, end=None):
+        """
+        Count the words learned in [start, end)
+
+        Args:
+            start (date or datetime): First day or instant included
+            end (date or datetime): First day or instant excluded (None for no limit)
+
+        Returns:
+            int: Number of words
+        """
+        low = bisect.bisect_left(self.learned_dates, _iso(start))
+        high = len(self.learned_dates) if end is None else bisect.bisect_left(self.learned_dates, _iso(end))
+        return max(high - low, 0)
+
+    def learned_between(self, start, end=None):
+        """
+        Get the words learned in [start, end), oldest first
+
+        Args:
+            start (date or datetime): First day or instant included
+            end (date or datetime): First day or instant excluded (None for no limit)
+
+        Returns:
+            list: Word entries
+        """
+        low = bisect.bisect_left(self.learned_dates, _iso(start))
+        high = len(self.learned_dates) if end is None else bisect.bisect_left(self.learned_dates, _iso(end))
+        return self._entries(self._learned_order, low, high)
+
+    def learned_in_last(self, days, now=None):
+        """
+        Get the words learned in the last N days, oldest first
+
+        Args:
+            days (int): Number of days, counting today
+            now (datetime): Current time (default: now)
+
+        Returns:
+            list: Word entries
+        """
+        today = (now or datetime.datetime.now()).date()
+        return self.learned_between(today - datetime.timedelta(days=days - 1))
+
+    def words_per_day(self, first_day, last_day):
+        """
+        Count the words learned on each day of a range
+
+        Args:
+            first_day (date): First day of the range
+            last_day (date): Last day of the range (included)
+
+        Returns:
+            dict: date -> number of words learned that day, in date order
+        """
+        counts = {}
+        day = first_day
+        low = bisect.bisect_left(self.learned_dates, _iso(day))
+        while day <= last_day:
+            next_day = day + datetime.timedelta(days=1)
+            high = bisect.bisect_left(self.learned_dates, _iso(next_day), low)
+            counts[day] = high - low
+            day, low = next_day, high
+        return counts
+
+    def oldest_unreviewed(self, limit=10):
+        """
+        Get the words that went longest without a review
+
+        Args:
+            limit (int): Maximum number of words
+
+        Returns:
+            list: Word entries, longest without a review first
+        """
+        return self._entries(self._review_order, 0, limit)
+
+    def count_due_for_review(self, days, now=None):
+        """
+        Count the words not reviewed (or learned) in the last N days
+
+        Args:
+            days (int): Review interval in days
+            now (datetime): Current time (default: now)
+
+        Returns:
+            int: Number of words
+        """
+        cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=days)
+        return bisect.bisect_left(self.review_dates, _iso(cutoff))
+
+    def due_for_review(self, days, now=None, limit=None):
+        """
+        Get the words not reviewed (or learned) in the last N days
+
+        Args:
+            days (int): Review interval in days
+            now (datetime): Current time (default: now)
+            limit (int): Maximum number of words (None for all)
+
+        Returns:
+            list: Word entries, longest without a review first
+        """
+        due = self.count_due_for_review(days, now)
+        return self._entries(self._review_order, 0, due if limit is None else min(due, limit))
+
+
+@timed()
+def save_to_learned(word_entry, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Save a word entry to the learned words file
+
+    Args:
+        word_entry (dict): Word entry to mark as learned
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        bool: True if the word was added, False if it was already learned
+    """
+    # Add timestamp to the entry
+    word_entry_with_timestamp = word_entry.copy()
+    word_entry_with_timestamp['learned_date'] = datetime.datetime.now().isoformat()
+
+    def add_word(learned_words):
+        # Check if word already exists in learned list
+        existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
+        if existing_word:
+            return False
+        learned_words.append(word_entry_with_timestamp)
+        return True
+
+    # Read, check and save under the file lock so concurrent reruns cannot drop words
+    try:
+        added = update_json(learned_file, add_word, default=[])
+    except json.JSONDecodeError:
+        # Unreadable file: start a new list, as before
+        replace_json(learned_file, [word_entry_with_timestamp])
+        added = True
+    if added:
+        record_file("save_to_learned", learned_file, written=True)
+    return added
+
+
+def _load_cached(learned_file):
+    """Cache entry (signature, formatted words, index) of a learned file, or None if unreadable"""
+    if not os.path.exists(learned_file):
+        return None
+
+    flush_edits(learned_file)
+    key = os.path.abspath(learned_file)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _learned_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        record_cache("learned", True)
+        return cached
+
+    record_cache("learned", False)
+    try:
+        with open(key, 'r', encoding='utf-8') as f:
+            learned_words = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+    record_file("load_learned_words", learned_file)
+
+    # Convert to the same format as regular vocabulary
+    formatted_words = []
+    for word_entry in learned_words:
+        formatted_word = {
+            'word': word_entry.get('word', ''),
+            'meaning': word_entry.get('meaning', ''),
+            'phrase': word_entry.get('phrase', ''),
+            'category': word_entry.get('category', 'general'),
+            'learned_date': word_entry.get('learned_date', '')
+        }
+        if word_entry.get('reviewed_date'):
+            formatted_word['reviewed_date'] = word_entry['reviewed_date']
+        formatted_words.append(formatted_word)
+    cached = _learned_cache[key] = (signature, formatted_words, LearnedIndex(formatted_words))
+    return cached
+
+
+@timed()
+def load_learned_words(learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Load learned words and convert them to the vocabulary format
+
+    The parsed file is cached per process and reread only when it changes.
+
+    Args:
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        list: List of word dictionaries (empty if the file is missing or invalid)
+    """
+    cached = _load_cached(learned_file)
+    if cached is None:
+        return []
+    # Callers may edit the list and its entries, so hand out copies
+    return [dict(word_entry) for word_entry in cached[1]]
+
+
+def get_learned_index(learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Get the date index of the learned words, rebuilt only when the file changes
+
+    Args:
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        LearnedIndex: The index (empty if the file is missing or invalid)
+    """
+    cached = _load_cached(learned_file)
+    return cached[2] if cached is not None else LearnedIndex([])
+
+
+def load_recent_learned_words(days, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Load only the words learned in the last N days
+
+    Args:
+        days (int): Number of days, counting today
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        list: List of word dictionaries, oldest first
+    """
+    return get_learned_index(learned_file).learned_in_last(days)
+
+
+@timed()
+def mark_reviewed(words, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Record today's review of learned words
+
+    Args:
+        words (iterable): Headwords that were reviewed (case-insensitive)
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        int: Number of learned words updated
+    """
+    keys = {word.lower() for word in words}
+    if not keys or not os.path.exists(learned_file):
+        return 0
+    reviewed_date = datetime.datetime.now().isoformat()
+
+    def stamp(learned_words):
+        updated = 0
+        for word_entry in learned_words:
+            if word_entry.get('word', '').lower() in keys:
+                word_entry['reviewed_date'] = reviewed_date
+                updated += 1
+        return updated
+
+    # Buffered phrase edits first, so the rewrite does not race the edit buffer
+    flush_edits(learned_file)
+    updated = update_json(learned_file, stamp, default=[])
+    if updated:
+        record_file("mark_reviewed", learned_file, written=True)
+    return updated
+
+
+@timed()
+def delete_learned_word(word, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Remove a word from the learned words file
+
+    Args:
+        word (str): Headword to remove (case-insensitive)
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        bool: True if the word was removed, False if it was not learned
+    """
+    if not os.path.exists(learned_file):
+        return False
+    key = word.lower()
+
+    def remove(learned_words):
+        kept = [w for w in learned_words if w.get('word', '').lower() != key]
+        removed = len(kept) != len(learned_words)
+        learned_words[:] = kept
+        return removed
+
+    # Read, filter and save under the file lock so concurrent reruns cannot drop words
+    flush_edits(learned_file)
+    removed = update_json(learned_file, remove, default=[])
+    if removed:
+        record_file("delete_learned_word", learned_file, written=True)
+    return removed
+
+
+@timed()
+def save_learned_words_to_file(learned_words, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Save learned words back to the JSON file
+
+    Args:
+        learned_words (list): List of learned word dictionaries
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        bool: True when saved
+    """
+    replace_json(learned_file, learned_words)
+    record_file("save_learned_words_to_file", learned_file, written=True)
+
+    return True
+
+
+def migrate_legacy_learned_file(legacy_file=LEGACY_LEARNED_FILE, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Merge a learned.json left at the old location into the current file
+
+    Words missing from the current file are appended with their dates; the
+    legacy file is then renamed with a ".migrated" suffix so it is merged
+    only once.
+
+    Args:
+        legacy_file (str): Learned words file at the old location
+        learned_file (str): Learned words file to merge into
+
+    Returns:
+        int: Number of words added (0 if there was nothing to migrate)
+    """
+    if not os.path.exists(legacy_file) or os.path.abspath(legacy_file) == os.path.abspath(learned_file):
+        return 0
+    flush_edits(legacy_file)
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            legacy_words = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning("Cannot migrate %s: %s", legacy_file, e)
+        return 0
+
+    def merge(learned_words):
+        known = {w.get('word', '').lower() for w in learned_words}
+        added = 0
+        for word_entry in legacy_words:
+            key = word_entry.get('word', '').lower()
+            if key and key not in known:
+                learned_words.append(word_entry)
+                known.add(key)
+                added += 1
+        return added
+
+    flush_edits(learned_file)
+    added = update_json(learned_file, merge, default=[])
+    os.replace(legacy_file, legacy_file + MIGRATED_SUFFIX)
+    if added:
+        record_file("migrate_legacy_learned_file", learned_file, written=True)
+    logger.info("Migrated %s to %s (%d words added)", legacy_file, learned_file, added)
+    return added
+
+
+def forget_learned_file(learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Drop the cached words and index of a learned file (the file is reread on next use)
+
+    Args:
+        learned_file (str): Path to the learned words JSON file
+    """
+    flush_edits(learned_file)
+    _learned_cache.pop(os.path.abspath(learned_file), None)
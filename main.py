@@ -9,6 +9,15 @@ import io
 import tempfile
 import os
 import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from corpus import get_korean_corpus, KOREAN_LEVELS
+from instrumentation import timed, record_cache, record_file, configure_logging, start_metrics_server
+from vocabulary_format import read_vocabulary, write_word_pools, read_category, get_category_index
+from atomic_io import replace_json
+from phrase_edits import flush_edits
 
 # Constants
 DEFAULT_CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
@@ -27,42 +36,64 @@ SPEED_LABELS = {
     "0.9": "Slower (90%)",
     "0.8": "Slowest (80%)"
 }
+AUDIO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Process-wide synthesized audio cache: (text, is_phrase, speed) -> (audio bytes, format)
+_audio_cache = OrderedDict()
+_audio_cache_lock = threading.Lock()
+_audio_cache_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+# Keys being synthesized right now -> event set when the audio is ready
+_audio_pending = {}
 
 category_list = DEFAULT_CATEGORIES
 
+logger = logging.getLogger(__name__)
+configure_logging()
+start_metrics_server()
+
+@timed()
 def load_word_pools(level=1):
     """
     Load word pools from a level-specific JSON file
     
     Args:
-        level (int): Difficulty level (1, 2, or 3)
+        level (int): Difficulty level (1, 2, 3) or 4/"Korean" for Korean vocabulary
         
     Returns:
         dict: Dictionary containing word pools for each category
     """
+    if level in KOREAN_LEVELS:
+        # Korean vocabulary is served from the shared process-wide corpus cache
+        corpus = get_korean_corpus()
+        return corpus.to_word_pools() if corpus else {}
+
     if level not in [1, 2, 3, 4]:
         json_file = f"data/{level}.json"
     else:
         json_file = f"data/level{level}.json"
-    print(f"Loading word pools from {json_file}...")
+    logger.info("Loading word pools from %s", json_file)
+    flush_edits(json_file)
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            with open("word_pools.json", 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                return data
+        record_file("load_word_pools", json_file)
+        replace_json(DEFAULT_WORD_POOLS_FILE, data)
+        record_file("load_word_pools", DEFAULT_WORD_POOLS_FILE, written=True)
+        return data
             
     except FileNotFoundError:
-        print(f"Error: {json_file} not found")
+        logger.error("%s not found", json_file)
         # Fallback to word_pools.json if level file doesn't exist
         try:
-            with open("word_pools.json", 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(DEFAULT_WORD_POOLS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            record_file("load_word_pools", DEFAULT_WORD_POOLS_FILE)
+            return data
         except FileNotFoundError:
-            print("Error: No vocabulary files found")
+            logger.error("No vocabulary files found")
             return {}
     except json.JSONDecodeError:
-        print(f"Error: Invalid JSON format in {json_file}")
+        logger.error("Invalid JSON format in %s", json_file)
         return {}
 
 
@@ -96,6 +127,93 @@ def detect_language(text):
     # Default to English
     return 'en'
 
+@timed("tts.pyttsx3")
+def _synthesize_pyttsx3(text, filename, is_phrase, speed, detected_lang):
+    """
+    Synthesize text to a WAV file with the local pyttsx3 engine
+
+    Returns:
+        str: Path to the created audio file
+    """
+    engine = pyttsx3.init()
+    
+    # Get available voices
+    voices = engine.getProperty('voices')
+    
+    # Select voice based on detected language
+    selected_voice = None
+    if detected_lang == 'ko':
+        # Look for Korean voices first
+        for voice in voices:
+            if voice.id and any(identifier in voice.id.lower() for identifier in ['korea', 'korean', 'ko-kr', 'ko_kr']):
+                selected_voice = voice.id
+                break
+    
+    # If no Korean voice found or language is English, look for English voices
+    if not selected_voice:
+        for voice in voices:
+            # Look for American English voices (common identifiers)
+            if voice.id and any(identifier in voice.id.lower() for identifier in ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']):
+                selected_voice = voice.id
+                break
+            # Fallback: look for any English voice
+            elif voice.id and 'en' in voice.id.lower():
+                selected_voice = voice.id
+    
+    # Set the selected voice if found
+    if selected_voice:
+        engine.setProperty('voice', selected_voice)
+    
+    # Base speech rates
+    base_word_rate = 160
+    base_phrase_rate = 140
+    
+    # Apply speed multiplier
+    speed_multipliers = {
+        "normal": 1.0,
+        "0.9": 0.9,
+        "0.8": 0.8
+    }
+    
+    multiplier = speed_multipliers.get(speed, 1.0)
+    
+    # Adjust settings for phrases vs single words with speed options
+    if is_phrase:
+        final_rate = int(base_phrase_rate * multiplier)
+    else:
+        final_rate = int(base_word_rate * multiplier)
+    
+    engine.setProperty('rate', final_rate)
+    engine.setProperty('volume', 0.9)
+    
+    # Create temporary file path
+    temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
+    engine.save_to_file(text, temp_file)
+    engine.runAndWait()
+    return temp_file
+
+
+@timed("tts.gtts")
+def _synthesize_gtts(text, filename, is_phrase, speed, detected_lang):
+    """
+    Synthesize text to an MP3 file with gTTS (for cloud deployment)
+
+    Returns:
+        str: Path to the created audio file
+    """
+    # Adjust speed for gTTS (it only has slow/normal)
+    use_slow_speech = speed in ["0.9", "0.8"] or is_phrase
+    
+    # Create TTS object with detected language
+    tts = gTTS(text=text, lang=detected_lang, slow=use_slow_speech)
+    
+    # Create temporary file path (MP3 format for gTTS)
+    temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
+    tts.save(temp_file)
+    return temp_file
+
+
+@timed()
 def create_audio_file(text, filename, is_phrase=False, speed="normal"):
     """
     Create audio file for text-to-speech with language auto-detection (cloud-compatible)
@@ -114,89 +232,25 @@ def create_audio_file(text, filename, is_phrase=False, speed="normal"):
     
     # Try pyttsx3 first (for local development)
     try:
-        engine = pyttsx3.init()
-        
-        # Get available voices
-        voices = engine.getProperty('voices')
-        
-        # Select voice based on detected language
-        selected_voice = None
-        if detected_lang == 'ko':
-            # Look for Korean voices first
-            for voice in voices:
-                if voice.id and any(identifier in voice.id.lower() for identifier in ['korea', 'korean', 'ko-kr', 'ko_kr']):
-                    selected_voice = voice.id
-                    break
-        
-        # If no Korean voice found or language is English, look for English voices
-        if not selected_voice:
-            for voice in voices:
-                # Look for American English voices (common identifiers)
-                if voice.id and any(identifier in voice.id.lower() for identifier in ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']):
-                    selected_voice = voice.id
-                    break
-                # Fallback: look for any English voice
-                elif voice.id and 'en' in voice.id.lower():
-                    selected_voice = voice.id
-        
-        # Set the selected voice if found
-        if selected_voice:
-            engine.setProperty('voice', selected_voice)
-        
-        # Base speech rates
-        base_word_rate = 160
-        base_phrase_rate = 140
-        
-        # Apply speed multiplier
-        speed_multipliers = {
-            "normal": 1.0,
-            "0.9": 0.9,
-            "0.8": 0.8
-        }
-        
-        multiplier = speed_multipliers.get(speed, 1.0)
-        
-        # Adjust settings for phrases vs single words with speed options
-        if is_phrase:
-            final_rate = int(base_phrase_rate * multiplier)
-        else:
-            final_rate = int(base_word_rate * multiplier)
-        
-        engine.setProperty('rate', final_rate)
-        engine.setProperty('volume', 0.9)
-        
-        # Create temporary file path
-        temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
-        engine.save_to_file(text, temp_file)
-        engine.runAndWait()
-        return temp_file
+        temp_file = _synthesize_pyttsx3(text, filename, is_phrase, speed, detected_lang)
         
     except Exception as e:
-        print(f"pyttsx3 failed ({e}), trying gTTS for cloud compatibility...")
+        logger.warning("pyttsx3 failed (%s), trying gTTS for cloud compatibility...", e)
         
         # Fall back to gTTS (for cloud deployment)
         try:
-            # Detect language
-            detected_lang = detect_language(text)
-            
-            # Adjust speed for gTTS (it only has slow/normal)
-            use_slow_speech = speed in ["0.9", "0.8"] or is_phrase
-            
-            # Create TTS object with detected language
-            tts = gTTS(text=text, lang=detected_lang, slow=use_slow_speech)
-            
-            # Create temporary file path (MP3 format for gTTS)
-            temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
-            tts.save(temp_file)
-            
-            print(f"Created audio file using gTTS with language '{detected_lang}': {temp_file}")
-            return temp_file
+            temp_file = _synthesize_gtts(text, filename, is_phrase, speed, detected_lang)
+            logger.debug("Created audio file using gTTS with language '%s': %s", detected_lang, temp_file)
             
         except Exception as e2:
-            print(f"All TTS methods failed: pyttsx3({e}), gTTS({e2})")
+            logger.error("All TTS methods failed: pyttsx3(%s), gTTS(%s)", e, e2)
             return None
 
+    record_file("create_audio_file", temp_file, written=True)
+    return temp_file
+
 
+@timed()
 def load_vocabulary_from_file(file_path):
     """
     Load vocabulary words from a text file
@@ -209,29 +263,18 @@ def load_vocabulary_from_file(file_path):
     """
     word_list = []
     try:
-        with open(file_path, "r", encoding='utf-8') as f:
-            lines = f.readlines()
-            for line in lines:
-                if line.strip():  # Skip empty lines
-                    parts = line.strip().split(" | ")
-                    if len(parts) >= 4:
-                        word_details = {
-                            "word": parts[0],
-                            "meaning": parts[1],
-                            "phrase": parts[2],
-                            "category": parts[3]
-                        }
-                        word_list.append(word_details)
+        # Unparseable lines are skipped with a warning naming their line numbers
+        word_list = read_vocabulary(file_path)
     except FileNotFoundError:
-        print(f"Error: {file_path} not found")
+        logger.error("%s not found", file_path)
     except Exception as e:
-        print(f"Error loading vocabulary: {e}")
+        logger.error("Error loading vocabulary: %s", e)
     
     return word_list
 
 
+@timed()
 def save_word_pools_to_file(word_pools, file_path):
-    print(f"Saving word pools to {file_path}...")
     """
     Save word pools to vocabulary file
     
@@ -243,20 +286,14 @@ def save_word_pools_to_file(word_pools, file_path):
     Returns:
         bool: True if successful, False otherwise
     """
+    logger.info("Saving word pools to %s", file_path)
     try:
-        with open(file_path, "w", encoding='utf-8') as f:
-
-            for category, words in word_pools.items():
-                # print(f"Processing category: {category}")
-                words = word_pools.get(category, [])
-                print(f"Found {len(words)} words in category '{category}'")
-                for word_data in words:
-                    f.write(f"{word_data['word']} | {word_data['meaning']} | {word_data['phrase']} | {category}\n")
-                for word in words:
-                    print(f"Loaded word category: '{category} : {len(words)}'")
+        for category, words in word_pools.items():
+            logger.debug("Found %d words in category '%s'", len(words), category)
+        write_word_pools(file_path, word_pools)
         return True
     except Exception as e:
-        print(f"Error saving word pools: {e}")
+        logger.error("Error saving word pools: %s", e)
         return False
 
 
@@ -274,6 +311,46 @@ def filter_words_by_category(word_list, category):
     return [word for word in word_list if word.get('category', '').lower() == category.lower()]
 
 
+def load_category_from_file(file_path, category):
+    """
+    Load the words of one category from a vocabulary file
+
+    Only the lines of that category are read and parsed (see
+    vocabulary_format.read_category), so views of one category no longer
+    load the whole file and filter it.
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        category (str): Category to load (case-insensitive)
+
+    Returns:
+        list: List of word dictionaries of the category
+    """
+    try:
+        return read_category(file_path, category)
+    except FileNotFoundError:
+        logger.error("%s not found", file_path)
+    except Exception as e:
+        logger.error("Error loading vocabulary: %s", e)
+    return []
+
+
+def count_vocabulary_words(file_path):
+    """
+    Count the words of a vocabulary file from its category index
+
+    Args:
+        file_path (str): Path to the vocabulary file
+
+    Returns:
+        int: Number of words (0 if the file is missing or unreadable)
+    """
+    try:
+        return get_category_index(file_path).total
+    except OSError:
+        return 0
+
+
 def get_category_statistics(word_list):
     """
     Get statistics about words in each category
@@ -322,6 +399,110 @@ def validate_word_entry(word, meaning, phrase="", category="general"):
     return True, ""
 
 
+def get_audio(text, is_phrase=False, speed="normal"):
+    """
+    Get speech audio for text, synthesizing it only on a cache miss
+
+    Audio is kept in memory (least recently used entries are evicted beyond
+    AUDIO_CACHE_MAX_BYTES), so replaying a word skips the TTS engine and the
+    temporary file round trip. Concurrent requests for the same text wait
+    for a single synthesis.
+
+    Args:
+        text (str): Text to convert to speech
+        is_phrase (bool): Whether the text is a phrase (affects speech rate)
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+    Returns:
+        tuple or None: (audio bytes, format such as 'audio/wav'), or None if synthesis failed
+    """
+    key = (text, is_phrase, speed)
+    while True:
+        with _audio_cache_lock:
+            cached = _audio_cache.get(key)
+            if cached is not None:
+                _audio_cache.move_to_end(key)
+                _audio_cache_stats['hits'] += 1
+                record_cache("audio", True)
+                return cached
+            pending = _audio_pending.get(key)
+            if pending is None:
+                _audio_pending[key] = threading.Event()
+                _audio_cache_stats['misses'] += 1
+                record_cache("audio", False)
+                break
+        # Another session is synthesizing the same text; reuse its result
+        pending.wait()
+        with _audio_cache_lock:
+            if key not in _audio_cache and key not in _audio_pending:
+                # The synthesis failed: report the failure rather than retrying
+                return None
+
+    audio = None
+    try:
+        # Unique file name so concurrent sessions never share a temporary file
+        audio_file = create_audio_file(text, f"tts_{uuid.uuid4().hex}", is_phrase=is_phrase, speed=speed)
+        if audio_file and os.path.exists(audio_file):
+            try:
+                with open(audio_file, 'rb') as f:
+                    audio = (f.read(), 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav')
+            finally:
+                cleanup_audio_file(audio_file)
+    finally:
+        with _audio_cache_lock:
+            if audio is not None:
+                _audio_cache[key] = audio
+                _audio_cache_stats['bytes'] += len(audio[0])
+                while _audio_cache_stats['bytes'] > AUDIO_CACHE_MAX_BYTES and len(_audio_cache) > 1:
+                    _, (evicted, _) = _audio_cache.popitem(last=False)
+                    _audio_cache_stats['bytes'] -= len(evicted)
+            _audio_pending.pop(key).set()
+    return audio
+
+
+def get_cached_audio(text, is_phrase=False, speed="normal"):
+    """
+    Get speech audio only if it is already cached (never synthesizes)
+
+    Args:
+        text (str): Text that was converted to speech
+        is_phrase (bool): Whether the text is a phrase
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+    Returns:
+        tuple or None: (audio bytes, format), or None if the text is not cached
+    """
+    with _audio_cache_lock:
+        return _audio_cache.get((text, is_phrase, speed))
+
+
+def get_audio_cache_stats():
+    """
+    Get audio cache counters
+
+    Returns:
+        dict: hits, misses, hit_rate (0.0-1.0), entries and bytes
+    """
+    with _audio_cache_lock:
+        lookups = _audio_cache_stats['hits'] + _audio_cache_stats['misses']
+        return {
+            'hits': _audio_cache_stats['hits'],
+            'misses': _audio_cache_stats['misses'],
+            'hit_rate': _audio_cache_stats['hits'] / lookups if lookups else 0.0,
+            'entries': len(_audio_cache),
+            'bytes': _audio_cache_stats['bytes']
+        }
+
+
+def clear_audio_cache():
+    """
+    Drop all cached audio and reset the cache counters
+    """
+    with _audio_cache_lock:
+        _audio_cache.clear()
+        _audio_cache_stats.update(hits=0, misses=0, bytes=0)
+
+
 def cleanup_audio_file(file_path):
     """
     Clean up temporary audio file
@@ -333,7 +514,7 @@ def cleanup_audio_file(file_path):
         if file_path and os.path.exists(file_path):
             os.remove(file_path)
     except Exception as e:
-        print(f"Warning: Could not delete temporary file {file_path}: {e}")
+        logger.warning("Could not delete temporary file %s: %s", file_path, e)
 
 if __name__ == "__main__":
     # Test functions when running main.py directly
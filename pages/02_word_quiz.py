@@ -1,116 +1,21 @@
 import streamlit as st 
 import random
 import os
-import json
+import time
+from services import (
+    get_difficulty,
+    get_quiz_words,
+    generate_quiz_question,
+    load_vocabulary_with_expressions,
+    get_user_store,
+    DEFAULT_CATEGORIES
+)
+from answer_log import DEFAULT_USER
 
-DEFAULT_CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
-DEFAULT_VOCABULARY_FILE = "vocabulary.txt"
-DIFFICULTY_LEVELS = {
-    # General - Easy to Hard
-    "efficient": "⭐",
-    "authentic": "⭐",
-    "versatile": "⭐⭐",
-    "pragmatic": "⭐⭐",
-    "resilient": "⭐⭐",
-    "innovative": "⭐⭐",
-    "profound": "⭐⭐",
-    "coherent": "⭐⭐",
-    "diligent": "⭐⭐",
-    "benevolent": "⭐⭐⭐",
-    "eloquent": "⭐⭐⭐",
-    "meticulous": "⭐⭐⭐",
-    "ubiquitous": "⭐⭐⭐",
-    "ephemeral": "⭐⭐⭐",
-    "ambiguous": "⭐⭐⭐",
-    "tenacious": "⭐⭐⭐",
-    "subtle": "⭐⭐⭐",
-    "intricate": "⭐⭐⭐",
-    "contemplative": "⭐⭐⭐",
-    "serendipity": "⭐⭐⭐",
-    
-    # Science
-    "gravity": "⭐",
-    "molecule": "⭐",
-    "ecosystem": "⭐⭐",
-    "evolution": "⭐⭐",
-    "catalyst": "⭐⭐",
-    "enzyme": "⭐⭐",
-    "neuron": "⭐⭐",
-    "genome": "⭐⭐⭐",
-    "hypothesis": "⭐⭐⭐",
-    "photosynthesis": "⭐⭐⭐",
-    "chromosome": "⭐⭐⭐",
-    "quantum": "⭐⭐⭐",
-    "biodiversity": "⭐⭐⭐",
-    "metabolism": "⭐⭐⭐",
-    "osmosis": "⭐⭐⭐",
-    "mitosis": "⭐⭐⭐",
-    "thermodynamics": "⭐⭐⭐",
-    "isotope": "⭐⭐⭐",
-    "radiation": "⭐⭐⭐",
-    "symbiosis": "⭐⭐⭐",
-}
-
-def load_vocabulary_with_expressions(level):
-    """Load vocabulary from JSON files with expressions included"""    
-    # Map level to filename
-    level_files = {
-        1: "data/level1.json",
-        2: "data/level2.json", 
-        3: "data/level3.json"
-    }
-    filename = level_files.get(int(level))
-    #filename = "data/level" + str(level) + ".json"
-    if not filename or not os.path.exists(filename):
-        return []
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
-        
-        return all_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-    
-def filter_words_by_category(word_list, category):
-    """
-    Filter words by category
-    
-    Args:
-        word_list (list): List of word dictionaries
-        category (str): Category to filter by
-        
-    Returns:
-        list: Filtered list of words matching the category
-    """
-    return [word for word in word_list if word.get('category', '').lower() == category.lower()]
-
-def generate_quiz_question(words, correct_word):
-    """Generate a multiple choice quiz question"""
-    options = [correct_word]
-    other_words = [w for w in words if w['word'] != correct_word['word']]
-    
-    # Add 3 random wrong options
-    wrong_options = random.sample(other_words, min(3, len(other_words)))
-    for word in wrong_options:
-        options.append(word)
-    
-    random.shuffle(options)
-    return options
-
-def get_difficulty(word):
-    """Get difficulty level for a word"""
-    return DIFFICULTY_LEVELS.get(word.lower(), "⭐⭐")
-    
 st.subheader("🎯 Interactive Quiz Mode")
+
+# Learner signed in on the main page (answers go to their answer log)
+user_store = get_user_store(st.session_state.get('user_id', DEFAULT_USER))
     
 # Initialize session state for quiz
 if 'quiz_score' not in st.session_state:
@@ -130,10 +35,11 @@ if st.button("🔄 Load Words for Quiz"):
     st.session_state.quiz_score = 0
     st.session_state.quiz_total = 0
     st.session_state.current_question = None
-    all_words = load_vocabulary_with_expressions(current_level)
-    print(current_level, all_words)
-    quiz_words = filter_words_by_category(all_words, selected_category)
-    print(quiz_words)
+    # Level files are parsed once per process by the shared corpus cache
+    if selected_category == "All":
+        quiz_words = load_vocabulary_with_expressions(int(current_level))
+    else:
+        quiz_words = get_quiz_words(int(current_level), selected_category) or []
     st.session_state.quiz_words = quiz_words
 else:
     quiz_words = st.session_state.get('quiz_words', [])
@@ -158,7 +64,8 @@ if quiz_words:
             st.session_state.current_question = {
                 'correct': correct_word,
                 'options': options,
-                'answered': False
+                'answered': False,
+                'shown_at': time.time()
             }
             
         # Display current question
@@ -181,19 +88,24 @@ if quiz_words:
             # Radio button for answer selection
             if not question['answered']:
                 st.markdown('<p style="font-size: 1.95em; font-weight: bold; margin-top: 20px;">Choose your answer:</p>', unsafe_allow_html=True)
-                selected_answer = st.radio(
+                selected_position = st.radio(
                     "Answer Selection",
-                    option_labels,
+                    range(len(option_labels)),
+                    format_func=lambda i: option_labels[i],
                     key="quiz_answer",
                     label_visibility="hidden"
                 )
                 
                 if st.button("✅ Submit Answer"):
                     # Check if answer is correct
+                    latency_ms = int((time.time() - question['shown_at']) * 1000)
+                    chosen_word = question['options'][selected_position]
                     if quiz_type == "Meaning → Word":
-                        is_correct = selected_answer == correct_word['word']
+                        is_correct = chosen_word['word'] == correct_word['word']
                     else:
-                        is_correct = selected_answer == correct_word['meaning']
+                        is_correct = chosen_word['meaning'] == correct_word['meaning']
+                    user_store.log_answer(int(current_level), correct_word.get('category', selected_category),
+                                          correct_word['word'], quiz_type, chosen_word['word'], is_correct, latency_ms)
                     
                     # Update score
                     st.session_state.quiz_total += 1
@@ -207,7 +119,7 @@ if quiz_words:
                     st.session_state.current_question['answered'] = True
                     
                     # Show word details with new structure
-                    difficulty = get_difficulty(correct_word['word'])
+                    difficulty = get_difficulty(correct_word['word'], int(current_level))
                     
                     # Simple quiz result card
                     st.success("Word Details:")
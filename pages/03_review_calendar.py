@@ -0,0 +1,66 @@
+import streamlit as st
+import datetime
+from services import get_user_store, write_vocabulary
+from answer_log import DEFAULT_USER
+
+st.title("Vocabulary Builder - Review Calendar")
+st.subheader("📅 Learned Words Over Time")
+
+# Learner signed in on the main page
+user_store = get_user_store(st.session_state.get('user_id', DEFAULT_USER))
+word_file = user_store.vocabulary_file
+# Date index of the learned words, rebuilt only when the file changes
+index = user_store.get_learned_index()
+
+if not len(index):
+    st.info("No learned words yet. Mark words as learned in Study Mode to build your review calendar.")
+    st.stop()
+
+today = datetime.date.today()
+now = datetime.datetime.now()
+
+# Overview
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Learned Words", len(index))
+with col2:
+    st.metric("Today", index.count_learned_between(today))
+with col3:
+    st.metric("Last 7 Days", index.count_learned_between(today - datetime.timedelta(days=6)))
+with col4:
+    st.metric("Last 30 Days", index.count_learned_between(today - datetime.timedelta(days=29)))
+
+# Words per day
+st.markdown("### 📈 Words Learned per Day")
+span = st.radio("Period", [30, 90, 365], format_func=lambda x: f"{x} days", horizontal=True)
+per_day = index.words_per_day(today - datetime.timedelta(days=span - 1), today)
+st.bar_chart([{"Day": day.isoformat(), "Words": count} for day, count in per_day.items()], x="Day", y="Words")
+
+# Study only the recent words
+st.markdown("### 📚 Study Recent Words")
+recent_days = st.selectbox("Learned in the last", [1, 7, 30, 90], index=1, format_func=lambda x: f"{x} days")
+recent_words = index.learned_in_last(recent_days, now)
+st.write(f"{len(recent_words)} words learned in the last {recent_days} days.")
+if recent_words and st.button("📚 Load into Study Mode"):
+    write_vocabulary(word_file, recent_words)
+    st.success(f"✅ Loaded {len(recent_words)} recent learned words!")
+
+# Review queue
+st.markdown("### 🔁 Due for Review")
+interval = st.selectbox("Review words not seen for", [1, 3, 7, 14, 30], index=2, format_func=lambda x: f"{x} days")
+due_count = index.count_due_for_review(interval, now)
+st.write(f"{due_count} words are due for review.")
+
+for entry in index.due_for_review(interval, now, limit=20):
+    last_seen = (entry.get('reviewed_date') or entry.get('learned_date') or '')[:10]
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.markdown(f"**{entry['word']}** — {entry['meaning']}  \n*{entry['phrase']}*  \nLast seen: {last_seen or 'unknown'}")
+    with col2:
+        if st.button("✅ Reviewed", key=f"reviewed_{entry['word']}"):
+            user_store.mark_reviewed([entry['word']])
+            st.rerun()
+
+if due_count and st.button(f"✅ Mark all {due_count} as reviewed"):
+    user_store.mark_reviewed(entry['word'] for entry in index.due_for_review(interval, now))
+    st.rerun()
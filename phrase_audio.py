@@ -0,0 +1,378 @@
+"""
+Word-level clips of synthesized Korean phrases for listening practice
+Each phrase is synthesized once (through the shared audio cache of main.py)
+and indexed with the time span and byte range of every word, so replaying a
+single word of the sentence is a slice of the cached audio rather than a
+new synthesis.
+
+Neither TTS backend reports word timings, so they are estimated from the
+audio: the speech is split in proportion to the letters (syllables for
+Hangul) of each word, and for WAV each boundary is moved to the quietest
+point nearby, which is the pause between the words. MP3 audio (gTTS) is not
+decoded; its boundaries are the MP3 frames nearest the proportional split,
+and a clip is the run of whole frames, which plays without re-encoding.
+"""
+
+import logging
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+
+from main import get_audio
+from instrumentation import record_cache
+
+# Constants
+PHRASE_AUDIO_CACHE_MAX_BYTES = 16 * 1024 * 1024
+WINDOW_MS = 10              # energy window of the pause detection
+SNAP_MS = 300               # a boundary moves at most this far to reach a pause
+SILENCE_RATIO = 0.05        # windows below this share of the peak energy are silent
+EDGE_PADDING_MS = 30        # kept before the first and after the last word
+WORD_PUNCTUATION = ".,!?;:\"'“”‘’()[]…~"
+
+# MP3 frame header tables (MPEG version bits -> values)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+WordTiming = namedtuple("WordTiming", ["word", "start_ms", "end_ms", "start", "end"])
+
+logger = logging.getLogger(__name__)
+
+# Process-wide phrase index cache: (text, speed) -> PhraseAudio, least recently used first
+_phrase_audio = OrderedDict()
+_phrase_audio_lock = threading.Lock()
+_phrase_audio_bytes = 0
+
+
+class PhraseAudio:
+    """
+    Synthesized phrase audio with the time span and byte range of every word
+
+    Byte ranges are offsets into `audio`. For WAV they cover PCM samples, and
+    a clip gets its own 44-byte header; for MP3 they cover whole frames.
+    """
+
+    def __init__(self, audio, audio_format, timings, duration_ms, wav_params=None):
+        """
+        Args:
+            audio (bytes): The whole phrase audio
+            audio_format (str): 'audio/wav' or 'audio/mp3'
+            timings (list): WordTiming per word, in order
+            duration_ms (int): Length of the phrase audio
+            wav_params (tuple): (channels, sample rate, sample width) for WAV audio
+        """
+        self.audio = audio
+        self.format = audio_format
+        self.timings = timings
+        self.duration_ms = duration_ms
+        self.wav_params = wav_params
+
+    def __len__(self):
+        return len(self.timings)
+
+    @property
+    def words(self):
+        return [timing.word for timing in self.timings]
+
+    def clip(self, index):
+        """
+        Get the audio of one word
+
+        Args:
+            index (int): Position of the word in the phrase
+
+        Returns:
+            tuple: (audio bytes, format), playable on its own
+
+        Raises:
+            IndexError: If the phrase has no word at this position
+        """
+        timing = self.timings[index]
+        data = memoryview(self.audio)[timing.start:timing.end]
+        if self.wav_params is None:
+            return bytes(data), self.format
+        return b"".join((_wav_header(*self.wav_params, len(data)), data)), self.format
+
+
+def split_words(phrase):
+    """
+    Split a phrase into its spoken words with their relative lengths
+
+    Args:
+        phrase (str): Phrase text
+
+    Returns:
+        list: (word, weight) tuples; the weight counts letters and Hangul
+        syllables, ignoring punctuation (at least 1)
+    """
+    return [(word, max(1, sum(1 for char in word if char not in WORD_PUNCTUATION)))
+            for word in phrase.split()]
+
+
+def _proportional_bounds(weights, start, end):
+    """Cut [start, end) into spans proportional to the weights"""
+    total = sum(weights)
+    bounds = [start]
+    cumulative = 0
+    for weight in weights[:-1]:
+        cumulative += weight
+        bounds.append(start + (end - start) * cumulative / total)
+    bounds.append(end)
+    return bounds
+
+
+def _wav_header(channels, rate, sample_width, data_size):
+    """Build a canonical 44-byte PCM WAV header"""
+    block_align = channels * sample_width
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, channels,
+                       rate, rate * block_align, block_align, sample_width * 8, b"data", data_size)
+
+
+def _parse_wav(audio):
+    """
+    Locate the PCM samples of a WAV file
+
+    Returns:
+        tuple or None: (channels, rate, sample width, data offset, data size)
+    """
+    if audio[:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return None
+    offset = 12
+    params = None
+    while offset + 8 <= len(audio):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", audio, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, rate = struct.unpack_from("<HHI", audio, body)
+            bits = struct.unpack_from("<H", audio, body + 14)[0]
+            if audio_format != 1:
+                return None
+            params = (channels, rate, bits // 8)
+        elif chunk_id == b"data" and params is not None:
+            # Writers streaming to a pipe leave the size unset; the data then runs to the end
+            size = min(chunk_size, len(audio) - body)
+            return params + (body, size - size % (params[0] * params[2]))
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _window_energies(pcm, channels, window):
+    """Mean absolute amplitude of every window of 16-bit samples"""
+    samples = array('h')
+    samples.frombytes(pcm[:len(pcm) - len(pcm) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    step = window * channels
+    return [sum(map(abs, samples[i:i + step])) / step for i in range(0, len(samples) - step + 1, step)]
+
+
+def _snap_to_pauses(bounds, energies, snap, threshold):
+    """
+    Move every inner boundary to the quietest window within `snap` windows,
+    or to the middle of the silence it falls in
+    """
+    snapped = [bounds[0]]
+    for position, expected in enumerate(bounds[1:-1], 1):
+        low = max(int(snapped[-1]) + 1, int(expected) - snap)
+        high = min(int(bounds[-1]) - (len(bounds) - 1 - position), int(expected) + snap)
+        if low > high:
+            # More words than windows: the word gets an empty clip
+            snapped.append(min(low, int(bounds[-1])))
+            continue
+        best = min(range(low, high + 1), key=lambda i: (energies[i], abs(i - expected)))
+        if energies[best] <= threshold:
+            first = last = best
+            while first > low and energies[first - 1] <= threshold:
+                first -= 1
+            while last < high and energies[last + 1] <= threshold:
+                last += 1
+            best = (first + last) // 2
+        snapped.append(best)
+    snapped.append(bounds[-1])
+    return snapped
+
+
+def _index_wav(phrase, audio):
+    """Word timings of WAV audio, with boundaries moved to the pauses"""
+    parsed = _parse_wav(audio)
+    if parsed is None:
+        return None
+    channels, rate, sample_width, data_offset, data_size = parsed
+    block_align = channels * sample_width
+    frames = data_size // block_align
+    duration_ms = frames * 1000 // rate if rate else 0
+    words = split_words(phrase)
+    if not words or not frames:
+        return None
+
+    window = max(1, rate * WINDOW_MS // 1000)
+    energies = []
+    if sample_width == 2:
+        energies = _window_energies(memoryview(audio)[data_offset:data_offset + data_size], channels, window)
+    if energies and max(energies) > 0:
+        threshold = max(energies) * SILENCE_RATIO
+        voiced = [i for i, energy in enumerate(energies) if energy > threshold]
+        padding = EDGE_PADDING_MS // WINDOW_MS
+        first = max(0, voiced[0] - padding)
+        last = min(len(energies), voiced[-1] + 1 + padding)
+        bounds = _proportional_bounds([weight for _, weight in words], first, last)
+        bounds = [int(bound) for bound in _snap_to_pauses(bounds, energies, SNAP_MS // WINDOW_MS, threshold)]
+        frame_bounds = [min(frames, bound * window) for bound in bounds]
+        if last == len(energies):
+            frame_bounds[-1] = frames   # the partial window at the end
+    else:
+        # Silent or non-16-bit audio: proportional split of the whole clip
+        frame_bounds = [int(bound) for bound in _proportional_bounds([weight for _, weight in words], 0, frames)]
+
+    timings = [
+        WordTiming(word, start * 1000 // rate, end * 1000 // rate,
+                   data_offset + start * block_align, data_offset + end * block_align)
+        for (word, _), start, end in zip(words, frame_bounds, frame_bounds[1:])
+    ]
+    return PhraseAudio(audio, 'audio/wav', timings, duration_ms, (channels, rate, sample_width))
+
+
+def _mp3_frames(audio):
+    """
+    Byte offset and duration of every MP3 frame
+
+    Returns:
+        list: (offset, seconds) per frame, followed by (end offset, 0)
+    """
+    offset = 0
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        size = audio[6] << 21 | audio[7] << 14 | audio[8] << 7 | audio[9]
+        offset = 10 + size
+    frames = []
+    while offset + 4 <= len(audio):
+        header = struct.unpack_from(">I", audio, offset)[0]
+        version = (header >> 19) & 3
+        layer = (header >> 17) & 3
+        bitrate_index = (header >> 12) & 15
+        rate_index = (header >> 10) & 3
+        if header >> 21 != 0x7FF or version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            break   # not a Layer III frame: trailing tag or garbage
+        rate = _MP3_SAMPLE_RATES[version][rate_index]
+        padding = (header >> 9) & 1
+        if version == 3:
+            bitrate = _MP3_BITRATES_V1[bitrate_index] * 1000
+            samples, length = 1152, 144 * bitrate // rate + padding
+        else:
+            bitrate = _MP3_BITRATES_V2[bitrate_index] * 1000
+            samples, length = 576, 72 * bitrate // rate + padding
+        frames.append((offset, samples / rate))
+        offset += length
+    frames.append((min(offset, len(audio)), 0))
+    return frames
+
+
+def _index_mp3(phrase, audio):
+    """Word timings of MP3 audio, with boundaries on the nearest frames"""
+    frames = _mp3_frames(audio)
+    words = split_words(phrase)
+    if len(frames) < 2 or not words:
+        return None
+    starts = [0.0]
+    for _, seconds in frames:
+        starts.append(starts[-1] + seconds)
+    duration = starts[len(frames) - 1]
+
+    bounds = _proportional_bounds([weight for _, weight in words], 0, duration)
+    frame_bounds = [0]
+    position = 0
+    for bound in bounds[1:-1]:
+        while position < len(frames) - 1 and starts[position + 1] <= bound:
+            position += 1
+        if bound - starts[position] > starts[position + 1] - bound:
+            position += 1
+        frame_bounds.append(max(position, frame_bounds[-1]))
+    frame_bounds.append(len(frames) - 1)
+
+    timings = [
+        WordTiming(word, int(starts[start] * 1000), int(starts[end] * 1000), frames[start][0], frames[end][0])
+        for (word, _), start, end in zip(words, frame_bounds, frame_bounds[1:])
+    ]
+    return PhraseAudio(audio, 'audio/mp3', timings, int(duration * 1000))
+
+
+def index_phrase_audio(phrase, audio, audio_format):
+    """
+    Build the word index of synthesized phrase audio
+
+    Args:
+        phrase (str): The phrase that was synthesized
+        audio (bytes): Its audio
+        audio_format (str): 'audio/wav' or 'audio/mp3'
+
+    Returns:
+        PhraseAudio or None: The indexed audio, or None if the audio could
+        not be parsed
+    """
+    index = _index_mp3 if audio_format == 'audio/mp3' else _index_wav
+    try:
+        return index(phrase, audio)
+    except (struct.error, IndexError, ValueError) as e:
+        logger.warning("Could not index phrase audio for %r: %s", phrase, e)
+        return None
+
+
+def get_phrase_audio(phrase, speed="normal"):
+    """
+    Get a phrase's audio with its word index, synthesizing only on a cache miss
+
+    The phrase audio comes from main.get_audio, so playing the whole phrase
+    and replaying single words share one synthesis.
+
+    Args:
+        phrase (str): Phrase text (usually an entry's 'korean_phrase')
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+    Returns:
+        PhraseAudio or None: The indexed audio, or None if synthesis failed
+    """
+    global _phrase_audio_bytes
+    key = (phrase, speed)
+    with _phrase_audio_lock:
+        cached = _phrase_audio.get(key)
+        if cached is not None:
+            _phrase_audio.move_to_end(key)
+            record_cache("phrase_audio", True)
+            return cached
+    record_cache("phrase_audio", False)
+
+    audio = get_audio(phrase, is_phrase=True, speed=speed)
+    if audio is None:
+        return None
+    phrase_audio = index_phrase_audio(phrase, *audio)
+    if phrase_audio is None:
+        return None
+
+    with _phrase_audio_lock:
+        if key not in _phrase_audio:
+            _phrase_audio[key] = phrase_audio
+            _phrase_audio_bytes += len(phrase_audio.audio)
+            while _phrase_audio_bytes > PHRASE_AUDIO_CACHE_MAX_BYTES and len(_phrase_audio) > 1:
+                _, evicted = _phrase_audio.popitem(last=False)
+                _phrase_audio_bytes -= len(evicted.audio)
+        return _phrase_audio[key]
+
+
+def get_word_clip(phrase, index, speed="normal"):
+    """
+    Get the audio of one word of a phrase
+
+    Args:
+        phrase (str): Phrase text
+        index (int): Position of the word in the phrase
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+    Returns:
+        tuple or None: (audio bytes, format), or None if synthesis failed or
+        the phrase has no word at this position
+    """
+    phrase_audio = get_phrase_audio(phrase, speed)
+    if phrase_audio is None or not 0 <= index < len(phrase_audio):
+        return None
+    return phrase_audio.clip(index)
@@ -0,0 +1,182 @@
+"""
+Buffered phrase edits for the JSON level files and the learned words files
+The phrase editor records changes in memory against a headword index of the
+file instead of rewriting the whole file per save. Dirty files are flushed
+together after a short quiet period (one write per file for a burst of
+edits), before anything reads them through the loaders, and at exit.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+
+from atomic_io import file_lock, update_json
+from instrumentation import timed, record_cache
+
+# Constants
+FLUSH_DELAY = 2.0   # seconds without new edits before a dirty file is written
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_indexes = {}       # absolute path -> {'signature', 'words': {lowercase word: (category, position)}}
+_pending = {}       # absolute path -> {lowercase word: new phrase} (the dirty set)
+_timers = {}        # absolute path -> threading.Timer
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _iter_entries(data):
+    """Yield (category, position, entry) for level data (dict) or learned words (list)"""
+    if isinstance(data, dict):
+        for category, words in data.items():
+            for position, entry in enumerate(words):
+                yield category, position, entry
+    else:
+        for position, entry in enumerate(data):
+            yield None, position, entry
+
+
+def _build_index(data):
+    words = {}
+    for category, position, entry in _iter_entries(data):
+        words.setdefault(entry.get('word', '').lower(), (category, position))
+    return words
+
+
+def _get_index(path):
+    """Headword index of a file, rebuilt only when the file changed on disk"""
+    signature = _signature(path)
+    index = _indexes.get(path)
+    if index is not None and index['signature'] == signature:
+        record_cache("phrase_index", True)
+        return index['words']
+    record_cache("phrase_index", False)
+    with open(path, 'r', encoding='utf-8') as f:
+        words = _build_index(json.load(f))
+    _indexes[path] = {'signature': signature, 'words': words}
+    return words
+
+
+def record_phrase_edit(file_path, word, new_phrase):
+    """
+    Record a phrase change; the file is written by the next flush
+
+    Args:
+        file_path (str): Level JSON file or learned words file
+        word (str): Headword to change (case-insensitive)
+        new_phrase (str): New example phrase
+
+    Returns:
+        bool: True if the word exists in the file and the edit was recorded
+    """
+    path = os.path.abspath(file_path)
+    key = word.lower()
+    with _lock:
+        try:
+            if key not in _get_index(path):
+                return False
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error("Error indexing %s: %s", file_path, e)
+            return False
+        _pending.setdefault(path, {})[key] = new_phrase
+        _schedule_flush(path)
+    return True
+
+
+def _schedule_flush(path):
+    # Debounce: every new edit restarts the quiet period
+    timer = _timers.pop(path, None)
+    if timer is not None:
+        timer.cancel()
+    timer = threading.Timer(FLUSH_DELAY, flush_edits, [path])
+    timer.daemon = True
+    _timers[path] = timer
+    timer.start()
+
+
+@timed()
+def flush_edits(file_path):
+    """
+    Write the buffered phrase edits of one file (no-op if it has none)
+
+    The edits are applied to the file as it is on disk, under its lock, so
+    changes made by other writers since the edits were recorded are kept.
+
+    Args:
+        file_path (str): Level JSON file or learned words file
+
+    Returns:
+        int: Number of entries updated
+    """
+    path = os.path.abspath(file_path)
+    if path not in _pending:
+        return 0
+    with _lock:
+        edits = _pending.pop(path, None)
+        timer = _timers.pop(path, None)
+        if timer is not None:
+            timer.cancel()
+        if not edits:
+            return 0
+
+        rebuilt = {}
+
+        def apply(data):
+            index = rebuilt['words'] = _build_index(data)
+            updated = 0
+            for key, phrase in edits.items():
+                location = index.get(key)
+                if location is None:
+                    # Deleted from the file since the edit was recorded
+                    continue
+                category, position = location
+                entry = data[category][position] if category is not None else data[position]
+                if entry.get('phrase') != phrase:
+                    entry['phrase'] = phrase
+                    updated += 1
+            return updated
+
+        try:
+            with file_lock(path):
+                updated = update_json(path, apply)
+                if 'words' in rebuilt:
+                    # The write changed the file signature; keep the fresh index
+                    _indexes[path] = {'signature': _signature(path), 'words': rebuilt['words']}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error("Error writing phrase edits to %s: %s", file_path, e)
+            # Keep the edits (newer ones win) and try again with the next edit or flush
+            _pending[path] = {**edits, **_pending.get(path, {})}
+            return 0
+    logger.debug("Flushed %d phrase edits to %s", len(edits), file_path)
+    return updated or 0
+
+
+def flush_all():
+    """
+    Write the buffered phrase edits of every file
+
+    Returns:
+        int: Number of entries updated
+    """
+    return sum(flush_edits(path) for path in list(_pending))
+
+
+def forget_file(file_path):
+    """
+    Write the buffered edits of a file and drop its headword index
+
+    Args:
+        file_path (str): Level JSON file or learned words file
+    """
+    flush_edits(file_path)
+    with _lock:
+        _indexes.pop(os.path.abspath(file_path), None)
+
+
+atexit.register(flush_all)
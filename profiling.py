@@ -0,0 +1,345 @@
+"""
+Built-in profiling mode for the Streamlit apps
+Wraps each script run in cProfile plus a stack sampler, aggregates the
+results across reruns in a process-wide store and renders a sidebar panel
+with the hottest functions and a downloadable flamegraph stack file.
+
+Profiling is requested per browser tab with ?profile=1 in the URL, or for
+every session with the VOCAB_PROFILE environment variable. Usage in an app:
+
+    profile_run = start_run(__file__)   # right after st.set_page_config
+    ...
+    finish_run(profile_run)             # last line of the script
+"""
+
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import streamlit as st
+
+# Constants
+PROFILE_ENV = "VOCAB_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+SAMPLE_INTERVAL = 0.005     # seconds between stack samples
+DEFAULT_TOP_N = 25
+SORT_KEYS = {
+    "Own time": 'tottime',
+    "Cumulative time": 'cumtime',
+    "Calls": 'calls'
+}
+
+_RUN_STATE_KEY = "_profile_run"
+_PROFILING_FILE = os.path.abspath(__file__)
+
+# Process-wide aggregates: script path -> ProfileStore
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Run holding cProfile: since Python 3.12 it uses sys.monitoring, so only one
+# profiler can be enabled per process; overlapping runs use the sampler only
+_profiled_run = None
+_profiler_lock = threading.Lock()
+
+
+def _env_enabled():
+    return os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+def is_profiling_requested():
+    """
+    Check whether this script run should be profiled
+
+    Returns:
+        bool: True if VOCAB_PROFILE is set or the page URL has ?profile=1
+    """
+    if _env_enabled():
+        return True
+    try:
+        return st.query_params.get(PROFILE_QUERY_PARAM, "") not in ("", "0", "false", "no")
+    except Exception:
+        # Outside a Streamlit session (plain `python app.py`) there are no query parameters
+        return False
+
+
+class ProfileStore:
+    """
+    Profiling results of one app aggregated over every profiled rerun
+    """
+
+    def __init__(self, script_path):
+        self.script_path = script_path
+        self.runs = 0
+        self.seconds = 0.0
+        self.samples = 0
+        self.stats = None           # pstats.Stats, created with the first run
+        self.stacks = Counter()     # collapsed stack -> sample count
+        self._lock = threading.Lock()
+
+    def add_run(self, profiler, stacks, seconds):
+        with self._lock:
+            if profiler is None:
+                pass    # sampled only: another run held cProfile
+            elif self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+            self.stacks.update(stacks)
+            self.samples += sum(stacks.values())
+            self.runs += 1
+            self.seconds += seconds
+
+    def clear(self):
+        with self._lock:
+            self.runs = 0
+            self.seconds = 0.0
+            self.samples = 0
+            self.stats = None
+            self.stacks.clear()
+
+    def top_functions(self, sort_key='tottime', limit=DEFAULT_TOP_N):
+        """
+        Get the hottest functions
+
+        Args:
+            sort_key (str): 'tottime', 'cumtime' or 'calls'
+            limit (int): Maximum number of rows
+
+        Returns:
+            list: Row dictionaries (function, location, calls, own and cumulative milliseconds)
+        """
+        with self._lock:
+            if self.stats is None:
+                return []
+            entries = list(self.stats.stats.items())
+
+        rows = []
+        for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in entries:
+            if filename == _PROFILING_FILE:
+                continue
+            rows.append({
+                'function': name,
+                'location': _short_location(filename, line),
+                'calls': calls,
+                'own_ms': tottime * 1000,
+                'cumulative_ms': cumtime * 1000,
+                'per_call_ms': cumtime * 1000 / calls if calls else 0.0
+            })
+        order = {'tottime': 'own_ms', 'cumtime': 'cumulative_ms', 'calls': 'calls'}[sort_key]
+        rows.sort(key=lambda row: row[order], reverse=True)
+        return rows[:limit]
+
+    def collapsed_stacks(self):
+        """
+        Render the sampled stacks in the collapsed format read by flamegraph.pl and speedscope
+
+        Returns:
+            str: One "frame;frame;frame count" line per distinct stack
+        """
+        with self._lock:
+            items = sorted(self.stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def pstats_bytes(self):
+        """
+        Serialize the aggregated cProfile data in the .pstats file format (snakeviz, pstats)
+
+        Returns:
+            bytes: Marshalled stats (empty without runs)
+        """
+        with self._lock:
+            if self.stats is None:
+                return b""
+            return marshal.dumps(self.stats.stats)
+
+
+def get_profile_store(script_path):
+    """
+    Get the process-wide profiling results of an app
+
+    Args:
+        script_path (str): Path of the app script
+
+    Returns:
+        ProfileStore: The store for the script
+    """
+    key = os.path.abspath(script_path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(key, ProfileStore(key))
+    return store
+
+
+def _short_location(filename, line):
+    if filename == "~":
+        return "built-in"
+    return f"{os.path.basename(filename)}:{line}"
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples the call stack of one thread, from the app script frame down"""
+
+    def __init__(self, thread_id, script_path, interval=SAMPLE_INTERVAL):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.script_path = script_path
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                # The script thread ended without finish_run (st.stop, st.rerun or an exception)
+                return
+            stack = []
+            in_script = False
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != _PROFILING_FILE:
+                    stack.append(_frame_label(code))
+                if code.co_filename == self.script_path:
+                    # Outermost script frame: drop the Streamlit runner frames above it
+                    if frame.f_back is None or frame.f_back.f_code.co_filename != self.script_path:
+                        in_script = True
+                        break
+                frame = frame.f_back
+            if in_script:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+
+
+class ProfiledRun:
+    """
+    One profiled script run: cProfile for exact call statistics, the stack
+    sampler for flamegraph stacks
+
+    When another run holds cProfile, this run is only sampled (profiler is None).
+    """
+
+    def __init__(self, script_path):
+        self.script_path = os.path.abspath(script_path)
+        self.store = get_profile_store(self.script_path)
+        self.thread = threading.current_thread()
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(self.thread.ident, self.script_path)
+        self.finished = False
+        self.started = None
+
+    def start(self):
+        global _profiled_run
+        self.started = time.perf_counter()
+        self.sampler.start()
+        with _profiler_lock:
+            owner = _profiled_run
+            if owner is not None and not owner.thread.is_alive():
+                # The owner's session ended mid-run without stop(): release cProfile
+                owner.profiler.disable()
+                _profiled_run = None
+            if _profiled_run is None:
+                try:
+                    self.profiler.enable()
+                    _profiled_run = self
+                except ValueError:
+                    # Another profiling tool (debugger, coverage) holds sys.monitoring
+                    self.profiler = None
+            else:
+                self.profiler = None
+        return self
+
+    def stop(self):
+        """Stop profiling and add the results to the process-wide store (once)"""
+        global _profiled_run
+        if self.finished:
+            return
+        with _profiler_lock:
+            if _profiled_run is self:
+                self.profiler.disable()
+                _profiled_run = None
+        self.sampler.stop()
+        self.finished = True
+        self.store.add_run(self.profiler, self.sampler.stacks, time.perf_counter() - self.started)
+
+
+def start_run(script_path):
+    """
+    Start profiling the current script run if profiling is requested
+
+    Args:
+        script_path (str): Path of the app script (pass __file__)
+
+    Returns:
+        ProfiledRun or None: The running profile, or None when profiling is off
+    """
+    if not is_profiling_requested():
+        return None
+
+    # A run interrupted by st.stop()/st.rerun() never reached finish_run: keep its data
+    previous = st.session_state.get(_RUN_STATE_KEY)
+    if previous is not None and not previous.finished:
+        previous.stop()
+
+    profile_run = ProfiledRun(script_path).start()
+    st.session_state[_RUN_STATE_KEY] = profile_run
+    return profile_run
+
+
+def finish_run(profile_run, top_n=DEFAULT_TOP_N):
+    """
+    Stop profiling the script run and render the profiling panel in the sidebar
+
+    Args:
+        profile_run (ProfiledRun or None): Value returned by start_run
+        top_n (int): Number of functions in the hot-function table
+    """
+    if profile_run is None:
+        return
+    profile_run.stop()
+    render_profile_panel(profile_run.store, top_n)
+
+
+def render_profile_panel(store, top_n=DEFAULT_TOP_N):
+    """
+    Render the aggregated profile of an app in a sidebar expander
+
+    Args:
+        store (ProfileStore): Profiling results to show
+        top_n (int): Number of functions in the hot-function table
+    """
+    with st.sidebar.expander("🔬 Profiler", expanded=True):
+        if not store.runs:
+            st.caption("No profiled runs yet.")
+            return
+        st.caption(f"{store.runs} reruns profiled, {store.seconds / store.runs * 1000:.1f} ms average, "
+                   f"{store.samples} stack samples")
+
+        sort_label = st.radio("Sort by", list(SORT_KEYS), horizontal=True, key="profile_sort")
+        rows = store.top_functions(SORT_KEYS[sort_label], top_n)
+        st.dataframe(rows, hide_index=True, column_config={
+            'own_ms': st.column_config.NumberColumn("own (ms)", format="%.2f"),
+            'cumulative_ms': st.column_config.NumberColumn("cumulative (ms)", format="%.2f"),
+            'per_call_ms': st.column_config.NumberColumn("per call (ms)", format="%.3f")
+        })
+
+        app_name = os.path.splitext(os.path.basename(store.script_path))[0]
+        st.download_button("⬇️ Flamegraph stacks", store.collapsed_stacks(), file_name=f"{app_name}.collapsed",
+                           mime="text/plain", help="Collapsed stacks for flamegraph.pl or speedscope.app")
+        st.download_button("⬇️ cProfile stats", store.pstats_bytes(), file_name=f"{app_name}.pstats",
+                           mime="application/octet-stream", help="Open with snakeviz or python -m pstats")
+        if st.button("🗑️ Reset Profile", key="profile_reset"):
+            store.clear()
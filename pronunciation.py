@@ -0,0 +1,390 @@
+"""
+Korean pronunciation and Revised Romanization engine
+Applies the main sound-change rules (liaison, aspiration, palatalization,
+nasalization, liquidization and tensification) on decomposed syllables
+and caches the results so repeated lookups are free. Also holds the IPA
+transcriptions of the English vocabulary shown by the apps.
+"""
+
+from functools import lru_cache
+
+from hangul import (
+    INITIALS,
+    MEDIALS,
+    FINALS,
+    INITIAL_INDEX,
+    MEDIAL_INDEX,
+    FINAL_INDEX,
+    SYLLABLE_TABLE,
+    HANGUL_BASE,
+    SYLLABLE_COUNT,
+    compose_syllable,
+    contains_hangul
+)
+
+# Revised Romanization tables
+INITIAL_ROMAN = {
+    'ㄱ': 'g', 'ㄲ': 'kk', 'ㄴ': 'n', 'ㄷ': 'd', 'ㄸ': 'tt', 'ㄹ': 'r', 'ㅁ': 'm',
+    'ㅂ': 'b', 'ㅃ': 'pp', 'ㅅ': 's', 'ㅆ': 'ss', 'ㅇ': '', 'ㅈ': 'j', 'ㅉ': 'jj',
+    'ㅊ': 'ch', 'ㅋ': 'k', 'ㅌ': 't', 'ㅍ': 'p', 'ㅎ': 'h'
+}
+MEDIAL_ROMAN = {
+    'ㅏ': 'a', 'ㅐ': 'ae', 'ㅑ': 'ya', 'ㅒ': 'yae', 'ㅓ': 'eo', 'ㅔ': 'e', 'ㅕ': 'yeo',
+    'ㅖ': 'ye', 'ㅗ': 'o', 'ㅘ': 'wa', 'ㅙ': 'wae', 'ㅚ': 'oe', 'ㅛ': 'yo', 'ㅜ': 'u',
+    'ㅝ': 'wo', 'ㅞ': 'we', 'ㅟ': 'wi', 'ㅠ': 'yu', 'ㅡ': 'eu', 'ㅢ': 'ui', 'ㅣ': 'i'
+}
+# Finals are romanized after neutralization, so only the seven representatives occur
+FINAL_ROMAN = {'': '', 'ㄱ': 'k', 'ㄴ': 'n', 'ㄷ': 't', 'ㄹ': 'l', 'ㅁ': 'm', 'ㅂ': 'p', 'ㅇ': 'ng'}
+
+# Double finals split into (stays, moves on liaison)
+SPLIT_FINALS = {
+    'ㄳ': ('ㄱ', 'ㅅ'), 'ㄵ': ('ㄴ', 'ㅈ'), 'ㄶ': ('ㄴ', 'ㅎ'), 'ㄺ': ('ㄹ', 'ㄱ'),
+    'ㄻ': ('ㄹ', 'ㅁ'), 'ㄼ': ('ㄹ', 'ㅂ'), 'ㄽ': ('ㄹ', 'ㅅ'), 'ㄾ': ('ㄹ', 'ㅌ'),
+    'ㄿ': ('ㄹ', 'ㅍ'), 'ㅀ': ('ㄹ', 'ㅎ'), 'ㅄ': ('ㅂ', 'ㅅ')
+}
+
+# Final consonant neutralization to the seven representative sounds
+NEUTRAL_FINALS = {
+    '': '', 'ㄱ': 'ㄱ', 'ㄲ': 'ㄱ', 'ㅋ': 'ㄱ', 'ㄳ': 'ㄱ', 'ㄺ': 'ㄱ',
+    'ㄴ': 'ㄴ', 'ㄵ': 'ㄴ', 'ㄶ': 'ㄴ',
+    'ㄷ': 'ㄷ', 'ㅅ': 'ㄷ', 'ㅆ': 'ㄷ', 'ㅈ': 'ㄷ', 'ㅊ': 'ㄷ', 'ㅌ': 'ㄷ', 'ㅎ': 'ㄷ',
+    'ㄹ': 'ㄹ', 'ㄼ': 'ㄹ', 'ㄽ': 'ㄹ', 'ㄾ': 'ㄹ', 'ㅀ': 'ㄹ',
+    'ㅁ': 'ㅁ', 'ㄻ': 'ㅁ',
+    'ㅂ': 'ㅂ', 'ㅍ': 'ㅂ', 'ㅄ': 'ㅂ', 'ㄿ': 'ㅂ',
+    'ㅇ': 'ㅇ'
+}
+
+ASPIRATED = {'ㄱ': 'ㅋ', 'ㄲ': 'ㅋ', 'ㄷ': 'ㅌ', 'ㅅ': 'ㅌ', 'ㅆ': 'ㅌ', 'ㅈ': 'ㅊ', 'ㅂ': 'ㅍ',
+             'ㅊ': 'ㅊ', 'ㅋ': 'ㅋ', 'ㅌ': 'ㅌ', 'ㅍ': 'ㅍ'}
+NASALIZED = {'ㄱ': 'ㅇ', 'ㄷ': 'ㄴ', 'ㅂ': 'ㅁ'}
+TENSED = {'ㄱ': 'ㄲ', 'ㄷ': 'ㄸ', 'ㅂ': 'ㅃ', 'ㅅ': 'ㅆ', 'ㅈ': 'ㅉ'}
+OBSTRUENTS = ('ㄱ', 'ㄷ', 'ㅂ')
+# Stem-final clusters read as ㄹ that still tense the next consonant (넓다 → 널따)
+TENSING_CLUSTERS = ('ㄼ', 'ㄾ')
+PALATALIZED = {'ㄷ': 'ㅈ', 'ㅌ': 'ㅊ'}
+
+
+def _apply_boundary(final, initial, medial, tensify):
+    """
+    Apply the sound-change rules at one syllable boundary
+
+    Args:
+        final (str): Final consonant jamo of the first syllable ('' for none)
+        initial (str): Initial consonant jamo of the next syllable
+        medial (str): Vowel jamo of the next syllable
+        tensify (bool): Whether to apply tensification
+
+    Returns:
+        tuple: (new_final, new_initial)
+    """
+    if not final:
+        return final, initial
+
+    if initial == 'ㅇ':
+        # Liaison: the final consonant moves into the empty onset
+        if final == 'ㅇ':
+            return final, initial
+        if final == 'ㅎ':
+            return '', initial
+        if final in ('ㄶ', 'ㅀ'):
+            return '', SPLIT_FINALS[final][0]
+        if final in SPLIT_FINALS:
+            stays, moves = SPLIT_FINALS[final]
+            if medial == 'ㅣ' and moves in PALATALIZED:
+                moves = PALATALIZED[moves]
+            elif tensify and stays in OBSTRUENTS and moves in TENSED:
+                # The moved consonant is tensed after the obstruent that stays (없어 → 업써)
+                moves = TENSED[moves]
+            return stays, moves
+        if medial == 'ㅣ' and final in PALATALIZED:
+            return '', PALATALIZED[final]
+        return '', final
+
+    if final in ('ㅎ', 'ㄶ', 'ㅀ'):
+        # ㅎ final aspirates or tenses the following consonant
+        remaining = '' if final == 'ㅎ' else SPLIT_FINALS[final][0]
+        if initial in ('ㄱ', 'ㄷ', 'ㅈ'):
+            return remaining, ASPIRATED[initial]
+        if initial == 'ㅅ':
+            return remaining, 'ㅆ'
+        if initial == 'ㄴ':
+            if final == 'ㅀ':
+                return 'ㄹ', 'ㄹ'
+            return 'ㄴ', initial
+        return NEUTRAL_FINALS[final], initial
+
+    if initial == 'ㅎ':
+        # Aspiration: obstruent final merges with a following ㅎ
+        if final in SPLIT_FINALS:
+            stays, moves = SPLIT_FINALS[final]
+            if moves in ASPIRATED:
+                return stays, ASPIRATED[moves]
+        elif final in ASPIRATED:
+            return '', ASPIRATED[final]
+        return NEUTRAL_FINALS[final], initial
+
+    if tensify and final in TENSING_CLUSTERS and initial in TENSED:
+        return NEUTRAL_FINALS[final], TENSED[initial]
+
+    final = NEUTRAL_FINALS[final]
+
+    if initial == 'ㄹ':
+        if final in ('ㅁ', 'ㅇ'):
+            initial = 'ㄴ'
+        elif final in OBSTRUENTS:
+            initial = 'ㄴ'
+        elif final == 'ㄴ':
+            # Liquidization: ㄴ + ㄹ is read as ㄹ + ㄹ
+            return 'ㄹ', 'ㄹ'
+    elif initial == 'ㄴ' and final == 'ㄹ':
+        return 'ㄹ', 'ㄹ'
+
+    if final in OBSTRUENTS:
+        if initial in ('ㄴ', 'ㅁ'):
+            # Nasalization: obstruent finals before nasals become nasals
+            final = NASALIZED[final]
+        elif tensify and initial in TENSED:
+            initial = TENSED[initial]
+
+    return final, initial
+
+
+def _process_word(syllables, tensify):
+    """
+    Run the boundary rules over one run of Hangul syllables
+
+    Args:
+        syllables (list): List of [initial, medial, final] jamo lists
+        tensify (bool): Whether to apply tensification
+
+    Returns:
+        list: The same list with rules applied in place
+    """
+    last = len(syllables) - 1
+    for i in range(last):
+        current, following = syllables[i], syllables[i + 1]
+        current[2], following[0] = _apply_boundary(current[2], following[0], following[1], tensify)
+    if syllables:
+        syllables[last][2] = NEUTRAL_FINALS[syllables[last][2]]
+    return syllables
+
+
+def _split_runs(text):
+    """
+    Split a text into Hangul syllable runs and other text
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: Items that are either a str (non-Hangul text) or a list of jamo triples
+    """
+    runs = []
+    current = None
+    other = []
+    for char in text:
+        offset = ord(char) - HANGUL_BASE
+        if 0 <= offset < SYLLABLE_COUNT:
+            if other:
+                runs.append(''.join(other))
+                other = []
+            if current is None:
+                current = []
+                runs.append(current)
+            initial, medial, final = SYLLABLE_TABLE[offset]
+            current.append([INITIALS[initial], MEDIALS[medial], FINALS[final]])
+        else:
+            current = None
+            other.append(char)
+    if other:
+        runs.append(''.join(other))
+    return runs
+
+
+@lru_cache(maxsize=8192)
+def pronounce(text):
+    """
+    Get the surface pronunciation of a Korean text written in Hangul
+
+    For example 학교 is pronounced 학꾜 and 같이 is pronounced 가치.
+
+    Args:
+        text (str): Korean text
+
+    Returns:
+        str: Pronunciation in Hangul (non-Hangul characters are kept)
+    """
+    parts = []
+    for run in _split_runs(text):
+        if isinstance(run, str):
+            parts.append(run)
+            continue
+        for initial, medial, final in _process_word(run, tensify=True):
+            parts.append(compose_syllable(INITIAL_INDEX[initial], MEDIAL_INDEX[medial], FINAL_INDEX[final]))
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=8192)
+def romanize(text):
+    """
+    Romanize a Korean text following the Revised Romanization of Korean
+
+    Sound changes are reflected as the standard requires, except tensification.
+
+    Args:
+        text (str): Korean text
+
+    Returns:
+        str: Romanized text (non-Hangul characters are kept)
+    """
+    parts = []
+    for run in _split_runs(text):
+        if isinstance(run, str):
+            parts.append(run)
+            continue
+        previous_final = ''
+        for initial, medial, final in _process_word(run, tensify=False):
+            if initial == 'ㄹ' and previous_final == 'ㄹ':
+                parts.append('l')
+            else:
+                parts.append(INITIAL_ROMAN[initial])
+            parts.append(MEDIAL_ROMAN[medial])
+            parts.append(FINAL_ROMAN[final])
+            previous_final = final
+    return ''.join(parts)
+
+
+def annotate_entries(entries):
+    """
+    Add pronunciation fields to every Korean entry of a word list in one batch
+
+    Each distinct text is processed once; entries gain 'romanization' and
+    'pronunciation' for the headword and 'korean_phrase_romanization' when
+    a 'korean_phrase' is present. Entries without Hangul are left untouched.
+
+    Args:
+        entries (list): List of word entry dictionaries (modified in place)
+
+    Returns:
+        int: Number of entries annotated
+    """
+    korean_entries = [entry for entry in entries if contains_hangul(entry.get('word', ''))]
+    if not korean_entries:
+        return 0
+
+    words = {entry['word'] for entry in korean_entries}
+    phrases = {entry['korean_phrase'] for entry in korean_entries if entry.get('korean_phrase')}
+    word_romanizations = {word: romanize(word) for word in words}
+    word_pronunciations = {word: pronounce(word) for word in words}
+    phrase_romanizations = {phrase: romanize(phrase) for phrase in phrases}
+
+    for entry in korean_entries:
+        word = entry['word']
+        entry['romanization'] = word_romanizations[word]
+        entry['pronunciation'] = word_pronunciations[word]
+        if entry.get('korean_phrase'):
+            entry['korean_phrase_romanization'] = phrase_romanizations[entry['korean_phrase']]
+    return len(korean_entries)
+
+
+def get_korean_phonetic(word):
+    """
+    Get a display string for the pronunciation of a Korean word
+
+    Args:
+        word (str): Korean word
+
+    Returns:
+        str: "[romanization] (pronunciation)" or "" for non-Korean words
+    """
+    if not contains_hangul(word):
+        return ""
+    romanization = romanize(word)
+    pronunciation = pronounce(word)
+    if pronunciation != word:
+        return f"[{romanization}] ({pronunciation})"
+    return f"[{romanization}]"
+
+
+# IPA transcriptions of the English vocabulary words
+PHONETICS = {
+    # General
+    "serendipity": "/ˌsɛrənˈdɪpɪti/",
+    "eloquent": "/ˈɛləkwənt/",
+    "resilient": "/rɪˈzɪliənt/",
+    "pragmatic": "/prægˈmætɪk/",
+    "ubiquitous": "/juˈbɪkwɪtəs/",
+    "meticulous": "/məˈtɪkjələs/",
+    "ephemeral": "/ɪˈfɛmərəl/",
+    "versatile": "/ˈvɜrsətaɪl/",
+    "ambiguous": "/æmˈbɪgjuəs/",
+    "innovative": "/ˈɪnəˌveɪtɪv/",
+    "tenacious": "/təˈneɪʃəs/",
+    "profound": "/prəˈfaʊnd/",
+    "subtle": "/ˈsʌtəl/",
+    "coherent": "/koʊˈhɪrənt/",
+    "diligent": "/ˈdɪlɪdʒənt/",
+    "intricate": "/ˈɪntrɪkət/",
+    "benevolent": "/bəˈnɛvələnt/",
+    "authentic": "/ɔˈθɛntɪk/",
+    "efficient": "/ɪˈfɪʃənt/",
+    "contemplative": "/kənˈtɛmplətɪv/",
+    
+    # Science
+    "hypothesis": "/haɪˈpɑθəsɪs/",
+    "catalyst": "/ˈkætəlɪst/",
+    "molecule": "/ˈmɑləˌkjul/",
+    "ecosystem": "/ˈikoʊˌsɪstəm/",
+    "photosynthesis": "/ˌfoʊtoʊˈsɪnθəsɪs/",
+    "chromosome": "/ˈkroʊməˌsoʊm/",
+    "quantum": "/ˈkwɑntəm/",
+    "biodiversity": "/ˌbaɪoʊdaɪˈvɜrsəti/",
+    "metabolism": "/məˈtæbəˌlɪzəm/",
+    "neuron": "/ˈnʊrɑn/",
+    "osmosis": "/ɑzˈmoʊsɪs/",
+    "mitosis": "/maɪˈtoʊsɪs/",
+    "genome": "/ˈdʒinoʊm/",
+    "thermodynamics": "/ˌθɜrmoʊdaɪˈnæmɪks/",
+    "evolution": "/ˌɛvəˈluʃən/",
+    "isotope": "/ˈaɪsəˌtoʊp/",
+    "enzyme": "/ˈɛnzaɪm/",
+    "gravity": "/ˈgrævəti/",
+    "radiation": "/ˌreɪdiˈeɪʃən/",
+    "symbiosis": "/ˌsɪmbaɪˈoʊsɪs/",
+    
+    # Business
+    "entrepreneur": "/ˌɑntrəprəˈnɜr/",
+    "revenue": "/ˈrɛvəˌnu/",
+    "stakeholder": "/ˈsteɪkˌhoʊldər/",
+    "portfolio": "/pɔrtˈfoʊlioʊ/",
+    "synergy": "/ˈsɪnərdʒi/",
+    "leverage": "/ˈlɛvərɪdʒ/",
+    "equity": "/ˈɛkwəti/",
+    "margin": "/ˈmɑrdʒən/",
+    "franchise": "/ˈfrænˌtʃaɪz/",
+    "diversification": "/daɪˌvɜrsəfəˈkeɪʃən/",
+    "acquisition": "/ˌækwəˈzɪʃən/",
+    "liability": "/ˌlaɪəˈbɪləti/",
+    "liquidate": "/ˈlɪkwəˌdeɪt/",
+    "compliance": "/kəmˈplaɪəns/",
+    "benchmark": "/ˈbɛnʧˌmɑrk/",
+    "scalable": "/ˈskeɪləbəl/",
+    "subsidiary": "/səbˈsɪdiˌɛri/",
+    "turnover": "/ˈtɜrnˌoʊvər/",
+    "valuation": "/ˌvæljuˈeɪʃən/",
+    
+    # Add more categories as needed...
+}
+
+
+def get_phonetic(word):
+    """
+    Get the phonetic transcription of a vocabulary word
+
+    Args:
+        word (str): English or Korean word
+
+    Returns:
+        str: IPA for known English words, romanization for Korean words, "" otherwise
+    """
+    return PHONETICS.get(word.lower()) or get_korean_phonetic(word)
@@ -0,0 +1,328 @@
+"""
+Quiz session engine for the vocabulary builder applications
+Builds a shuffled deck of multiple-choice questions up front and stores it
+as compact index arrays, so answering a question on a rerun is O(1)
+
+Besides meaning and word questions, Korean entries support fill-in-the-blank
+(over the cloze items built at load time by cloze.py), expression matching
+and listening questions. Typed-answer rounds use a deck with one option
+per question (the answer itself) and grade the text with grading.py.
+Each quiz type reads one prompt field and one option field of the
+entries, so every type serves questions by lookup.
+"""
+
+import random
+import time
+import weakref
+from array import array
+
+from corpus import get_level_corpus
+from hangul import contains_hangul
+from grading import TYPED_QUIZ_TYPE
+
+# Constants
+QUIZ_TYPES = ["Meaning → Word", "Word → Meaning"]
+KOREAN_QUIZ_TYPES = ["Fill in the Blank", "Expression Match", "Listening"]
+
+# Quiz type -> (prompt field, option field); list fields use their first item
+QUIZ_FIELDS = {
+    "Meaning → Word": ('meaning', 'word'),
+    "Word → Meaning": ('word', 'meaning'),
+    "Fill in the Blank": ('korean_cloze', 'word'),
+    "Expression Match": ('expressions', 'korean_expressions'),
+    "Listening": ('word', 'word'),  # the prompt is played as audio
+    TYPED_QUIZ_TYPE: ('meaning', 'word')   # the answer is typed and graded by grading.py
+}
+DEFAULT_OPTION_COUNT = 4
+NO_ANSWER = -1
+
+
+# Word pools per corpus and (category, quiz type), dropped with the corpus when it reloads
+_quiz_pools = weakref.WeakKeyDictionary()
+
+
+def _field_text(entry, field):
+    value = entry.get(field)
+    if isinstance(value, list):
+        return value[0] if value else ''
+    return value or ''
+
+
+def prompt_text(entry, quiz_type):
+    """
+    Get the question text of an entry for a quiz type
+
+    Args:
+        entry (dict): Word entry being asked
+        quiz_type (str): One of QUIZ_TYPES or KOREAN_QUIZ_TYPES
+
+    Returns:
+        str: Prompt (for "Listening", the text to play as audio)
+    """
+    return _field_text(entry, QUIZ_FIELDS[quiz_type][0])
+
+
+def option_text(entry, quiz_type):
+    """
+    Get the answer choice text of an entry for a quiz type
+
+    Args:
+        entry (dict): Word entry offered as a choice
+        quiz_type (str): One of QUIZ_TYPES or KOREAN_QUIZ_TYPES
+
+    Returns:
+        str: Choice label
+    """
+    return _field_text(entry, QUIZ_FIELDS[quiz_type][1])
+
+
+def quiz_pool(words, quiz_type):
+    """
+    Keep the entries that have the prompt and option fields of a quiz type
+
+    Korean question types also need a Korean option (many entries carry the
+    English sentence untranslated), and an entry whose option repeats its
+    prompt would give the answer away.
+
+    Args:
+        words (list): Word entries
+        quiz_type (str): One of QUIZ_TYPES or KOREAN_QUIZ_TYPES
+
+    Returns:
+        list: The usable entries (words itself for meaning and word questions)
+    """
+    if quiz_type in QUIZ_TYPES:
+        return words
+    prompt_field, option_field = QUIZ_FIELDS[quiz_type]
+    korean = quiz_type in KOREAN_QUIZ_TYPES
+    pool = []
+    for entry in words:
+        prompt = _field_text(entry, prompt_field)
+        option = _field_text(entry, option_field)
+        if not prompt or not option or (korean and not contains_hangul(option)):
+            continue
+        # Listening plays the option itself as audio; other types must not show it
+        if prompt_field != option_field and prompt.strip().lower() == option.strip().lower():
+            continue
+        pool.append(entry)
+    return pool
+
+
+def get_quiz_words(level, category, quiz_type=None):
+    """
+    Get the cached word pool of a corpus-backed level category
+
+    Args:
+        level (int or str): Level number (1-4) or "Korean"
+        category (str): Category name
+        quiz_type (str): Keep only the entries that have the fields of this quiz type
+            (None for every entry)
+
+    Returns:
+        list or None: Shared list of word entries, or None for levels without a corpus
+    """
+    corpus = get_level_corpus(level)
+    if corpus is None:
+        return None
+    words = corpus.get_category(category)
+    if quiz_type is None or quiz_type in QUIZ_TYPES:
+        return words
+
+    pools = _quiz_pools.get(corpus)
+    if pools is None:
+        pools = _quiz_pools.setdefault(corpus, {})
+    key = (category, quiz_type)
+    pool = pools.get(key)
+    if pool is None:
+        pool = pools[key] = quiz_pool(words, quiz_type)
+    return pool
+
+
+def generate_quiz_question(words, correct_word, option_count=DEFAULT_OPTION_COUNT):
+    """
+    Build the options of a single multiple-choice question
+
+    Args:
+        words (list): Word pool to draw distractors from
+        correct_word (dict): Word entry being asked
+        option_count (int): Number of choices including the correct one
+
+    Returns:
+        list: Shuffled list of word entries containing correct_word
+    """
+    options = [correct_word]
+    other_words = [w for w in words if w['word'] != correct_word['word']]
+
+    # Add random wrong options
+    options.extend(random.sample(other_words, min(option_count - 1, len(other_words))))
+
+    random.shuffle(options)
+    return options
+
+
+def _index_array(size):
+    return array('H' if size <= 0xFFFF else 'I')
+
+
+class QuizSession:
+    """
+    A quiz round over one word pool with every question drawn up front
+
+    The session keeps only indexes into the pool (never copies of the word
+    entries), so it stays small in the Streamlit session state. Callers pass
+    the current pool to the methods that need entries.
+    """
+
+    def __init__(self, level, category, pool_size, deck_size=None, option_count=DEFAULT_OPTION_COUNT,
+                 time_limit=None, seed=None):
+        """
+        Build the question deck
+
+        Args:
+            level (int or str): Level the pool belongs to
+            category (str): Category the pool belongs to
+            pool_size (int): Number of words in the pool
+            deck_size (int): Number of questions (None for one pass over the pool)
+            option_count (int): Number of choices per question
+            time_limit (float): Round time limit in seconds (None for untimed)
+            seed (int): Optional random seed for reproducible decks
+        """
+        if pool_size < 2:
+            raise ValueError("A quiz needs at least 2 words")
+
+        self.level = level
+        self.category = category
+        self.pool_size = pool_size
+        self.option_count = min(option_count, pool_size)
+        self.time_limit = time_limit
+        self.deck_size = deck_size or pool_size
+
+        rng = random.Random(seed)
+        self.deck = _index_array(pool_size)
+        self.options = _index_array(pool_size)
+        self.answers = array('b')
+
+        # Draw full permutations so no word repeats until the pool is exhausted
+        while len(self.deck) < self.deck_size:
+            order = list(range(pool_size))
+            rng.shuffle(order)
+            if len(self.deck) and order[0] == self.deck[-1]:
+                order[0], order[-1] = order[-1], order[0]
+            self.deck.extend(order[:self.deck_size - len(self.deck)])
+
+        for correct in self.deck:
+            # Sample distractors from the pool without the correct index
+            others = rng.sample(range(pool_size - 1), self.option_count - 1)
+            choices = [other + 1 if other >= correct else other for other in others]
+            choices.insert(rng.randrange(self.option_count), correct)
+            self.options.extend(choices)
+
+        self.position = 0
+        self.score = 0
+        self.answered = False
+        self.started_at = time.time()
+        self.question_started_at = self.started_at
+
+    def matches(self, level, category, pool_size):
+        """
+        Check whether the session was built for the given pool
+
+        Args:
+            level (int or str): Current level
+            category (str): Current category
+            pool_size (int): Current number of words in the pool
+
+        Returns:
+            bool: True if the deck indexes are valid for the pool
+        """
+        return self.level == level and self.category == category and self.pool_size == pool_size
+
+    @property
+    def total(self):
+        """Number of questions answered so far"""
+        return len(self.answers)
+
+    @property
+    def finished(self):
+        """True when every question of the deck has been answered or time ran out"""
+        return self.position >= self.deck_size or self.expired
+
+    @property
+    def expired(self):
+        """True when a timed round ran out of time"""
+        return self.time_limit is not None and self.time_remaining() <= 0
+
+    def time_remaining(self):
+        """
+        Get the seconds left in a timed round
+
+        Returns:
+            float or None: Remaining seconds, or None for untimed rounds
+        """
+        if self.time_limit is None:
+            return None
+        return max(0.0, self.time_limit - (time.time() - self.started_at))
+
+    def current_indexes(self):
+        """
+        Get the pool indexes of the current question
+
+        Returns:
+            tuple: (correct_index, list of option indexes)
+        """
+        start = self.position * self.option_count
+        return self.deck[self.position], list(self.options[start:start + self.option_count])
+
+    def current_question(self, words):
+        """
+        Resolve the current question against the pool
+
+        Args:
+            words (list): The word pool the session was built for
+
+        Returns:
+            tuple: (correct word entry, list of option word entries)
+        """
+        correct, options = self.current_indexes()
+        return words[correct], [words[index] for index in options]
+
+    def answer(self, option_position):
+        """
+        Record the answer to the current question
+
+        Args:
+            option_position (int): Position of the chosen option (NO_ANSWER if none)
+
+        Returns:
+            bool: True if the answer was correct
+        """
+        correct, options = self.current_indexes()
+        is_correct = 0 <= option_position < len(options) and options[option_position] == correct
+        self.answers.append(option_position)
+        if is_correct:
+            self.score += 1
+        self.answered = True
+        return is_correct
+
+    def latency_ms(self):
+        """
+        Get the time spent on the current question
+
+        Returns:
+            int: Milliseconds since the question was shown
+        """
+        return int((time.time() - self.question_started_at) * 1000)
+
+    def next_question(self):
+        """
+        Advance to the next question of the deck
+
+        Returns:
+            bool: False if the deck is exhausted or the time ran out
+        """
+        if self.finished:
+            return False
+        self.position += 1
+        self.answered = False
+        self.question_started_at = time.time()
+        return not self.finished
@@ -0,0 +1,221 @@
+"""
+Service layer shared by every Streamlit entry point
+One import for the vocabulary, learned-word, quiz, audio and media services
+used by app.py, app_advanced1.py, app_basic.py, the Korean apps and pages/.
+
+Each service keeps its state in a process-wide singleton: the level corpus
+cache (corpus.py), the audio cache (main.py), the phrase edit buffer
+(phrase_edits.py) and the media index below. With VOCAB_WATCH=1 a
+background watcher (watcher.py) reloads changed level files and media.
+Streamlit runs every app and page of a deployment in one server process,
+so they all share one warm cache and each file is read once, whichever app
+reads it first.
+"""
+
+import os
+import threading
+
+# Vocabulary
+from main import (
+    load_word_pools,
+    load_vocabulary_from_file,
+    load_category_from_file,
+    count_vocabulary_words,
+    save_word_pools_to_file,
+    filter_words_by_category,
+    get_category_statistics,
+    validate_word_entry,
+    DEFAULT_CATEGORIES,
+    DEFAULT_VOCABULARY_FILE,
+    DIFFICULTY_LEVELS,
+    LEVEL_DESCRIPTIONS,
+    SPEED_OPTIONS,
+    SPEED_LABELS
+)
+from corpus import (
+    get_level_file,
+    get_level_corpus,
+    get_korean_corpus,
+    load_vocabulary_with_expressions,
+    find_entry
+)
+from vocabulary_format import update_phrase_in_file, delete_word_from_file, write_vocabulary, append_entry
+from phrase_edits import record_phrase_edit
+from pronunciation import get_phonetic, get_korean_phonetic
+from difficulty import get_difficulty, DIFFICULTY_FILTERS
+
+# Learned words
+from learned import (
+    save_to_learned,
+    load_learned_words,
+    save_learned_words_to_file,
+    delete_learned_word,
+    get_learned_index,
+    load_recent_learned_words,
+    mark_reviewed,
+    migrate_legacy_learned_file,
+    DEFAULT_LEARNED_FILE
+)
+
+# Learner accounts
+from user_store import get_user_store, UserStore
+
+# Hot reload (VOCAB_WATCH)
+from watcher import start_watcher, get_watcher, WATCH_ENABLED
+
+# Quiz
+from quiz import (
+    QuizSession,
+    get_quiz_words,
+    generate_quiz_question,
+    prompt_text,
+    option_text,
+    QUIZ_TYPES,
+    KOREAN_QUIZ_TYPES,
+    DEFAULT_OPTION_COUNT,
+    NO_ANSWER
+)
+from grading import grade_answer, TYPED_QUIZ_TYPE, CORRECT, NEAR_MISS
+
+# Audio
+from main import get_audio, get_cached_audio, get_audio_cache_stats
+from phrase_audio import get_phrase_audio, get_word_clip, PhraseAudio
+from hangul import contains_hangul
+
+# Constants
+MEDIA_FOLDER = "media"
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif"]
+VIDEO_EXTENSIONS = [".mp4", ".avi", ".mov"]
+MEDIA_EXTENSIONS = {"image": IMAGE_EXTENSIONS, "video": VIDEO_EXTENSIONS}
+
+
+def update_phrase_in_json(word_to_update, new_phrase, level, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Update the phrase for a specific word in the JSON level files
+
+    The edit is buffered and written by the next flush of the phrase edit
+    buffer, so a burst of edits costs one write of the level file.
+
+    Args:
+        word_to_update (str): Headword to change (case-insensitive)
+        new_phrase (str): New example phrase
+        level (int or str): Level number, "Korean" or "learned"
+        learned_file (str): Learned words file used for the "learned" level
+
+    Returns:
+        bool: True if the word exists in the level file
+    """
+    if level == "learned":
+        return update_phrase_in_learned_json(word_to_update, new_phrase, learned_file)
+
+    filename = get_level_file(level)
+    if not filename or not os.path.exists(filename):
+        return False
+    return record_phrase_edit(filename, word_to_update, new_phrase)
+
+
+def update_phrase_in_learned_json(word_to_update, new_phrase, learned_file=DEFAULT_LEARNED_FILE):
+    """
+    Update the phrase for a specific word in the learned words file
+
+    Args:
+        word_to_update (str): Headword to change (case-insensitive)
+        new_phrase (str): New example phrase
+        learned_file (str): Path to the learned words JSON file
+
+    Returns:
+        bool: True if the word is in the learned words file
+    """
+    if not os.path.exists(learned_file):
+        return False
+    return record_phrase_edit(learned_file, word_to_update, new_phrase)
+
+
+class MediaIndex:
+    """
+    File names of a media folder, listed once and refreshed when the folder changes
+
+    Replaces an os.path.exists call per word and extension on every rerun
+    with a set lookup; adding or removing a file changes the folder's mtime,
+    which triggers a new listing.
+    """
+
+    def __init__(self, folder=MEDIA_FOLDER):
+        self.folder = folder
+        self._mtime = None
+        self._names = frozenset()
+        self._lock = threading.Lock()
+
+    def _current_names(self):
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return frozenset()
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self._names = frozenset(os.listdir(self.folder))
+                    except OSError:
+                        self._names = frozenset()
+                    self._mtime = mtime
+        return self._names
+
+    def refresh(self):
+        """
+        Re-list the folder now (called by the data watcher when media files change)
+        """
+        with self._lock:
+            self._mtime = None
+        self._current_names()
+
+    def find(self, word, kinds=("image", "video")):
+        """
+        Find the media file of a word (media/<word>.<ext>, lowercase word)
+
+        Args:
+            word (str): Headword
+            kinds (tuple): Media kinds to look for, in order of preference
+
+        Returns:
+            tuple or None: (path, kind), or None if the word has no media
+        """
+        names = self._current_names()
+        if not names:
+            return None
+        stem = word.lower()
+        for kind in kinds:
+            for ext in MEDIA_EXTENSIONS[kind]:
+                name = f"{stem}{ext}"
+                if name in names:
+                    return os.path.join(self.folder, name), kind
+        return None
+
+
+# Process-wide media index shared by every app
+_media_index = MediaIndex()
+
+
+def refresh_media():
+    """
+    Re-list the shared media folder
+    """
+    _media_index.refresh()
+
+
+def find_media(word, kinds=("image", "video")):
+    """
+    Find the image or video of a word in the shared media folder
+
+    Args:
+        word (str): Headword
+        kinds (tuple): "image" and/or "video", in order of preference
+
+    Returns:
+        tuple or None: (path, kind), or None if the word has no media
+    """
+    return _media_index.find(word, kinds)
+
+
+if WATCH_ENABLED:
+    start_watcher()
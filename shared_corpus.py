@@ -0,0 +1,482 @@
+"""
+Shared-memory vocabulary corpus for multi-process deployments
+One loader process compiles each level file (words with their derived
+columns, categories and the headword index) into a read-only binary file;
+every Streamlit or API worker memory-maps it instead of parsing the JSON,
+so the corpus pages live once in the OS page cache rather than once per
+worker. Entries are decoded on access and never kept by the worker; text
+search scans a lowercase copy of the headwords and meanings in the mapped
+file, so only matching entries are decoded.
+
+Reloads swap generations atomically: the loader writes the new generation
+to a temporary file and renames it over the old one. Workers notice the new
+file on their next lookup and map it, while mappings of the old generation
+stay valid until their last user drops them.
+
+Enable it by pointing VOCAB_SHARED_CORPUS at a directory (ideally on tmpfs,
+e.g. /dev/shm/vocab) in every worker, and run the loader next to them:
+
+    python shared_corpus.py --dir /dev/shm/vocab --watch
+
+Workers fall back to parsing the level file themselves while the compiled
+file is missing or older than the level file.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+from instrumentation import configure_logging
+
+# Constants
+SHARED_CORPUS_DIR = os.environ.get("VOCAB_SHARED_CORPUS")
+MAGIC = b"VOCABCP2"
+# magic, generation, source mtime_ns, source size, metadata length
+HEADER = struct.Struct("<8sQqQQ")
+ALIGNMENT = 8
+DEFAULT_WATCH_INTERVAL = 2.0    # seconds between level file checks in --watch mode
+SEARCH_SEPARATOR = "\x1f"       # between the headword and the meaning of a search row
+
+logger = logging.getLogger(__name__)
+
+# Worker side: compiled file path -> SharedCorpus currently mapped
+_attached = {}
+_attach_lock = threading.Lock()
+
+
+def compiled_path(source_path, directory=SHARED_CORPUS_DIR):
+    """
+    Get the compiled file of a level file
+
+    Args:
+        source_path (str): Level JSON file
+        directory (str): Directory of the compiled files
+
+    Returns:
+        str: Path of the compiled corpus file
+    """
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(directory, f"{name}.corpus")
+
+
+def _pad(buffer):
+    buffer.extend(b"\0" * (-len(buffer) % ALIGNMENT))
+
+
+def _pack_blobs(blobs):
+    """Concatenate byte strings; return (offsets array with one extra end offset, blob)"""
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for item in blobs:
+        blob.extend(item)
+        offsets.append(len(blob))
+    return offsets, blob
+
+
+def compile_corpus(corpus, generation=1):
+    """
+    Serialize a corpus into the shared binary format
+
+    Layout: header, JSON metadata (level, categories as entry ranges, section
+    offsets), entry offsets + entry JSON blob, sorted headword offsets +
+    headword blob, the entry id of each headword, and search row offsets +
+    blob (lowercase "headword<US>meaning" per entry).
+
+    Args:
+        corpus (VocabularyCorpus): Parsed corpus (entries grouped by category)
+        generation (int): Generation number stored in the header
+
+    Returns:
+        bytes: The compiled corpus
+    """
+    entries = []
+    categories = []
+    for name, words in corpus.categories.items():
+        categories.append([name, len(entries), len(words)])
+        entries.extend(words)
+
+    entry_offsets, entry_blob = _pack_blobs(
+        json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode('utf-8') for entry in entries)
+
+    # First occurrence of a headword wins, as in VocabularyCorpus
+    positions = {id(entry): index for index, entry in enumerate(entries)}
+    keys = sorted((headword.encode('utf-8'), positions[id(entry)]) for headword, entry in corpus.word_index.items())
+    key_offsets, key_blob = _pack_blobs(key for key, _ in keys)
+    key_entries = array('I', [index for _, index in keys])
+    search_offsets, search_blob = _pack_blobs(
+        f"{entry.get('word', '')}{SEARCH_SEPARATOR}{entry.get('meaning', '')}".lower().encode('utf-8')
+        for entry in entries)
+
+    body = bytearray()
+    sections = {}
+    for name, data in (("entry_offsets", entry_offsets.tobytes()), ("entries", entry_blob),
+                       ("key_offsets", key_offsets.tobytes()), ("keys", key_blob),
+                       ("key_entries", key_entries.tobytes()),
+                       ("search_offsets", search_offsets.tobytes()), ("search", search_blob)):
+        _pad(body)
+        sections[name] = [len(body), len(data)]
+        body.extend(data)
+
+    meta = json.dumps({
+        "path": corpus.path,
+        "level": corpus.level,
+        "categories": categories,
+        "entry_count": len(entries),
+        "key_count": len(keys),
+        "sections": sections
+    }, ensure_ascii=False).encode('utf-8')
+    meta += b" " * (-(HEADER.size + len(meta)) % ALIGNMENT)
+    signature = corpus.signature or (0, 0)
+    header = HEADER.pack(MAGIC, generation, signature[0], signature[1], len(meta))
+    return header + meta + bytes(body)
+
+
+def _read_generation(path):
+    try:
+        with open(path, 'rb') as f:
+            magic, generation, _, _, _ = HEADER.unpack(f.read(HEADER.size))
+        return generation if magic == MAGIC else 0
+    except (OSError, struct.error):
+        return 0
+
+
+def publish_corpus(corpus, directory=SHARED_CORPUS_DIR):
+    """
+    Compile a corpus and atomically replace its shared file with the next generation
+
+    Args:
+        corpus (VocabularyCorpus): Parsed corpus
+        directory (str): Directory of the compiled files
+
+    Returns:
+        int: Generation number written
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = compiled_path(corpus.path, directory)
+    generation = _read_generation(target) + 1
+    data = compile_corpus(corpus, generation)
+    fd, temp_path = tempfile.mkstemp(prefix=".corpus-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        # Workers still mapping the previous generation keep its inode alive
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    logger.info("Published %s generation %d (%d bytes)", target, generation, len(data))
+    return generation
+
+
+class _EntrySequence(Sequence):
+    """Read-only sequence of the entries in a range, decoded on access"""
+
+    def __init__(self, corpus, start, count):
+        self._corpus = corpus
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._corpus.entry(self._start + position) for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("entry index out of range")
+        return self._corpus.entry(self._start + index)
+
+    def __iter__(self):
+        entry = self._corpus.entry
+        for position in range(self._start, self._start + self._count):
+            yield entry(position)
+
+
+class _WordIndex(Mapping):
+    """Headword -> entry mapping backed by the sorted key table"""
+
+    def __init__(self, corpus):
+        self._corpus = corpus
+
+    def __getitem__(self, word):
+        entry = self._corpus.lookup(word)
+        if entry is None:
+            raise KeyError(word)
+        return entry
+
+    def __len__(self):
+        return self._corpus.key_count
+
+    def __iter__(self):
+        for index in range(self._corpus.key_count):
+            yield self._corpus.key(index)
+
+
+class SharedCorpus:
+    """
+    Memory-mapped compiled corpus with the interface of VocabularyCorpus
+
+    Entries are decoded on every access, so callers get private dicts and
+    the worker keeps no copy of the corpus.
+    """
+
+    shared = True
+
+    def __init__(self, file_path):
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_path = file_path
+        self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        magic, self.generation, mtime_ns, size, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{file_path} is not a compiled corpus")
+        meta = json.loads(self._map[HEADER.size:HEADER.size + meta_length])
+        self.signature = (mtime_ns, size)
+        self.path = meta['path']
+        self.level = meta['level']
+        self.key_count = meta['key_count']
+
+        body = HEADER.size + meta_length
+        view = memoryview(self._map)[body:]
+        sections = {name: view[offset:offset + length] for name, (offset, length) in meta['sections'].items()}
+        self._entry_offsets = sections['entry_offsets'].cast('Q')
+        self._entries = sections['entries']
+        self._key_offsets = sections['key_offsets'].cast('Q')
+        self._keys = sections['keys']
+        self._key_entries = sections['key_entries'].cast('I')
+        self._search_offsets = sections['search_offsets'].cast('Q')
+        # Absolute position of the search blob, for mmap.find
+        self._search_start = body + meta['sections']['search'][0]
+        self._key_view = _KeyView(self)
+
+        self.words = _EntrySequence(self, 0, meta['entry_count'])
+        self.categories = {name: _EntrySequence(self, start, count) for name, start, count in meta['categories']}
+        self.category_counts = {name: count for name, _, count in meta['categories']}
+        self.word_index = _WordIndex(self)
+
+    def __len__(self):
+        return len(self.words)
+
+    def entry(self, index):
+        """Decode the entry at a position of the corpus"""
+        offsets = self._entry_offsets
+        return json.loads(bytes(self._entries[offsets[index]:offsets[index + 1]]))
+
+    def key(self, index):
+        """Decode the headword at a position of the sorted key table"""
+        offsets = self._key_offsets
+        return bytes(self._keys[offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def category_names(self):
+        """
+        Get the category names in file order
+
+        Returns:
+            list: Category names
+        """
+        return list(self.categories.keys())
+
+    def get_category(self, category, limit=None):
+        """
+        Get the words of one category, optionally limited to the first N entries
+
+        Args:
+            category (str): Category name
+            limit (int): Maximum number of words to return (None for all)
+
+        Returns:
+            Sequence: Word entries of the category (empty if the category is unknown)
+        """
+        words = self.categories.get(category)
+        if words is None:
+            words = self.categories.get(category.lower(), [])
+        if limit is None or limit >= len(words):
+            return words
+        return _EntrySequence(self, words._start, limit)
+
+    def lookup(self, word):
+        """
+        Find a word entry by its headword (Hangul or case-insensitive English)
+
+        Args:
+            word (str): Headword to look up
+
+        Returns:
+            dict or None: The word entry, or None if not found
+        """
+        key = word.strip().lower().encode('utf-8')
+        index = bisect_left(self._key_view, key)
+        if index < self.key_count and self._key_view[index] == key:
+            return self.entry(self._key_entries[index])
+        return None
+
+    def search(self, query):
+        """
+        Find the entries whose headword or meaning contains a text
+
+        Scans the lowercase search rows in the mapped file; only the rows of
+        matching entries are decoded.
+
+        Args:
+            query (str): Lowercase text to find
+
+        Returns:
+            list: (lowercase headword, lowercase meaning, entry position) tuples in corpus order
+        """
+        needle = query.encode('utf-8')
+        offsets = self._search_offsets
+        start = self._search_start
+        end = start + offsets[len(offsets) - 1]
+        matches = []
+        position = self._map.find(needle, start, end) if needle else -1
+        while position >= 0:
+            index = bisect_right(offsets, position - start) - 1
+            row = bytes(self._map[start + offsets[index]:start + offsets[index + 1]]).decode('utf-8')
+            word, _, meaning = row.partition(SEARCH_SEPARATOR)
+            # A hit spanning two rows or the separator matches neither field
+            if query in word or query in meaning:
+                matches.append((word, meaning, index))
+            position = self._map.find(needle, start + offsets[index + 1], end)
+        return matches
+
+    def to_word_pools(self):
+        """
+        Get the corpus in the word pools format used by load_word_pools
+
+        Returns:
+            dict: Dictionary of category name -> list of word entries
+        """
+        return {name: list(words) for name, words in self.categories.items()}
+
+
+class _KeyView(Sequence):
+    """Sorted headwords as UTF-8 bytes, for bisect"""
+
+    def __init__(self, corpus):
+        self._corpus = corpus
+
+    def __len__(self):
+        return self._corpus.key_count
+
+    def __getitem__(self, index):
+        offsets = self._corpus._key_offsets
+        return bytes(self._corpus._keys[offsets[index]:offsets[index + 1]])
+
+
+def get_shared_corpus(source_path, signature, directory=SHARED_CORPUS_DIR):
+    """
+    Attach to the compiled corpus of a level file (worker side)
+
+    The compiled file is checked with one stat per call and remapped when
+    the loader published a new generation.
+
+    Args:
+        source_path (str): Level JSON file
+        signature (tuple): Current (mtime_ns, size) of the level file
+        directory (str): Directory of the compiled files
+
+    Returns:
+        SharedCorpus or None: The corpus, or None if there is no compiled file
+            for the current version of the level file
+    """
+    if not directory:
+        return None
+    target = compiled_path(source_path, directory)
+    try:
+        stat = os.stat(target)
+    except OSError:
+        return None
+    file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    corpus = _attached.get(target)
+    if corpus is None or corpus.file_id != file_id:
+        with _attach_lock:
+            corpus = _attached.get(target)
+            if corpus is None or corpus.file_id != file_id:
+                try:
+                    corpus = SharedCorpus(target)
+                except (OSError, ValueError) as e:
+                    logger.error("Error attaching %s: %s", target, e)
+                    return None
+                _attached[target] = corpus
+                logger.info("Attached %s generation %d", target, corpus.generation)
+    if corpus.signature != signature:
+        # The level file changed and the loader has not republished it yet
+        return None
+    return corpus
+
+
+def publish_levels(directory, levels=None):
+    """
+    Parse and publish every level file whose compiled file is missing or stale
+
+    Args:
+        directory (str): Directory of the compiled files
+        levels (list): Level files to publish (default: the shipped level files)
+
+    Returns:
+        int: Number of level files published
+    """
+    from corpus import LEVEL_FILES, SHIPPED_LEVELS, parse_corpus
+
+    published = 0
+    for path in levels or [LEVEL_FILES[level] for level in SHIPPED_LEVELS]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.error("%s not found", path)
+            continue
+        signature = (stat.st_mtime_ns, stat.st_size)
+        target = compiled_path(path, directory)
+        try:
+            with open(target, 'rb') as f:
+                magic, _, mtime_ns, size, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic == MAGIC and (mtime_ns, size) == signature:
+                continue
+        except (OSError, struct.error):
+            pass
+        corpus = parse_corpus(path)
+        if corpus is not None:
+            publish_corpus(corpus, directory)
+            published += 1
+    return published
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the level files into shared memory-mapped corpora")
+    parser.add_argument("--dir", default=SHARED_CORPUS_DIR,
+                        help="Directory of the compiled files (default: $VOCAB_SHARED_CORPUS)")
+    parser.add_argument("--watch", action="store_true", help="Keep running and republish changed level files")
+    parser.add_argument("--interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help=f"Seconds between checks with --watch (default: {DEFAULT_WATCH_INTERVAL})")
+    parser.add_argument("levels", nargs="*", help="Level files to compile (default: the shipped levels)")
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("--dir or VOCAB_SHARED_CORPUS is required")
+
+    configure_logging()
+    publish_levels(args.dir, args.levels)
+    while args.watch:
+        time.sleep(args.interval)
+        publish_levels(args.dir, args.levels)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
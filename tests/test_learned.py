@@ -0,0 +1,30 @@
+import json
+import os
+
+from learned import migrate_legacy_learned_file, load_learned_words, delete_learned_word
+
+
+def test_legacy_learned_file_is_merged_once(tmp_path):
+    legacy_file = str(tmp_path / "learned.json")
+    learned_file = str(tmp_path / "data" / "learned.json")
+    os.makedirs(os.path.dirname(learned_file))
+    with open(learned_file, 'w', encoding='utf-8') as f:
+        json.dump([{'word': "Apple", 'learned_date': "2025-01-02T00:00:00"}], f)
+    with open(legacy_file, 'w', encoding='utf-8') as f:
+        json.dump([{'word': "apple", 'learned_date': "2024-01-01T00:00:00"},
+                   {'word': "Zebra", 'learned_date': "2024-01-01T00:00:00"}], f)
+
+    assert migrate_legacy_learned_file(legacy_file, learned_file) == 1
+    assert [w['word'] for w in load_learned_words(learned_file)] == ["Apple", "Zebra"]
+    assert not os.path.exists(legacy_file)
+    assert migrate_legacy_learned_file(legacy_file, learned_file) == 0
+
+
+def test_delete_learned_word_keeps_the_other_words(tmp_path):
+    learned_file = str(tmp_path / "learned.json")
+    with open(learned_file, 'w', encoding='utf-8') as f:
+        json.dump([{'word': "Apple"}, {'word': "Zebra"}], f)
+
+    assert delete_learned_word("apple", learned_file)
+    assert not delete_learned_word("apple", learned_file)
+    assert [w['word'] for w in load_learned_words(learned_file)] == ["Zebra"]
@@ -0,0 +1,23 @@
+from corpus import get_korean_corpus
+from hangul import contains_hangul
+from quiz import QuizSession, get_quiz_words, prompt_text, option_text
+
+
+def test_expression_match_never_shows_the_answer_as_prompt():
+    corpus = get_korean_corpus()
+    asked = 0
+    for category in corpus.category_names():
+        words = get_quiz_words("Korean", category, "Expression Match")
+        if len(words) < 2:
+            continue
+        session = QuizSession(("Korean", "Expression Match"), category, len(words), seed=0)
+        while not session.finished:
+            correct, options = session.current_question(words)
+            prompt = prompt_text(correct, "Expression Match")
+            labels = [option_text(option, "Expression Match") for option in options]
+            assert prompt not in labels
+            assert all(contains_hangul(label) for label in labels)
+            session.answer(0)
+            session.next_question()
+            asked += 1
+    assert asked
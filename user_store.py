@@ -0,0 +1,267 @@
+"""
+Per-user learned words, answer log and working vocabulary
+Each learner gets a directory under data/users, sharded by a hash of the
+user id (data/users/<shard>/<user id>/) so no directory grows past a few
+hundred entries. Nothing is read at login: a user's files are loaded by
+the caches of learned.py and answer_log.py on first use, and the stores of
+the most recently active users are kept in an LRU. Evicting a user writes
+their buffered edits and drops their cached data from memory.
+
+The default "local" user keeps the original single-user files
+(data/learned.json, vocabulary.txt and data/answers), so existing installs
+need no migration beyond the learned.py move of learned.json into data/.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from answer_log import (
+    log_answer,
+    close_answer_log,
+    DEFAULT_USER,
+    DEFAULT_ANSWER_LOG_DIR,
+    USERS_FOLDER,
+    ANSWERS_FOLDER_NAME
+)
+from answer_analytics import get_user_progress, forget_progress
+from learned import (
+    save_to_learned,
+    load_learned_words,
+    save_learned_words_to_file,
+    delete_learned_word,
+    get_learned_index,
+    mark_reviewed,
+    forget_learned_file,
+    DEFAULT_LEARNED_FILE
+)
+from phrase_edits import forget_file
+from main import DEFAULT_VOCABULARY_FILE
+from instrumentation import record_cache
+
+# Constants
+SHARD_COUNT = 256           # shard directories 00-ff
+MAX_ACTIVE_USERS = 128      # user stores kept in memory
+USER_ID_PATTERN = re.compile(r"[a-z0-9][a-z0-9_.@-]{0,63}")
+LEARNED_FILE_NAME = "learned.json"
+VOCABULARY_FILE_NAME = "vocabulary.txt"
+
+logger = logging.getLogger(__name__)
+
+# Process-wide LRU: (users folder, user id) -> UserStore, most recently used last
+_active_users = OrderedDict()
+_users_lock = threading.Lock()
+
+
+def normalize_user_id(user_id):
+    """
+    Validate a user id and return its canonical (lowercase) form
+
+    Args:
+        user_id (str): User name as typed at login
+
+    Returns:
+        str: Lowercase user id
+
+    Raises:
+        ValueError: If the id is empty or has characters other than letters,
+            digits, "_", ".", "@" and "-" (or is longer than 64 characters)
+    """
+    normalized = str(user_id).strip().lower()
+    if not USER_ID_PATTERN.fullmatch(normalized):
+        raise ValueError(f"Invalid user id: {user_id!r}")
+    return normalized
+
+
+def user_shard(user_id):
+    """
+    Get the shard directory name of a user id
+
+    Args:
+        user_id (str): Normalized user id
+
+    Returns:
+        str: Two hex digits
+    """
+    digest = hashlib.sha1(user_id.encode('utf-8')).digest()
+    return f"{digest[0] % SHARD_COUNT:02x}"
+
+
+class UserStore:
+    """
+    Learned words, answer log and working vocabulary file of one user
+
+    The methods delegate to the shared learned.py and answer_log.py
+    functions with this user's paths, so every cache and file lock applies
+    per user.
+    """
+
+    def __init__(self, user_id, users_folder=USERS_FOLDER):
+        """
+        Locate (but do not read) the files of a user
+
+        Args:
+            user_id (str): Normalized user id
+            users_folder (str): Root of the sharded user directories
+        """
+        self.user_id = user_id
+        if user_id == DEFAULT_USER:
+            self.directory = None
+            self.learned_file = DEFAULT_LEARNED_FILE
+            self.vocabulary_file = DEFAULT_VOCABULARY_FILE
+            self.answer_log_dir = DEFAULT_ANSWER_LOG_DIR
+        else:
+            self.directory = os.path.join(users_folder, user_shard(user_id), user_id)
+            self.learned_file = os.path.join(self.directory, LEARNED_FILE_NAME)
+            self.vocabulary_file = os.path.join(self.directory, VOCABULARY_FILE_NAME)
+            self.answer_log_dir = os.path.join(self.directory, ANSWERS_FOLDER_NAME)
+
+    def ensure_directory(self):
+        """
+        Create the user directory (no-op for the default user)
+        """
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def load_learned_words(self):
+        """
+        Load the user's learned words
+
+        Returns:
+            list: List of word dictionaries
+        """
+        return load_learned_words(self.learned_file)
+
+    def save_to_learned(self, word_entry):
+        """
+        Mark a word as learned
+
+        Args:
+            word_entry (dict): Word entry to mark as learned
+
+        Returns:
+            bool: True if the word was added, False if it was already learned
+        """
+        self.ensure_directory()
+        return save_to_learned(word_entry, self.learned_file)
+
+    def save_learned_words(self, learned_words):
+        """
+        Replace the user's learned words
+
+        Args:
+            learned_words (list): List of learned word dictionaries
+
+        Returns:
+            bool: True when saved
+        """
+        self.ensure_directory()
+        return save_learned_words_to_file(learned_words, self.learned_file)
+
+    def delete_learned_word(self, word):
+        """
+        Remove a word from the user's learned words
+
+        Args:
+            word (str): Headword to remove
+
+        Returns:
+            bool: True if the word was removed
+        """
+        return delete_learned_word(word, self.learned_file)
+
+    def get_learned_index(self):
+        """
+        Get the date index of the user's learned words
+
+        Returns:
+            LearnedIndex: The index
+        """
+        return get_learned_index(self.learned_file)
+
+    def mark_reviewed(self, words):
+        """
+        Record today's review of learned words
+
+        Args:
+            words (iterable): Headwords that were reviewed
+
+        Returns:
+            int: Number of learned words updated
+        """
+        return mark_reviewed(words, self.learned_file)
+
+    def log_answer(self, level, category, word, quiz_type, chosen, correct, latency_ms):
+        """
+        Append one quiz answer to the user's answer log
+
+        Returns:
+            bool: True if the answer was written
+        """
+        return log_answer(self.user_id, level, category, word, quiz_type, chosen, correct, latency_ms,
+                          log_dir=self.answer_log_dir)
+
+    def get_progress(self):
+        """
+        Get the Progress page statistics of the user
+
+        Returns:
+            dict: summary, categories, streaks and error_rates
+        """
+        return get_user_progress(self.user_id, self.answer_log_dir)
+
+    def close(self):
+        """
+        Write buffered edits and drop the user's cached data from memory
+        """
+        forget_file(self.learned_file)
+        forget_learned_file(self.learned_file)
+        forget_progress(self.answer_log_dir)
+        close_answer_log(self.answer_log_dir)
+
+
+def get_user_store(user_id=DEFAULT_USER, users_folder=USERS_FOLDER):
+    """
+    Get the store of a user, evicting the least recently active user when full
+
+    Args:
+        user_id (str): User name as typed at login
+        users_folder (str): Root of the sharded user directories
+
+    Returns:
+        UserStore: The user's store
+
+    Raises:
+        ValueError: If the user id is invalid (see normalize_user_id)
+    """
+    user_id = normalize_user_id(user_id)
+    key = (users_folder, user_id)
+    evicted = []
+    with _users_lock:
+        store = _active_users.get(key)
+        if store is not None:
+            _active_users.move_to_end(key)
+            record_cache("user_store", True)
+            return store
+        record_cache("user_store", False)
+        store = _active_users[key] = UserStore(user_id, users_folder)
+        while len(_active_users) > MAX_ACTIVE_USERS:
+            evicted.append(_active_users.popitem(last=False)[1])
+    for old_store in evicted:
+        if old_store.user_id != DEFAULT_USER:
+            logger.debug("Evicting user %s", old_store.user_id)
+            old_store.close()
+    return store
+
+
+def active_user_count():
+    """
+    Get the number of user stores held in memory
+
+    Returns:
+        int: Number of active users
+    """
+    return len(_active_users)
@@ -0,0 +1,513 @@
+"""
+Reader and writer for the pipe-delimited vocabulary file (vocabulary.txt)
+One word per line: "word | meaning | phrase | category"
+
+Field text is escaped on write (backslash, "|" and line breaks), so phrases
+may contain " | ". Lines written before escaping existed are still read: a
+line with more than four fields keeps the extra separators in its phrase.
+Lines that cannot be parsed are reported with their line number instead of
+being dropped silently, and are kept verbatim when a file is rewritten.
+
+Every write goes through atomic_io: the file is replaced atomically under its
+lock, and appends are locked and fsynced.
+
+Views of one category read only that category's lines: a per-file index of
+byte ranges by category is built in one pass over the raw bytes and kept
+until the file changes (see read_category).
+"""
+
+import gc
+import logging
+import os
+import threading
+
+from atomic_io import replace_file, file_lock, append_text
+from instrumentation import timed, record_file, record_cache, record_bytes
+
+# Constants
+FIELDS = ("word", "meaning", "phrase", "category")
+SEPARATOR = " | "
+MAX_LOGGED_ERRORS = 5
+
+_ESCAPES = {"\\": "\\", "|": "|", "n": "\n", "r": "\r"}
+_SEPARATOR_BYTES = SEPARATOR.encode('utf-8')
+
+# Process-wide cache: absolute path -> CategoryIndex
+_category_indexes = {}
+_index_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class VocabularyFormatError(ValueError):
+    """A vocabulary line that cannot be parsed"""
+
+    def __init__(self, message, line_number=None, line=None):
+        self.line_number = line_number
+        self.line = line
+        location = f"line {line_number}: " if line_number is not None else ""
+        super().__init__(f"{location}{message}")
+
+
+def escape_field(text):
+    """
+    Escape a field value for the vocabulary format
+
+    Args:
+        text (str): Field value
+
+    Returns:
+        str: Text with backslash, pipe and line breaks escaped
+    """
+    text = str(text)
+    if "\\" in text:
+        text = text.replace("\\", "\\\\")
+    if "|" in text:
+        text = text.replace("|", "\\|")
+    if "\n" in text or "\r" in text:
+        text = text.replace("\n", "\\n").replace("\r", "\\r")
+    return text
+
+
+def _split_escaped(line):
+    """Split a line containing escapes on unescaped separators, unescaping the fields"""
+    fields = []
+    current = []
+    index = 0
+    length = len(line)
+    while index < length:
+        char = line[index]
+        if char == "\\" and index + 1 < length:
+            following = line[index + 1]
+            current.append(_ESCAPES.get(following, char + following))
+            index += 2
+        elif line.startswith(SEPARATOR, index):
+            fields.append("".join(current))
+            current = []
+            index += len(SEPARATOR)
+        else:
+            current.append(char)
+            index += 1
+    fields.append("".join(current))
+    return fields
+
+
+def parse_line(line, line_number=None):
+    """
+    Parse one vocabulary line
+
+    Args:
+        line (str): Line text (surrounding whitespace is ignored)
+        line_number (int): Line number for error messages
+
+    Returns:
+        dict or None: Entry with word, meaning, phrase and category (None for a blank line)
+
+    Raises:
+        VocabularyFormatError: If the line has fewer than four fields or no word
+    """
+    text = line.strip()
+    if not text:
+        return None
+    parts = _split_escaped(text) if "\\" in text else text.split(SEPARATOR)
+    if len(parts) < 4:
+        raise VocabularyFormatError(f"expected 4 fields separated by '{SEPARATOR.strip()}', found {len(parts)}",
+                                    line_number, line)
+    if len(parts) > 4:
+        # Unescaped separators from older files belong to the phrase
+        parts = [parts[0], parts[1], SEPARATOR.join(parts[2:-1]), parts[-1]]
+    if not parts[0].strip():
+        raise VocabularyFormatError("empty word", line_number, line)
+    return {"word": parts[0], "meaning": parts[1], "phrase": parts[2], "category": parts[3]}
+
+
+def format_entry(entry, category=None):
+    """
+    Serialize one entry as a vocabulary line
+
+    Args:
+        entry (dict): Word entry with word, meaning and phrase
+        category (str): Category to write (defaults to the entry's category)
+
+    Returns:
+        str: Line text including the newline
+    """
+    fields = (entry.get('word', ''), entry.get('meaning', ''), entry.get('phrase', ''),
+              category if category is not None else entry.get('category', 'general'))
+    line = SEPARATOR.join(map(str, fields))
+    if line.count("|") == 3 and "\\" not in line and "\n" not in line and "\r" not in line:
+        # Nothing to escape (the common case)
+        return line + "\n"
+    return SEPARATOR.join(map(escape_field, fields)) + "\n"
+
+
+def _report(errors, error):
+    if errors is not None:
+        errors.append(error)
+
+
+def iter_entries(lines, errors=None, start=1):
+    """
+    Parse vocabulary lines lazily
+
+    Args:
+        lines (iterable): Lines of text (e.g. an open file)
+        errors (list): Receives a VocabularyFormatError per unparseable line (None to skip them silently)
+        start (int): Line number of the first line
+
+    Yields:
+        dict: Entry with word, meaning, phrase and category
+    """
+    for line_number, line in enumerate(lines, start):
+        try:
+            entry = parse_line(line, line_number)
+        except VocabularyFormatError as error:
+            _report(errors, error)
+            continue
+        if entry is not None:
+            yield entry
+
+
+def iter_vocabulary(file_path, errors=None):
+    """
+    Stream the entries of a vocabulary file without loading it whole
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        errors (list): Receives a VocabularyFormatError per unparseable line
+
+    Yields:
+        dict: Entry with word, meaning, phrase and category
+    """
+    with open(file_path, "r", encoding='utf-8') as f:
+        yield from iter_entries(f, errors)
+
+
+def parse_text(text, errors=None):
+    """
+    Parse a whole vocabulary document
+
+    Lines are split in bulk with str.split; only lines with escapes or an
+    unexpected number of fields go through parse_line.
+
+    Args:
+        text (str): File contents
+        errors (list): Receives a VocabularyFormatError per unparseable line
+
+    Returns:
+        list: Entries with word, meaning, phrase and category
+    """
+    entries = []
+    append = entries.append
+    # Millions of new dicts would trigger repeated full garbage collections
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for line_number, line in enumerate(text.splitlines(), 1):
+            parts = line.strip().split(SEPARATOR)
+            if len(parts) == 4 and parts[0] and "\\" not in line:
+                append({"word": parts[0], "meaning": parts[1], "phrase": parts[2], "category": parts[3]})
+                continue
+            try:
+                entry = parse_line(line, line_number)
+            except VocabularyFormatError as error:
+                _report(errors, error)
+                continue
+            if entry is not None:
+                append(entry)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return entries
+
+
+@timed()
+def read_vocabulary(file_path, errors=None):
+    """
+    Read every entry of a vocabulary file
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        errors (list): Receives a VocabularyFormatError per unparseable line
+            (None to log a warning with the first few instead)
+
+    Returns:
+        list: Entries with word, meaning, phrase and category
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "r", encoding='utf-8') as f:
+        text = f.read()
+    record_file("read_vocabulary", file_path)
+
+    problems = [] if errors is None else errors
+    entries = parse_text(text, problems)
+    if errors is None and problems:
+        logger.warning("%s: skipped %d unparseable lines (%s)", file_path, len(problems),
+                       "; ".join(str(problem) for problem in problems[:MAX_LOGGED_ERRORS]))
+    return entries
+
+
+@timed()
+def write_vocabulary(file_path, entries, category=None):
+    """
+    Write entries to a vocabulary file, replacing its contents
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        entries (iterable): Word entries
+        category (str): Category for every entry (defaults to each entry's category)
+
+    Returns:
+        int: Number of lines written
+    """
+    lines = [format_entry(entry, category) for entry in entries]
+    replace_file(file_path, "".join(lines))
+    return len(lines)
+
+
+@timed()
+def write_word_pools(file_path, word_pools):
+    """
+    Write word pools (category -> entries) to a vocabulary file, replacing its contents
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        word_pools (dict): Dictionary of category name -> list of word entries
+
+    Returns:
+        int: Number of lines written
+    """
+    count = 0
+    chunks = []
+    for category, words in word_pools.items():
+        # Format the category in bulk, escaping per entry only if some field needs it
+        text = "".join([f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | {category}\n"
+                        for entry in words])
+        if (text.count("|") != 3 * len(words) or text.count("\n") != len(words)
+                or "\\" in text or "\r" in text):
+            text = "".join([format_entry(entry, category) for entry in words])
+        chunks.append(text)
+        count += len(words)
+    replace_file(file_path, "".join(chunks))
+    return count
+
+
+class CategoryIndex:
+    """
+    Byte ranges of each category's lines in a vocabulary file
+
+    Built from one pass over the raw bytes without creating entries; the
+    entries of a category are parsed the first time it is read and kept
+    with the index, which is dropped as a whole when the file changes.
+    """
+
+    def __init__(self, file_path, signature):
+        self.file_path = file_path
+        self.signature = signature
+        self.ranges = {}    # lowercase category -> [[start, end], ...] in file order
+        self.counts = {}    # lowercase category -> number of entries
+        self._entries = {}  # lowercase category -> parsed entries
+        self._lock = threading.Lock()
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+        record_bytes("vocabulary.index", read=len(data))
+
+        offset = 0
+        for line_number, line in enumerate(data.splitlines(keepends=True), 1):
+            start, offset = offset, offset + len(line)
+            category = self._line_category(line, line_number)
+            if category is None:
+                continue
+            runs = self.ranges.setdefault(category, [])
+            if runs and runs[-1][1] == start:
+                # Consecutive lines of one category share a range (one read)
+                runs[-1][1] = offset
+            else:
+                runs.append([start, offset])
+            self.counts[category] = self.counts.get(category, 0) + 1
+
+    @staticmethod
+    def _line_category(line, line_number):
+        text = line.strip()
+        if not text:
+            return None
+        parts = text.split(_SEPARATOR_BYTES)
+        if len(parts) >= 4 and parts[0].strip() and b"\\" not in text:
+            return parts[-1].decode('utf-8').lower()
+        try:
+            entry = parse_line(line.decode('utf-8'), line_number)
+        except (VocabularyFormatError, UnicodeDecodeError):
+            return None
+        return entry['category'].lower() if entry is not None else None
+
+    @property
+    def total(self):
+        """Number of entries in the file"""
+        return sum(self.counts.values())
+
+    def get_entries(self, category):
+        """
+        Parse (once) and return the entries of one category
+
+        Args:
+            category (str): Category name (case-insensitive)
+
+        Returns:
+            list or None: Entries of the category in file order (shared; treat
+            as read-only), or None if the file changed since it was indexed
+        """
+        key = category.lower()
+        entries = self._entries.get(key)
+        if entries is not None:
+            record_cache("vocabulary.category", True)
+            return entries
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None:
+                record_cache("vocabulary.category", False)
+                chunks = []
+                with open(self.file_path, "rb") as f:
+                    stat = os.fstat(f.fileno())
+                    if (stat.st_mtime_ns, stat.st_size) != self.signature:
+                        # Replaced or appended to: the byte ranges no longer apply
+                        return None
+                    for start, end in self.ranges.get(key, ()):
+                        f.seek(start)
+                        chunks.append(f.read(end - start))
+                text = b"".join(chunks).decode('utf-8')
+                record_bytes("vocabulary.category", read=len(text))
+                entries = parse_text(text)
+                self._entries[key] = entries
+        return entries
+
+
+def get_category_index(file_path):
+    """
+    Get the category index of a vocabulary file, rebuilt only when the file changed
+
+    Args:
+        file_path (str): Path to the vocabulary file
+
+    Returns:
+        CategoryIndex: The index
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    key = os.path.abspath(file_path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    index = _category_indexes.get(key)
+    if index is not None and index.signature == signature:
+        return index
+    with _index_lock:
+        index = _category_indexes.get(key)
+        if index is None or index.signature != signature:
+            index = CategoryIndex(key, signature)
+            _category_indexes[key] = index
+    return index
+
+
+@timed()
+def read_category(file_path, category):
+    """
+    Read the entries of one category without parsing the rest of the file
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        category (str): Category name (case-insensitive)
+
+    Returns:
+        list: New list of the category's entries in file order
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    entries = get_category_index(file_path).get_entries(category)
+    if entries is None:
+        entries = get_category_index(file_path).get_entries(category) or []
+    return list(entries)
+
+
+def append_entry(file_path, entry):
+    """
+    Append one entry to a vocabulary file
+
+    Args:
+        file_path (str): Path to the vocabulary file
+        entry (dict): Word entry with word, meaning, phrase and category
+    """
+    append_text(file_path, format_entry(entry))
+
+
+def _rewrite(file_path, update):
+    """
+    Rewrite a vocabulary file line by line under its lock
+
+    update(entry) returns the entry to write, or None to drop the line; lines
+    that do not parse are kept as they are.
+
+    Returns:
+        int: Number of entries changed or dropped
+    """
+    with file_lock(file_path):
+        with open(file_path, "r", encoding='utf-8') as f:
+            lines = f.readlines()
+
+        changed = 0
+        updated_lines = []
+        for line_number, line in enumerate(lines, 1):
+            try:
+                entry = parse_line(line, line_number)
+            except VocabularyFormatError:
+                updated_lines.append(line)
+                continue
+            if entry is None:
+                continue
+            new_entry = update(entry)
+            if new_entry is entry:
+                updated_lines.append(line if line.endswith("\n") else line + "\n")
+                continue
+            changed += 1
+            if new_entry is not None:
+                updated_lines.append(format_entry(new_entry))
+
+        if changed:
+            replace_file(file_path, "".join(updated_lines))
+    return changed
+
+
+def update_phrase_in_file(word_to_update, new_phrase, word_file):
+    """
+    Update the phrase for a specific word in the vocabulary file
+
+    Args:
+        word_to_update (str): Headword to change (case-insensitive)
+        new_phrase (str): New example phrase
+        word_file (str): Path to the vocabulary file
+
+    Returns:
+        bool: True if the word was found and updated
+    """
+    key = word_to_update.lower()
+    return _rewrite(word_file, lambda entry: dict(entry, phrase=new_phrase)
+                    if entry['word'].lower() == key else entry) > 0
+
+
+def delete_word_from_file(word_to_delete, word_file):
+    """
+    Delete a word from the vocabulary file
+
+    Args:
+        word_to_delete (str): Headword to remove (case-insensitive)
+        word_file (str): Path to the vocabulary file
+
+    Returns:
+        bool: True when done
+    """
+    key = word_to_delete.lower()
+    _rewrite(word_file, lambda entry: None if entry['word'].lower() == key else entry)
+    return True
@@ -0,0 +1,216 @@
+"""
+Hot reload of the level files and media folder without restarting the apps
+A background thread polls the data and media directories. When a level file
+changes, only that file is reparsed and only its changed categories are
+reindexed (see corpus.reload_corpus); the new corpus is swapped in as a
+whole, so readers always see either the old or the new snapshot. A media
+change re-lists the media folder once.
+
+Polling (os.scandir, a few stat calls per interval) is used instead of
+inotify so it works on every platform and needs no extra dependency.
+Enabled with VOCAB_WATCH=1 (interval in seconds: VOCAB_WATCH_INTERVAL),
+or run standalone to log reloads: python watcher.py
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+import corpus
+from instrumentation import configure_logging, record_cache
+
+# Constants
+DATA_FOLDER = "data"
+MEDIA_FOLDER = "media"
+DEFAULT_INTERVAL = 1.0
+IGNORED_SUFFIXES = (".lock", ".tmp")
+WATCH_ENABLED = os.environ.get("VOCAB_WATCH", "").lower() not in ("", "0", "false", "no")
+WATCH_INTERVAL = float(os.environ.get("VOCAB_WATCH_INTERVAL", DEFAULT_INTERVAL))
+
+logger = logging.getLogger(__name__)
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def _snapshot(folder):
+    """
+    Signatures of the visible files of a folder
+
+    Args:
+        folder (str): Directory to scan
+
+    Returns:
+        dict: File name -> (mtime_ns, size); empty if the folder is missing
+    """
+    files = {}
+    try:
+        with os.scandir(folder) as it:
+            for item in it:
+                if item.name.startswith(".") or item.name.endswith(IGNORED_SUFFIXES):
+                    continue
+                try:
+                    if item.is_file():
+                        stat = item.stat()
+                        files[item.name] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    # Removed between listing and stat; picked up on the next pass
+                    continue
+    except OSError:
+        pass
+    return files
+
+
+def _changed(before, after):
+    return {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+
+
+class DataWatcher:
+    """
+    Polling watcher that reloads changed level files and re-lists the media folder
+
+    Each pass that applies a change bumps `version`; subscribers are called
+    with (version, changed paths) after the new snapshot is in place.
+    """
+
+    def __init__(self, data_folder=DATA_FOLDER, media_folder=MEDIA_FOLDER, interval=DEFAULT_INTERVAL):
+        self.data_folder = data_folder
+        self.media_folder = media_folder
+        self.interval = interval
+        self.version = 0
+        self._subscribers = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._data = _snapshot(data_folder)
+        self._media = _snapshot(media_folder)
+
+    def subscribe(self, callback):
+        """
+        Call a function after every applied change
+
+        Args:
+            callback (callable): Called with (version, list of changed paths)
+        """
+        self._subscribers.append(callback)
+
+    def check(self):
+        """
+        Compare the folders with the last pass and apply the changes
+
+        Returns:
+            list: Paths of the changed files (empty if nothing changed)
+        """
+        data = _snapshot(self.data_folder)
+        media = _snapshot(self.media_folder)
+        data_changes = sorted(_changed(self._data, data))
+        media_changes = sorted(_changed(self._media, media))
+        self._data, self._media = data, media
+        if not data_changes and not media_changes:
+            record_cache("watcher", True)
+            return []
+        record_cache("watcher", False)
+
+        changed = []
+        for name in data_changes:
+            path = os.path.join(self.data_folder, name)
+            changed.append(path)
+            if name.endswith(".json") and os.path.abspath(path) in _watched_levels():
+                corpus.reload_corpus(path)
+        if media_changes:
+            from services import refresh_media
+            refresh_media()
+            changed.extend(os.path.join(self.media_folder, name) for name in media_changes)
+
+        self.version += 1
+        logger.debug("Watcher pass %d: %s", self.version, ", ".join(changed))
+        for callback in list(self._subscribers):
+            try:
+                callback(self.version, changed)
+            except Exception as e:
+                logger.error("Watcher subscriber failed: %s", e)
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep watching; a half-written file is picked up on the next pass
+                logger.error("Watcher pass failed: %s", e)
+
+    def start(self):
+        """
+        Start polling in a daemon thread
+        """
+        if self._thread is None:
+            corpus.track_changes(True)
+            self._thread = threading.Thread(target=self._run, name="vocab-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop polling
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _watched_levels():
+    return {os.path.abspath(path) for path in corpus.LEVEL_FILES.values()}
+
+
+def start_watcher(interval=None):
+    """
+    Start the process-wide data watcher (no-op if it is already running)
+
+    Args:
+        interval (float): Seconds between passes (default: VOCAB_WATCH_INTERVAL)
+
+    Returns:
+        DataWatcher: The running watcher
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = DataWatcher(interval=interval or WATCH_INTERVAL)
+            _watcher.start()
+            logger.info("Watching %s and %s every %.1fs", DATA_FOLDER, MEDIA_FOLDER, _watcher.interval)
+        return _watcher
+
+
+def get_watcher():
+    """
+    Get the process-wide data watcher
+
+    Returns:
+        DataWatcher or None: The watcher, or None if it was not started
+    """
+    return _watcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch the level files and media folder and reload on change")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL,
+                        help=f"Seconds between passes (default: {WATCH_INTERVAL})")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    watcher = start_watcher(args.interval)
+    for level in corpus.SHIPPED_LEVELS:
+        corpus.get_level_corpus(level)
+    watcher.subscribe(lambda version, changed: logger.info("Version %d: %s", version, ", ".join(changed)))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())